@@ -1,17 +1,25 @@
 import os
 import csv
 import json
-import requests
 from urllib.parse import urlparse
 
+from rate_limit import RateLimiter
+from redirect_resolver import RedirectResolver
+from site_config import site_url
+
 GSC_EXPORTS_DIR = os.path.expanduser("~/Desktop/gsc-exports")
 OUTPUT_CSV = os.path.expanduser("~/Desktop/shamrock-bail-portal-site/wix_bulk_redirect_import.csv")
 RAW_OUTPUT_JSON = os.path.expanduser("~/Desktop/shamrock-bail-portal-site/full_redirect_analysis.json")
 
+# GSC exports repeat the same http->https->www prefixes thousands of times;
+# the shared hop cache resolves each unique hop once.
+# The limiter paces requests per host and backs off if the site pushes back.
+resolver = RedirectResolver(timeout=10, limiter=RateLimiter())
+
 # Extra URLs to process (the 404s the user specified)
 EXTRA_URLS = [
-    {"url": "https://www.shamrockbailbonds.biz/bail-online", "issue": "Not found (404)"},
-    {"url": "https://www.shamrockbailbonds.biz/blank-4", "issue": "Not found (404)"}
+    {"url": site_url("/bail-online"), "issue": "Not found (404)"},
+    {"url": site_url("/blank-4"), "issue": "Not found (404)"}
 ]
 
 def load_urls_from_drilldowns():
@@ -55,44 +63,7 @@ def load_urls_from_drilldowns():
     return [{"url": u, "issue": i} for u, i in unique_urls.items()]
 
 def trace_redirects(url):
-    chain = []
-    current_url = url
-    max_hops = 10
-    final_status = None
-    error = None
-
-    for _ in range(max_hops):
-        try:
-            response = requests.get(current_url, allow_redirects=False, timeout=10)
-            status = response.status_code
-            
-            if 300 <= status < 400 and 'Location' in response.headers:
-                next_url = response.headers['Location']
-                # Handle relative redirects
-                if next_url.startswith('/'):
-                    parsed_current = urlparse(current_url)
-                    next_url = f"{parsed_current.scheme}://{parsed_current.netloc}{next_url}"
-                    
-                chain.append({
-                    "url": current_url,
-                    "status_code": status,
-                    "target": next_url
-                })
-                current_url = next_url
-            else:
-                final_status = status
-                break
-        except requests.exceptions.RequestException as e:
-            error = str(e)
-            break
-
-    return {
-        "original_url": url,
-        "chain": chain,
-        "final_url": current_url,
-        "final_status": final_status,
-        "error": error
-    }
+    return resolver.resolve(url)
 
 def process_urls():
     urls_to_check = load_urls_from_drilldowns()
@@ -154,6 +125,7 @@ def process_urls():
                 writer.writerow(row)
                 
     print(f"\\nAnalysis complete! Processed {len(results)} URLs.")
+    print(resolver.summary())
     print(f"Created Wix import CSV with {len(wix_import_rows)} rows: {OUTPUT_CSV}")
     print(f"Saved raw analysis JSON: {RAW_OUTPUT_JSON}")
 
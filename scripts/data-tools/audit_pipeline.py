@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Incremental runner for the redirect-audit phases.
+
+  crawl ─┬─ redirect_map
+         ├─ canonical
+         └─ final_wix ── phase4
+
+Each stage is a script's ``main()``.  Before running a stage the runner
+fingerprints what it depends on (its input files in OUTPUT_DIR, its own
+source and that of every module in this directory it imports, directly or
+not, and its arguments) and skips it when the fingerprint matches the last
+successful run and its outputs are still there.  A ``live`` stage reads
+the live site, which no fingerprint covers, so it always runs.  Stages
+whose dependencies are done run in parallel, each in its own process with
+output captured to pipeline_logs/<stage>.log.
+
+So editing validate_canonical_sitemap.py re-runs only ``canonical``; a
+recrawl that comes back byte-identical skips everything downstream.
+
+Usage:
+  python3 scripts/data-tools/audit_pipeline.py [--stages a,b] [--force a,b|all]
+      [--jobs N] [--crawl-args "--max-crawl 300"] [--dry-run]
+"""
+
+import argparse
+import ast
+import contextlib
+import hashlib
+import importlib
+import json
+import os
+import shlex
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+
+from jsonl_stream import RESULTS_JSONL
+from site_config import OUTPUT_DIR
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = "pipeline_state.json"
+LOG_DIR = "pipeline_logs"
+
+
+@dataclass
+class Stage:
+    name: str
+    module: str
+    inputs: tuple = ()      # Files in OUTPUT_DIR the stage reads
+    outputs: tuple = ()     # Files in OUTPUT_DIR it writes
+    after: tuple = ()       # Stages that must finish first besides the input producers
+    argv: tuple = None      # Passed to main(argv) when not None
+    live: bool = False      # Reads the live site: never skipped as up to date
+
+
+CRAWL_OUTPUTS = (RESULTS_JSONL, "sitemap_urls.json", "crawl_categories.json")
+
+STAGES = [
+    # Recrawls every run; stages downstream skip when its outputs come back identical
+    Stage("crawl", "crawl_site", outputs=CRAWL_OUTPUTS, argv=(), live=True),
+    Stage("redirect_map", "build_redirect_map", inputs=CRAWL_OUTPUTS,
+          outputs=("redirect_mapping_sheet.csv", "canonical_issues.csv",
+                   "sitemap_audit.csv", "summary_stats.json")),
+    Stage("canonical", "validate_canonical_sitemap", inputs=CRAWL_OUTPUTS,
+          outputs=("canonical_issues_detailed.csv", "sitemap_validation.csv", "phase3_summary.json",
+                   "canonical_clusters.json", "canonical_cluster_conflicts.csv")),
+    Stage("final_wix", "build_final_wix_csv", inputs=(RESULTS_JSONL,),
+          outputs=("wix_bulk_redirects_FINAL.csv", "redirect_graph_report.json")),
+    # Requests every redirect rule from the live site, so it runs every time
+    Stage("phase4", "phase4_validation", inputs=("wix_bulk_redirects_FINAL.csv",),
+          outputs=("phase4_validation.csv", "phase4_validation.json"), live=True),
+]
+
+
+def file_digest(path, digest):
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+
+
+def input_digest(path, digest):
+    """Hash an input file; a JSONL stream is hashed line by line, in sorted order.
+
+    Results are streamed as fetches complete, so a recrawl that finds the
+    same results writes the same lines in a different order.
+    """
+    if not path.endswith(".jsonl"):
+        file_digest(path, digest)
+        return
+    with open(path, "rb") as f:
+        lines = sorted(hashlib.sha256(line.rstrip(b"\n")).digest() for line in f)
+    for line in lines:
+        digest.update(line)
+
+
+def local_modules(module):
+    """``module`` and every module in this directory it imports, directly or not."""
+    found, pending = set(), [module]
+    while pending:
+        name = pending.pop()
+        path = os.path.join(HERE, f"{name}.py")
+        if name in found or not os.path.exists(path):
+            continue
+        found.add(name)
+        with open(path) as f:
+            tree = ast.parse(f.read(), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                pending.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                pending.append(node.module)
+    return sorted(found)
+
+
+def fingerprint(stage, output_dir=OUTPUT_DIR):
+    """Hash of everything that determines the stage's outputs."""
+    digest = hashlib.sha256()
+    for module in local_modules(stage.module):
+        digest.update(module.encode())
+        file_digest(os.path.join(HERE, f"{module}.py"), digest)
+    digest.update(json.dumps(stage.argv).encode())
+    for name in stage.inputs:
+        digest.update(name.encode())
+        path = os.path.join(output_dir, name)
+        if os.path.exists(path):
+            input_digest(path, digest)
+        else:
+            digest.update(b"<missing>")
+    return digest.hexdigest()
+
+
+def dependencies(stages):
+    """Stage name -> names of the stages it waits for."""
+    producers = {out: s.name for s in stages for out in s.outputs}
+    return {s.name: {producers[i] for i in s.inputs if i in producers and producers[i] != s.name}
+            | set(s.after) for s in stages}
+
+
+def run_stage(stage, output_dir):
+    """Run one stage in this (worker) process, logging to pipeline_logs/."""
+    log_path = os.path.join(output_dir, LOG_DIR, f"{stage.name}.log")
+    started = time.perf_counter()
+    with open(log_path, "w") as log, contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            module = importlib.import_module(stage.module)
+            if stage.argv is None:
+                module.main()
+            else:
+                module.main(list(stage.argv))
+            ok = True
+        except BaseException:
+            traceback.print_exc()
+            ok = False
+    return stage.name, ok, time.perf_counter() - started
+
+
+class Pipeline:
+    """Runs stages in dependency order, skipping the ones that are up to date."""
+
+    def __init__(self, stages=STAGES, output_dir=OUTPUT_DIR, jobs=None):
+        self.stages = {s.name: s for s in stages}
+        self.deps = dependencies(stages)
+        self.output_dir = output_dir
+        self.jobs = jobs or len(stages)
+        self.state_path = os.path.join(output_dir, STATE_FILE)
+        self.state = {}
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                self.state = json.load(f)
+
+    def save(self):
+        with open(self.state_path, "w") as f:
+            json.dump(self.state, f, indent=2)
+
+    def up_to_date(self, stage, digest):
+        if stage.live:
+            return False
+        outputs_there = all(os.path.exists(os.path.join(self.output_dir, o)) for o in stage.outputs)
+        return outputs_there and self.state.get(stage.name, {}).get("fingerprint") == digest
+
+    def run(self, selected=None, force=(), dry_run=False):
+        """Run ``selected`` stages (default all); returns {stage: status}."""
+        selected = set(selected or self.stages)
+        os.makedirs(os.path.join(self.output_dir, LOG_DIR), exist_ok=True)
+        # Unselected dependencies count as done: their outputs are used as they are
+        done = {name for name in self.stages if name not in selected}
+        status = {}
+        running = {}
+        with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+            while len(done) < len(self.stages):
+                for name in self.stages:
+                    if name in done or name in running or not self.deps[name] <= done:
+                        continue
+                    if any(status.get(d) == "failed" or status.get(d) == "blocked"
+                           for d in self.deps[name]):
+                        status[name] = "blocked"
+                        print(f"  ✗ {name}: skipped, a dependency failed")
+                        done.add(name)
+                        continue
+                    stage = self.stages[name]
+                    digest = fingerprint(stage, self.output_dir)
+                    if name not in force and "all" not in force and self.up_to_date(stage, digest):
+                        status[name] = "up to date"
+                        print(f"  = {name}: up to date")
+                        done.add(name)
+                    elif dry_run:
+                        status[name] = "would run"
+                        print(f"  → {name}: would run")
+                        done.add(name)
+                    else:
+                        print(f"  ▶ {name}: running ({stage.module}.py)")
+                        running[name] = (pool.submit(run_stage, stage, self.output_dir), digest)
+                if not running:
+                    continue
+                finished, _ = wait([f for f, _ in running.values()], return_when=FIRST_COMPLETED)
+                for name in [n for n, (f, _) in running.items() if f in finished]:
+                    future, digest = running.pop(name)
+                    _, ok, seconds = future.result()
+                    done.add(name)
+                    if ok:
+                        status[name] = "ran"
+                        # Fingerprint taken before the run: inputs it read, not outputs it wrote
+                        self.state[name] = {"fingerprint": digest, "seconds": round(seconds, 2),
+                                            "finished": time.strftime("%Y-%m-%dT%H:%M:%S")}
+                        self.save()
+                        print(f"  ✓ {name}: done in {seconds:.1f}s")
+                    else:
+                        status[name] = "failed"
+                        self.state.pop(name, None)
+                        self.save()
+                        print(f"  ✗ {name}: failed after {seconds:.1f}s "
+                              f"(see {LOG_DIR}/{name}.log)")
+        return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the redirect-audit stages incrementally")
+    parser.add_argument("--stages", default=None,
+                        help=f"Comma-separated subset of: {', '.join(s.name for s in STAGES)}")
+    parser.add_argument("--force", default="",
+                        help="Comma-separated stages to re-run even if up to date ('all' for every one)")
+    parser.add_argument("--jobs", type=int, default=None, help="Stages run in parallel at most")
+    parser.add_argument("--crawl-args", default="", help="Arguments passed to crawl_site.py")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would run")
+    args = parser.parse_args()
+
+    stages = [Stage(**{**s.__dict__, "argv": tuple(shlex.split(args.crawl_args))})
+              if s.name == "crawl" else s for s in STAGES]
+    names = [n.strip() for n in args.stages.split(",")] if args.stages else None
+    unknown = [n for n in (names or []) if n not in {s.name for s in stages}]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    print(f"=== REDIRECT AUDIT PIPELINE ({OUTPUT_DIR}) ===\n")
+    started = time.perf_counter()
+    status = Pipeline(stages, jobs=args.jobs).run(
+        names, force={n.strip() for n in args.force.split(",") if n.strip()}, dry_run=args.dry_run)
+    ran = sum(1 for s in status.values() if s == "ran")
+    failed = [n for n, s in status.items() if s in ("failed", "blocked")]
+    print(f"\nPipeline finished in {time.perf_counter() - started:.1f}s: {ran} ran, "
+          f"{sum(1 for s in status.values() if s == 'up to date')} up to date"
+          + (f", failed: {', '.join(failed)}" if failed else ""))
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
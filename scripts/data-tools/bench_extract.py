@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark: single-pass page_extract vs the old BeautifulSoup crawler path.
+
+The old crawler built two lxml-backed BeautifulSoup trees per 200 page (one
+in get_canonical, one for the <a href> list).  This times that path against
+one page_extract pass on saved county-page HTML and checks both agree on
+the canonical and the links.
+
+Usage:
+  python3 scripts/data-tools/bench_extract.py [--html-dir DIR] [--save N] [--rounds N]
+
+  --html-dir DIR  Saved pages (*.html). Default: OUTPUT_DIR/html_samples
+  --save N        First download N live /florida-bail-bonds/ pages into DIR
+  --rounds N      Timing rounds over the sample set (default 5)
+
+With no saved pages a synthetic Wix-sized county page is used.
+"""
+
+import argparse
+import glob
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+from page_extract import extract_page
+from site_config import OUTPUT_DIR, SITE_URL
+
+BASE_URL = SITE_URL
+SAMPLE_COUNTIES = ["lee", "collier", "charlotte", "sarasota", "manatee",
+                   "hillsborough", "miami-dade", "broward", "orange", "duval"]
+
+
+# ─── Old crawler path (BeautifulSoup, two trees per page) ───────────────────
+def bs4_canonical(html_content):
+    soup = BeautifulSoup(html_content, 'lxml')
+    canonical = soup.find('link', rel='canonical')
+    if canonical and canonical.get('href'):
+        return canonical['href']
+    return None
+
+
+def bs4_links(html_content):
+    soup = BeautifulSoup(html_content, 'lxml')
+    return [a['href'] for a in soup.find_all('a', href=True)]
+
+
+def synthetic_county_page():
+    """Roughly the size and shape of a rendered Wix county page."""
+    links = "".join(f'<li><a href="/florida-bail-bonds/c{i}">County {i}</a></li>' for i in range(67))
+    scripts = "".join(f'<script>window.__w{i}={{"k":"{"x" * 400}"}};</script>' for i in range(40))
+    divs = "".join(f'<div class="comp-{i}"><p>Paragraph {i} about bail bonds in Lee County.</p></div>' for i in range(600))
+    return (
+        '<!DOCTYPE html><html><head><title>Lee County Bail Bonds | Shamrock Bail Bonds</title>'
+        '<meta name="description" content="24/7 bail bonds in Lee County, Florida.">'
+        f'<link rel="canonical" href="{BASE_URL}/florida-bail-bonds/lee">'
+        '<meta property="og:title" content="Lee County Bail Bonds">'
+        '<script type="application/ld+json">{"@type": "LocalBusiness", "name": "Shamrock"}</script>'
+        f'{scripts}</head><body><h1>Lee County Bail Bonds</h1><ul>{links}</ul>{divs}</body></html>'
+    )
+
+
+def save_samples(html_dir, count):
+    import requests
+    os.makedirs(html_dir, exist_ok=True)
+    for county in SAMPLE_COUNTIES[:count]:
+        resp = requests.get(f"{BASE_URL}/florida-bail-bonds/{county}", timeout=20)
+        if resp.status_code == 200:
+            with open(os.path.join(html_dir, f"{county}.html"), "w") as f:
+                f.write(resp.text)
+            print(f"  saved {county}.html ({len(resp.text)} bytes)")
+
+
+def time_path(fn, pages, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for html in pages:
+            fn(html)
+    return (time.perf_counter() - start) / (rounds * len(pages))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--html-dir", default=os.path.join(OUTPUT_DIR, "html_samples"))
+    parser.add_argument("--save", type=int, default=0)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.save:
+        save_samples(args.html_dir, args.save)
+
+    pages = []
+    for path in sorted(glob.glob(os.path.join(args.html_dir, "*.html"))):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            pages.append(f.read())
+    if not pages:
+        print("No saved pages found — using a synthetic county page.")
+        pages = [synthetic_county_page()]
+
+    # Both paths must agree before timing means anything
+    for html in pages:
+        page = extract_page(html)
+        assert (page.canonical or None) == bs4_canonical(html), "canonical mismatch"
+        assert page.links == bs4_links(html), "link list mismatch"
+
+    total_kb = sum(len(p) for p in pages) / 1024
+    print(f"Pages: {len(pages)} ({total_kb:.0f} KB), rounds: {args.rounds}")
+
+    old = time_path(lambda h: (bs4_canonical(h), bs4_links(h)), pages, args.rounds)
+    new = time_path(extract_page, pages, args.rounds)
+
+    print(f"  bs4 (canonical + links): {old * 1000:8.2f} ms/page  {1 / old:8.1f} pages/s")
+    print(f"  page_extract (all data): {new * 1000:8.2f} ms/page  {1 / new:8.1f} pages/s")
+    print(f"  Speedup: {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark the site tools against the local fixture server.
+
+Starts fixture_site.FixtureServer in-process, points every tool at it
+through site_config's environment variables (with a throwaway output
+directory), runs each tool as a subprocess and reports:
+
+  pages/s   HTML pages served (GET 200) per second of tool wall time
+  req/s     all requests served per second
+  p50/p95   server-side response time of the tool's requests, ms
+  peak MB   the tool process's maximum resident set size
+
+Usage:
+  python3 scripts/data-tools/bench_tools.py [--tools crawl_site,seo_auditor]
+      [--latency-ms 20] [--jitter-ms 10] [--rate-limit-every N]
+      [--rounds N] [--json PATH]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from fetch_timing import percentile
+from fixture_site import FixtureConfig, FixtureServer
+
+SCRIPTS_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# name -> argv relative to scripts/ ("{out}" is the scratch output directory)
+TOOLS = {
+    "crawl_site": ["data-tools/crawl_site.py", "--max-crawl", "300",
+                   "--cache-path", "{out}/crawl_cache.sqlite"],
+    "seo_auditor": ["seo/seo_auditor.py", "--output-dir", "{out}"],
+    "phase4_validation": ["data-tools/phase4_validation.py"],
+    "redirect_checker": ["data-tools/redirect_checker.py"],
+    "bulk_index_submitter": ["seo/bulk_index_submitter.py", "--output-dir", "{out}"],
+}
+
+
+def run_tool(name, server, out_dir):
+    """Run one tool against the fixture and measure it."""
+    argv = [sys.executable] + [a.format(out=out_dir) for a in TOOLS[name]]
+    argv[1] = os.path.join(SCRIPTS_DIR, argv[1])
+    env = dict(os.environ,
+               SHAMROCK_SITE_URL=server.base_url,
+               SHAMROCK_SEARCH_API=server.base_url,
+               SHAMROCK_OUTPUT_DIR=out_dir)
+
+    server.stats.reset()
+    log_path = os.path.join(out_dir, f"{name}.log")
+    started = time.perf_counter()
+    with open(log_path, "w") as log:
+        proc = subprocess.Popen(argv, cwd=out_dir, env=env, stdout=log, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - started
+    proc.returncode = exit_code = os.waitstatus_to_exitcode(status)
+
+    records = server.stats.snapshot()
+    pages = sum(1 for r in records if r.method == "GET" and r.status == 200
+                and r.content_type.startswith("text/html"))
+    latencies = [r.seconds * 1000 for r in records]
+    return {
+        "tool": name,
+        "exit_code": exit_code,
+        "seconds": round(wall, 3),
+        "requests": len(records),
+        "pages": pages,
+        "pages_per_sec": round(pages / wall, 1) if wall else 0.0,
+        "requests_per_sec": round(len(records) / wall, 1) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "bytes": sum(r.bytes for r in records),
+        "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),  # ru_maxrss is KB on Linux
+        "log": log_path,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--tools", default=",".join(TOOLS),
+                        help=f"Comma-separated subset of: {', '.join(TOOLS)}")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--json", default=None, help="Also write the results to this file")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch output directory")
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.tools.split(",") if n.strip()]
+    unknown = [n for n in names if n not in TOOLS]
+    if unknown:
+        parser.error(f"unknown tools: {', '.join(unknown)}")
+
+    config = FixtureConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                           rate_limit_every=args.rate_limit_every)
+    server = FixtureServer(config, port=0).start()
+    out_dir = tempfile.mkdtemp(prefix="shamrock_bench_")
+    print(f"=== TOOL BENCHMARK ({server.base_url}, latency {args.latency_ms:g}±{args.jitter_ms:g} ms) ===\n")
+
+    results = []
+    try:
+        for round_no in range(1, args.rounds + 1):
+            for name in names:
+                result = run_tool(name, server, out_dir)
+                result["round"] = round_no
+                results.append(result)
+                flag = "✓" if result["exit_code"] == 0 else f"✗ exit {result['exit_code']}"
+                print(f"  {flag} {name:<22} {result['seconds']:7.2f}s  "
+                      f"{result['pages_per_sec']:7.1f} pages/s  {result['requests_per_sec']:7.1f} req/s  "
+                      f"p50 {result['p50_ms']:6.1f} ms  p95 {result['p95_ms']:6.1f} ms  "
+                      f"{result['peak_rss_mb']:6.1f} MB")
+    finally:
+        server.shutdown()
+        if not args.keep:
+            shutil.rmtree(out_dir, ignore_errors=True)
+        else:
+            print(f"\nOutputs and logs kept in {out_dir}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Per-template fetch budgets and crawl-trap detection.
+
+Wix generates endless near-duplicate URLs: blog hashtag, tag, archive and
+pagination pages, and query-string variants such as
+``/portal-landing?county=lee``.  The report scripts already skip them, so
+fetching every one only costs crawl time.  TemplateBudget decides, as each
+new URL is queued, whether it is worth a fetch:
+
+  - URLs are grouped by template: the page kind from crawl_frontier plus
+    the sorted names of its query parameters
+  - TEMPLATE_POLICIES cap trap templates at a handful of fetches and
+    sample high-cardinality ones (blog posts) after a first batch
+  - a path seen with more than PARAM_VARIANT_LIMIT distinct query strings
+    is flagged as a parameter explosion and its further variants refused
+
+Only URLs discovered through links are budgeted: seeds, GSC and county
+pages and every sitemap URL are always fetched, because the report scripts
+need a result for each of them (a sitemap URL left out would surface as
+"Not crawled" and miss its redirect rule).
+
+Sampling hashes the URL, so the same pages are chosen on every run and
+incremental crawls compare like with like.
+"""
+
+import hashlib
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+from crawl_frontier import classify_template
+
+PARAM_VARIANT_LIMIT = 5   # Distinct query strings per path before it counts as an explosion
+EXEMPT_SOURCES = ("seed", "gsc", "county", "sitemap")  # Frontier sources never budgeted
+
+
+@dataclass
+class TemplatePolicy:
+    limit: Optional[int] = None   # Max URLs fetched for the template
+    sample_after: int = 0         # Fetch this many before sampling kicks in
+    sample_rate: float = 1.0      # Fraction kept once sampling
+
+
+TEMPLATE_POLICIES = {
+    "blog_hashtag": TemplatePolicy(limit=5),
+    "blog_tag": TemplatePolicy(limit=5),
+    "blog_archive": TemplatePolicy(limit=5),
+    "blog_post": TemplatePolicy(sample_after=25, sample_rate=0.25),
+    "system": TemplatePolicy(limit=5),
+}
+
+
+def normalized_query(url):
+    """Query string with parameters sorted, so reordered variants compare equal."""
+    return urlencode(sorted(parse_qsl(urlparse(url).query, keep_blank_values=True)))
+
+
+def template_key(url):
+    """Template group for a URL: page kind plus its query parameter names."""
+    template, _ = classify_template(url)
+    names = sorted({name for name, _ in parse_qsl(urlparse(url).query, keep_blank_values=True)})
+    return f"{template}?{'&'.join(names)}" if names else template
+
+
+def _sampled(url, rate):
+    digest = hashlib.md5(url.encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") / 0xFFFFFFFF < rate
+
+
+class TemplateBudget:
+    """Admission control for the crawl frontier."""
+
+    def __init__(self, policies=None, param_variant_limit=PARAM_VARIANT_LIMIT,
+                 exempt_sources=EXEMPT_SOURCES):
+        self.policies = TEMPLATE_POLICIES if policies is None else policies
+        self.param_variant_limit = param_variant_limit
+        self.exempt_sources = set(exempt_sources)
+        self.admitted = Counter()   # template key -> URLs let through
+        self.refused = Counter()    # template key -> URLs dropped
+        self._variants = defaultdict(set)  # path -> normalized query strings
+        self.exploded = set()       # Paths flagged as parameter explosions
+
+    def _explodes(self, url):
+        parsed = urlparse(url)
+        if not parsed.query:
+            return False
+        variants = self._variants[parsed.path]
+        query = normalized_query(url)
+        if query in variants:
+            return False
+        if len(variants) >= self.param_variant_limit:
+            if parsed.path not in self.exploded:
+                self.exploded.add(parsed.path)
+                print(f"  Parameter explosion: {parsed.path} has more than "
+                      f"{self.param_variant_limit} query variants; skipping the rest")
+            return True
+        variants.add(query)
+        return False
+
+    def admit(self, url, source="link"):
+        """Return True if ``url`` should be fetched; counts it either way."""
+        key = template_key(url)
+        if source in self.exempt_sources:
+            self.count(url)
+            return True
+        policy = self.policies.get(classify_template(url)[0])
+        fetched = self.admitted[key]
+        allowed = True
+        if self._explodes(url):
+            allowed = False
+        elif policy and policy.limit is not None and fetched >= policy.limit:
+            allowed = False
+        elif (policy and policy.sample_rate < 1.0 and fetched >= policy.sample_after
+                and not _sampled(url, policy.sample_rate)):
+            allowed = False
+
+        if allowed:
+            self.admitted[key] += 1
+        else:
+            self.refused[key] += 1
+        return allowed
+
+    def count(self, url):
+        """Record an already-queued URL (e.g. restored from a checkpoint)."""
+        parsed = urlparse(url)
+        if parsed.query:
+            self._variants[parsed.path].add(normalized_query(url))
+        self.admitted[template_key(url)] += 1
+
+    def report(self):
+        """Per-template admitted/refused counts plus the exploded paths."""
+        keys = sorted(set(self.admitted) | set(self.refused))
+        return {
+            "templates": {k: {"fetched": self.admitted[k], "skipped": self.refused[k]} for k in keys},
+            "parameter_explosions": sorted(self.exploded),
+        }
+
+    def summary(self):
+        skipped = sum(self.refused.values())
+        if not skipped:
+            return "Template budgets: nothing skipped"
+        top = ", ".join(f"{k}: {n}" for k, n in self.refused.most_common(5))
+        return (f"Template budgets: skipped {skipped} URLs across {len(self.refused)} "
+                f"templates ({top}); {len(self.exploded)} parameter explosions")
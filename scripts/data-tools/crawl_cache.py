@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Persistent crawl cache for incremental recrawls.
+
+Stores, per page URL, the HTTP validators (ETag / Last-Modified), a hash of
+the body and the parse output the crawler needs (canonical + internal
+links).  On the next run the crawler revalidates with ``If-None-Match`` /
+``If-Modified-Since`` and reuses the cached parse on a 304, or when the body
+hash is unchanged.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url           TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    body_hash     TEXT,
+    canonical     TEXT,
+    links         TEXT,
+    fetched_at    REAL
+)
+"""
+
+COMMIT_EVERY = 50  # Writes between commits
+
+
+def body_hash(body):
+    """Stable hash of a page body (str or bytes)."""
+    if isinstance(body, str):
+        body = body.encode("utf-8", errors="replace")
+    return hashlib.sha1(body).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    body_hash: Optional[str] = None
+    canonical: Optional[str] = None
+    links: List[str] = field(default_factory=list)
+    fetched_at: float = 0.0
+
+
+class CrawlCache:
+    """SQLite-backed page cache with hit/miss accounting."""
+
+    def __init__(self, path):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.execute(SCHEMA)
+        self._pending = 0
+        self.stats = {"not_modified": 0, "unchanged": 0, "parsed": 0}
+
+    def get(self, url) -> Optional[CacheEntry]:
+        row = self._db.execute(
+            "SELECT url, etag, last_modified, body_hash, canonical, links, fetched_at "
+            "FROM pages WHERE url = ?", (url,)
+        ).fetchone()
+        if not row:
+            return None
+        return CacheEntry(row[0], row[1], row[2], row[3], row[4],
+                          json.loads(row[5] or "[]"), row[6] or 0.0)
+
+    def put(self, entry: CacheEntry):
+        self._db.execute(
+            "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (entry.url, entry.etag, entry.last_modified, entry.body_hash,
+             entry.canonical, json.dumps(entry.links), entry.fetched_at or time.time()),
+        )
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY:
+            self.commit()
+
+    def conditional_headers(self, url):
+        """Revalidation headers for a cached page, or {} if none are known."""
+        entry = self.get(url)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def record(self, outcome):
+        """Count one page outcome: 'not_modified', 'unchanged' or 'parsed'."""
+        self.stats[outcome] += 1
+
+    def summary(self):
+        total = sum(self.stats.values())
+        hits = self.stats["not_modified"] + self.stats["unchanged"]
+        rate = int(hits / total * 100) if total else 0
+        return (f"Cache: {hits}/{total} pages reused ({rate}%) — "
+                f"{self.stats['not_modified']} revalidated (304), "
+                f"{self.stats['unchanged']} unchanged body, "
+                f"{self.stats['parsed']} parsed")
+
+    def commit(self):
+        self._db.commit()
+        self._pending = 0
+
+    def close(self):
+        self.commit()
+        self._db.close()
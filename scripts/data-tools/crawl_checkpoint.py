@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Append-only crawl checkpoints.
+
+The crawl engine logs two kinds of events to a JSONL file:
+
+  {"e": "queued", "url": ..., "src": ..., "d": ...}   URL entered the frontier
+  {"e": "done", "url": ...}     URL finished (its result is in the results stream)
+
+Links a page discovers are logged as "queued" before its "done" event, and
+the log is written in order, so a flushed "done" never outruns its links.
+Events are buffered and appended every FLUSH_EVERY events or FLUSH_SECONDS,
+so checkpointing costs one small sequential write now and then.  Replaying
+the log rebuilds the visited set and the unfinished frontier, which is what
+``crawl_site.py --resume`` continues from; the partial results are already
+on disk in crawl_results.jsonl.
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+FLUSH_EVERY = 25       # Events buffered before an append
+FLUSH_SECONDS = 5.0    # ...or seconds since the last append
+
+
+@dataclass
+class ResumeState:
+    queued: List[str] = field(default_factory=list)    # Every URL ever queued
+    # (url, source, depth) queued but not finished, so priorities survive a resume
+    frontier: List[Tuple[str, str, int]] = field(default_factory=list)
+    finished: int = 0
+
+
+class CrawlCheckpoint:
+    """Buffered append-only event log for one crawl."""
+
+    def __init__(self, path, resume=False, flush_every=FLUSH_EVERY,
+                 flush_seconds=FLUSH_SECONDS):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self._file = open(path, "a" if resume else "w")
+        self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def _log(self, event):
+        self._buffer.append(json.dumps(event))
+        if (len(self._buffer) >= self.flush_every
+                or time.monotonic() - self._last_flush >= self.flush_seconds):
+            self.flush()
+
+    def queued(self, url, source="link", depth=0):
+        self._log({"e": "queued", "url": url, "src": source, "d": depth})
+
+    def done(self, url):
+        self._log({"e": "done", "url": url})
+
+    def flush(self):
+        if self._buffer:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._file.flush()
+            self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    @staticmethod
+    def load(path) -> ResumeState:
+        """Replay a checkpoint log into the state needed to resume."""
+        state = ResumeState()
+        if not os.path.exists(path):
+            return state
+        finished = set()
+        meta = {}
+        with open(path) as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # Torn final write from an interrupted run
+                if event["e"] == "queued":
+                    state.queued.append(event["url"])
+                    meta[event["url"]] = (event.get("src", "resume"), event.get("d", 0))
+                elif event["e"] == "done":
+                    finished.add(event["url"])
+        state.frontier = [(u, *meta[u]) for u in state.queued if u not in finished]
+        state.finished = len(finished)
+        return state
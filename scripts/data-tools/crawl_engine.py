@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Async crawl engine for the redirect audit tools.
+
+A bounded pool of asyncio workers drains a shared frontier through one
+aiohttp session, so every request reuses pooled keep-alive connections and
+no more than ``per_host`` sockets are ever open to the same origin.
+
+The engine knows nothing about redirects or HTML: callers hand it a
+``process(session, url)`` coroutine that returns ``(result, links)`` and the
+engine takes care of de-duplication, the crawl budget and worker lifecycle.
+The frontier is a PriorityFrontier: URLs are added with their source and
+depth, and the best-ranked URL is always crawled next, so when the request
+(``max_crawl``) or time (``max_seconds``) budget runs out the pages left
+over are the least important ones.  An optional TemplateBudget screens each
+new URL before it is queued, keeping crawl traps out of the frontier.
+Results are handed to ``on_result`` as they complete (e.g. a JSONL sink),
+or collected in ``results`` when no callback is given.  An optional
+CrawlCheckpoint receives every queued and finished URL so an interrupted
+crawl can be restored with ``restore()``.  A URL only counts as finished
+once its result is written: an ``on_result`` that holds a result back
+returns False and calls ``mark_done(url)`` after writing it.
+"""
+
+import asyncio
+import time
+
+import aiohttp
+
+from crawl_frontier import PriorityFrontier, url_priority
+
+DEFAULT_CONCURRENCY = 16   # Worker coroutines in flight
+DEFAULT_PER_HOST = 8       # Open connections per origin
+DEFAULT_TIMEOUT = 15       # Seconds per request
+
+
+def open_session(headers=None, concurrency=DEFAULT_CONCURRENCY,
+                 per_host=DEFAULT_PER_HOST, timeout=DEFAULT_TIMEOUT, trace_configs=None):
+    """Create a pooled keep-alive aiohttp session."""
+    connector = aiohttp.TCPConnector(
+        limit=concurrency,
+        limit_per_host=per_host,
+        ttl_dns_cache=300,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers=headers,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+        trace_configs=trace_configs,
+    )
+
+
+class CrawlEngine:
+    """Concurrent frontier crawler with a fixed-size worker pool."""
+
+    def __init__(self, process, normalize, accept=None, headers=None,
+                 concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+                 max_crawl=500, timeout=DEFAULT_TIMEOUT, checkpoint=None,
+                 on_result=None, priority=url_priority, max_seconds=None,
+                 budget=None, trace_configs=None):
+        self.process = process
+        self.normalize = normalize
+        self.accept = accept or (lambda url: True)
+        self.headers = headers
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.max_crawl = max_crawl
+        self.max_seconds = max_seconds
+        self.timeout = timeout
+        self.checkpoint = checkpoint
+        self.budget = budget
+        self.trace_configs = trace_configs
+
+        self.results = []
+        self.on_result = on_result or self.results.append
+        self.skipped = 0  # URLs left in the frontier when the budget ran out
+        self._seen = set()
+        self._queue = PriorityFrontier(priority)
+        self._dispatched = 0
+        self._deadline = None
+
+    def add(self, url, source="link", depth=0):
+        """Queue a URL unless it is external or already seen."""
+        if not self.accept(url):
+            return False
+        norm = self.normalize(url)
+        if norm in self._seen:
+            return False
+        self._seen.add(norm)
+        if self.budget and not self.budget.admit(url, source):
+            return False
+        self._queue.put(url, source, depth)
+        if self.checkpoint:
+            self.checkpoint.queued(url, source, depth)
+        return True
+
+    def restore(self, state):
+        """Resume from a checkpoint's ResumeState without refetching finished URLs.
+
+        ``max_crawl`` counts requests per run, so a crawl that stopped at
+        its budget continues with a fresh one instead of starting spent.
+        """
+        for url in state.queued:
+            self._seen.add(self.normalize(url))
+            if self.budget:
+                self.budget.count(url)
+        for url, source, depth in state.frontier:
+            self._queue.put(url, source, depth)
+
+    def mark_done(self, url):
+        """Log ``url`` as finished; its result must already be written."""
+        if self.checkpoint:
+            self.checkpoint.done(url)
+
+    def _over_budget(self):
+        if self._dispatched >= self.max_crawl:
+            return True
+        return self._deadline is not None and time.monotonic() >= self._deadline
+
+    def pending(self):
+        """Number of URLs waiting in the frontier."""
+        return self._queue.qsize()
+
+    async def _worker(self, session):
+        while True:
+            url, source, depth = await self._queue.get()
+            try:
+                if self._over_budget():
+                    self.skipped += 1
+                    continue
+                self._dispatched += 1
+                print(f"[{self._dispatched}] Checking: {url}")
+
+                result, links = await self.process(session, url)
+                written = self.on_result(result)
+                for link in links:
+                    self.add(link, "link", depth + 1)
+                if written is not False:
+                    self.mark_done(url)
+            except Exception as e:
+                print(f"  Worker error on {url}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def run(self, feed=None):
+        """Crawl until the frontier is empty or the budget is spent.
+
+        ``feed(session)`` is an optional coroutine that keeps adding URLs
+        (e.g. from a streaming sitemap) while the workers are already busy;
+        the crawl does not finish before it returns.
+        """
+        if self.max_seconds:
+            self._deadline = time.monotonic() + self.max_seconds
+        async with open_session(self.headers, self.concurrency, self.per_host,
+                                self.timeout, self.trace_configs) as session:
+            workers = [asyncio.create_task(self._worker(session))
+                       for _ in range(self.concurrency)]
+            try:
+                if feed is not None:
+                    await feed(session)
+                await self._queue.join()
+            finally:
+                for w in workers:
+                    w.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+        return self.results
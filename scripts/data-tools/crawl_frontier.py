@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Priority crawl frontier.
+
+A FIFO frontier visits URLs in discovery order, so the county pages listed
+late in the sitemap wait behind every blog tag and archive page linked from
+the homepage.  Here each URL gets a score from three signals, lowest first:
+
+  template  what kind of page it is (TEMPLATE_RULES)
+  source    how it was found (SOURCE_WEIGHTS)
+  depth     link hops from a seed/sitemap URL
+
+Ties keep discovery order.  Together with a request or time budget this
+means a partial crawl always covers the money pages first.
+"""
+
+import asyncio
+import itertools
+from urllib.parse import urlparse
+
+# (path prefix, template, weight) — first match wins; "/" matches the homepage only
+TEMPLATE_RULES = [
+    ("/florida-bail-bonds/", "county", 0),
+    ("/portal-", "portal", 0),
+    ("/bail-bonds/", "legacy_county", 2),
+    ("/blog/hashtags/", "blog_hashtag", 8),
+    ("/blog/tags/", "blog_tag", 8),
+    ("/blog/page/", "blog_archive", 8),
+    ("/blog/archive/", "blog_archive", 8),
+    ("/blog/categories/", "blog_category", 4),
+    ("/single-post/", "blog_post", 5),
+    ("/post/", "blog_post", 5),
+    ("/blog", "blog", 3),
+    ("/_api/", "system", 9),
+    ("/_functions/", "system", 9),
+]
+HOME_WEIGHT = 0
+DEFAULT_TEMPLATE = ("page", 1)
+
+SOURCE_WEIGHTS = {
+    "seed": 0,      # Hand-picked core pages
+    "sitemap": 1,
+    "gsc": 1,       # URLs Search Console reported
+    "county": 2,    # Guessed county URL patterns
+    "resume": 2,    # Restored from an old checkpoint without metadata
+    "link": 3,      # Discovered while crawling
+}
+DEPTH_WEIGHT = 1
+
+
+def classify_template(url):
+    """Return ``(template, weight)`` for a URL's path."""
+    path = urlparse(url).path or "/"
+    if path == "/":
+        return "home", HOME_WEIGHT
+    for prefix, template, weight in TEMPLATE_RULES:
+        if path.startswith(prefix):
+            return template, weight
+    return DEFAULT_TEMPLATE
+
+
+def url_priority(url, source="link", depth=0):
+    """Frontier score for a URL; lower is crawled sooner."""
+    _, template_weight = classify_template(url)
+    return template_weight + SOURCE_WEIGHTS.get(source, SOURCE_WEIGHTS["link"]) + DEPTH_WEIGHT * depth
+
+
+class PriorityFrontier:
+    """asyncio.Queue-compatible frontier ordered by ``priority(url, source, depth)``."""
+
+    def __init__(self, priority=url_priority):
+        self.priority = priority
+        self._queue = asyncio.PriorityQueue()
+        self._order = itertools.count()
+
+    def put(self, url, source="link", depth=0):
+        score = self.priority(url, source, depth)
+        self._queue.put_nowait((score, next(self._order), url, source, depth))
+
+    async def get(self):
+        """Return the best ``(url, source, depth)`` waiting."""
+        _, _, url, source, depth = await self._queue.get()
+        return url, source, depth
+
+    def task_done(self):
+        self._queue.task_done()
+
+    async def join(self):
+        await self._queue.join()
+
+    def qsize(self):
+        return self._queue.qsize()
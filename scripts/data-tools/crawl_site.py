@@ -5,17 +5,31 @@ Discovers all URLs, checks status codes, traces redirect chains,
 and identifies canonical/sitemap issues.
 """
 
-import requests
+import argparse
+import asyncio
 import json
-import csv
+import os
 import time
-from urllib.parse import urlparse, urljoin, urlunparse
-from bs4 import BeautifulSoup
-from collections import deque
-
-BASE_URL = "https://www.shamrockbailbonds.biz"
+from urllib.parse import urlparse
+import aiohttp
+
+from crawl_budget import TemplateBudget
+from crawl_cache import CacheEntry, CrawlCache, body_hash
+from crawl_checkpoint import CrawlCheckpoint
+from crawl_engine import CrawlEngine, DEFAULT_CONCURRENCY, DEFAULT_PER_HOST
+from fetch_timing import TimingCollector, wire_bytes
+from jsonl_stream import JsonlWriter, RESULTS_JSONL, crawl_results, write_json_array
+from page_extract import extract_page
+from parse_pool import DEFAULT_WORKERS, ParseStage
+from rate_limit import MAX_RETRIES, RateLimiter
+from redirect_resolver import (DRAIN_BYTES, HopCache, Hop, RedirectResolver,
+                               body_limit, hop_from_response)
+from site_config import OUTPUT_DIR, SITE_HOSTS, SITE_URL
+from sitemap_reader import iter_sitemap, read_sitemap
+from url_index import UrlIndex, normalize_url
+
+BASE_URL = SITE_URL
 SITEMAP_URL = f"{BASE_URL}/sitemap.xml"
-OUTPUT_DIR = "/home/ubuntu/redirect_audit"
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (compatible; ShamrockAuditBot/1.0; +https://shamrockbailbonds.biz)",
@@ -53,123 +67,187 @@ FLORIDA_COUNTIES = [
     "volusia","wakulla","walton","washington"
 ]
 
-
-def normalize_url(url):
-    """Normalize URL to remove trailing slashes and fragments."""
-    parsed = urlparse(url)
-    path = parsed.path.rstrip('/') or '/'
-    return urlunparse((parsed.scheme, parsed.netloc, path, '', parsed.query, ''))
+# Hops resolved during this process, shared by every tracer in the crawl
+HOP_CACHE = HopCache()
 
 
 def is_internal(url):
     """Check if URL belongs to the target domain."""
     parsed = urlparse(url)
-    return parsed.netloc in ('www.shamrockbailbonds.biz', 'shamrockbailbonds.biz', '')
+    return parsed.netloc in SITE_HOSTS + ('',)
 
 
 def trace_redirects(url, session, max_hops=10):
     """Trace the full redirect chain for a URL."""
-    chain = []
-    current_url = url
-    final_status = None
-    error = None
+    return RedirectResolver(session, cache=HOP_CACHE, max_hops=max_hops).resolve(url)
 
-    for _ in range(max_hops):
-        try:
-            resp = session.get(current_url, allow_redirects=False, timeout=15)
-            status = resp.status_code
-
-            if 300 <= status < 400 and 'Location' in resp.headers:
-                next_url = resp.headers['Location']
-                if next_url.startswith('/'):
-                    parsed = urlparse(current_url)
-                    next_url = f"{parsed.scheme}://{parsed.netloc}{next_url}"
-                chain.append({
-                    "url": current_url,
-                    "status_code": status,
-                    "target": next_url
-                })
-                current_url = next_url
-            else:
-                final_status = status
-                break
-        except requests.exceptions.RequestException as e:
-            error = str(e)
+
+async def read_capped(resp, limit):
+    """Read at most ``limit`` bytes of a response body."""
+    chunks, size = [], 0
+    async for chunk in resp.content.iter_chunked(64 * 1024):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= limit:
             break
+    return b"".join(chunks)[:limit]
 
-    return {
-        "original_url": url,
-        "chain": chain,
-        "hops": len(chain),
-        "final_url": current_url,
-        "final_status": final_status,
-        "error": error
-    }
+
+def decode_body(raw, charset):
+    try:
+        return raw.decode(charset or 'utf-8', errors='replace')
+    except LookupError:
+        return raw.decode('utf-8', errors='replace')
+
+
+async def fetch_hop_async(session, url, cache=None, limiter=None, timings=None):
+    """Fetch one hop without following redirects.
+
+    Returns ``(hop, page)``; ``page`` carries the body and validators of a
+    200 response.  With a CrawlCache, previously seen pages are revalidated
+    and a 304 comes back as a bodiless cached 200.  With a RateLimiter the
+    request is paced per host and a 429/503 is retried after backing off.
+
+    The body is streamed: redirect and error hops only read it when it is
+    small enough to keep the connection alive, and a 200 reads at most
+    ``body_limit(Content-Type)`` bytes (nothing for PDFs, images, ...).
+    With a TimingCollector each attempt is timed phase by phase; the
+    timing rides along in ``page["timing"]`` so parsing can be added.
+    """
+    headers = cache.conditional_headers(url) if cache else None
+    for attempt in range(MAX_RETRIES + 1):
+        if limiter:
+            await limiter.wait_async(url)
+        started = time.monotonic()
+        timing = timings.start(url) if timings else None
+        try:
+            async with session.get(url, allow_redirects=False, headers=headers,
+                                   trace_request_ctx=timing) as resp:
+                if timing:
+                    timing.status = resp.status
+                if limiter:
+                    pause = limiter.update(url, resp.status, resp.headers,
+                                           time.monotonic() - started)
+                    if pause is not None and attempt < MAX_RETRIES:
+                        limiter.stats["retries"] += 1
+                        continue
+                if resp.status == 304 and headers:
+                    return Hop(url, 200), {"body": None, "not_modified": True, "timing": timing}
+                hop = hop_from_response(url, resp.status, resp.headers)
+                page = None
+                if resp.status == 200:
+                    limit = body_limit(resp.headers.get('Content-Type'))
+                    read_started = time.perf_counter()
+                    raw = await read_capped(resp, limit) if limit else b""
+                    if timing:
+                        timing.download = time.perf_counter() - read_started
+                        timing.bytes_decoded = len(raw)
+                    page = {
+                        "body": decode_body(raw, resp.charset),
+                        "etag": resp.headers.get('ETag'),
+                        "last_modified": resp.headers.get('Last-Modified'),
+                        "not_modified": False,
+                        "timing": timing,
+                    }
+                elif resp.content_length is not None and resp.content_length <= DRAIN_BYTES:
+                    await resp.read()
+                if timing:
+                    timing.bytes_transferred = wire_bytes(resp)
+                return hop, page
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if limiter:
+                limiter.update(url, None)
+            return Hop(url, None, error=str(e) or type(e).__name__), None
+
+
+async def trace_redirects_async(url, session, resolver, cache=None, limiter=None,
+                                timings=None):
+    """Async trace through the shared resolver that also returns the final page.
+
+    The last hop of a chain is already a full GET of the destination, so its
+    body is kept for parsing instead of fetching the page a second time.
+    ``page`` is None when the final hop was answered from the hop cache.
+    """
+    page = None
+
+    async def fetch_hop(hop_url):
+        nonlocal page
+        hop, page = await fetch_hop_async(session, hop_url, cache, limiter, timings)
+        return hop
+
+    result = await resolver.resolve_async(url, fetch_hop)
+    return result, page
 
 
 def get_canonical(html_content, page_url):
     """Extract canonical URL from page HTML."""
-    try:
-        soup = BeautifulSoup(html_content, 'lxml')
-        canonical = soup.find('link', rel='canonical')
-        if canonical and canonical.get('href'):
-            return canonical['href']
-    except Exception:
-        pass
-    return None
-
-
-def fetch_sitemap_urls(session):
-    """Fetch all URLs from the XML sitemap."""
-    urls = []
-    try:
-        resp = session.get(SITEMAP_URL, timeout=15)
-        if resp.status_code == 200:
-            soup = BeautifulSoup(resp.text, 'lxml-xml')
-            # Handle sitemap index
-            sitemaps = soup.find_all('sitemap')
-            if sitemaps:
-                for sitemap in sitemaps:
-                    loc = sitemap.find('loc')
-                    if loc:
-                        sub_resp = session.get(loc.text.strip(), timeout=15)
-                        if sub_resp.status_code == 200:
-                            sub_soup = BeautifulSoup(sub_resp.text, 'lxml-xml')
-                            for url_tag in sub_soup.find_all('url'):
-                                loc_tag = url_tag.find('loc')
-                                if loc_tag:
-                                    urls.append(loc_tag.text.strip())
-            else:
-                for url_tag in soup.find_all('url'):
-                    loc_tag = url_tag.find('loc')
-                    if loc_tag:
-                        urls.append(loc_tag.text.strip())
-    except Exception as e:
-        print(f"Sitemap fetch error: {e}")
-    return urls
-
-
-def crawl_site():
-    """Main crawl function - discovers and checks all URLs."""
-    session = requests.Session()
-    session.headers.update(HEADERS)
-
-    visited = set()
-    to_visit = deque()
-    all_results = []
+    return extract_page(html_content).canonical or None
+
+
+def internal_links(hrefs):
+    """Keep internal hrefs, made absolute."""
+    links = []
+    for href in hrefs:
+        if href.startswith('/'):
+            links.append(BASE_URL + href)
+        elif href.startswith('http') and is_internal(href):
+            links.append(href)
+    return links
+
+
+def extract_links(html_content):
+    """Return internal links found in page HTML, made absolute."""
+    return internal_links(extract_page(html_content).links)
+
+
+def fetch_sitemap_urls():
+    """Fetch all URLs from the XML sitemap (and any child sitemaps)."""
+    return [entry.loc for entry in read_sitemap(SITEMAP_URL, HEADERS)]
+
+
+def crawl_site(concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+               max_crawl=500, cache=None, incremental=False,
+               checkpoint=None, resume_state=None, sink=None, on_sitemap=None,
+               max_rate=None, max_seconds=None, budget=None, timings=None,
+               parse_workers=DEFAULT_WORKERS):
+    """Main crawl function - discovers and checks all URLs.
+
+    ``cache`` is refreshed with every parsed page; in ``incremental`` mode it
+    is also consulted, so unchanged pages are revalidated instead of parsed.
+    ``checkpoint`` logs progress; ``resume_state`` (from
+    CrawlCheckpoint.load) continues an interrupted crawl.
+
+    With a ``sink`` (JsonlWriter) each result is streamed out as it
+    completes and the returned result list is empty.  ``on_sitemap`` is
+    called with the sitemap URLs as soon as the sitemap has been read.
+
+    Requests are paced per host by an adaptive RateLimiter (capped at
+    ``max_rate`` requests/second and by robots.txt Crawl-delay).
+
+    The frontier is priority-ordered (crawl_frontier), so when the
+    ``max_crawl`` request budget or ``max_seconds`` time budget runs out the
+    homepage, county and portal pages have been checked first.  A
+    TemplateBudget (``budget``) keeps blog archives, tag pages and query
+    string explosions from being fetched in full.  ``timings`` (a
+    TimingCollector) profiles every request and page parse.
+
+    Pages are parsed in a ParseStage process pool of ``parse_workers``
+    (0 parses inline), so fetching continues while pages are parsed.
+    """
+    seeds = []  # (url, source) — the source feeds the frontier priority
 
     # Start with homepage
-    to_visit.append(BASE_URL + "/")
+    seeds.append((BASE_URL + "/", "seed"))
 
     # Add GSC seed URLs
     for path in SEED_URLS_FROM_GSC:
         full_url = BASE_URL + path
-        to_visit.append(full_url)
+        seeds.append((full_url, "gsc"))
 
     # Add county pages (both /bail-bonds/county and /county patterns)
     for county in FLORIDA_COUNTIES:
-        to_visit.append(f"{BASE_URL}/bail-bonds/{county}")
-        to_visit.append(f"{BASE_URL}/{county}")
+        seeds.append((f"{BASE_URL}/bail-bonds/{county}", "county"))
+        seeds.append((f"{BASE_URL}/{county}", "county"))
 
     # Add known page patterns
     known_pages = [
@@ -182,74 +260,154 @@ def crawl_site():
         "/sitemap", "/privacy-policy", "/terms",
     ]
     for page in known_pages:
-        to_visit.append(BASE_URL + page)
-
-    # Fetch sitemap URLs
-    print("Fetching sitemap...")
-    sitemap_urls = fetch_sitemap_urls(session)
-    print(f"Found {len(sitemap_urls)} URLs in sitemap")
-    for url in sitemap_urls:
-        to_visit.append(url)
-
-    print(f"Starting crawl with {len(to_visit)} seed URLs...")
-
-    crawl_count = 0
-    max_crawl = 500  # Safety limit
-
-    while to_visit and crawl_count < max_crawl:
-        url = to_visit.popleft()
-
-        # Normalize
-        norm_url = normalize_url(url)
-        if norm_url in visited:
-            continue
-        if not is_internal(url):
-            continue
-
-        visited.add(norm_url)
-        crawl_count += 1
-
-        print(f"[{crawl_count}] Checking: {url}")
-
-        # Trace redirects
-        result = trace_redirects(url, session)
-        result["in_sitemap"] = url in sitemap_urls or norm_url in [normalize_url(u) for u in sitemap_urls]
+        seeds.append((BASE_URL + page, "seed"))
+
+    # Sitemap URLs stream in while the seeds are already being crawled
+    sitemap_urls = []
+    sitemap_index = UrlIndex()
+
+    parsed_pages = {}  # final_url -> task resolving to (canonical, links) for this run
+    resolver = RedirectResolver(cache=HOP_CACHE)
+    limiter = RateLimiter(max_rate=max_rate) if max_rate else RateLimiter()
+    stage = ParseStage(workers=parse_workers)
+
+    def parse_page(final_url, page):
+        # The task is memoized at once, so a page reached twice is parsed once
+        if final_url not in parsed_pages:
+            parsed_pages[final_url] = asyncio.ensure_future(_parse_page(final_url, page))
+        return parsed_pages[final_url]
+
+    async def _parse_page(final_url, page):
+        entry = cache.get(final_url) if (cache and incremental) else None
+        if page["not_modified"] and entry:
+            cache.record("not_modified")
+            parsed = (entry.canonical, entry.links)
+        else:
+            digest = body_hash(page["body"] or "")
+            if entry and entry.body_hash == digest:
+                cache.record("unchanged")
+                parsed = (entry.canonical, entry.links)
+            else:
+                # One streaming pass yields the canonical and the links to follow
+                extracted = await stage.parse(page["body"])
+                if page.get("timing"):
+                    page["timing"].parse = extracted.parse_seconds
+                parsed = (extracted.canonical or None, internal_links(extracted.links))
+                if cache:
+                    cache.record("parsed")
+            if cache:
+                cache.put(CacheEntry(final_url, page.get("etag"), page.get("last_modified"),
+                                     digest, parsed[0], parsed[1], time.time()))
+
+        return parsed
+
+    async def check_url(http, url):
+        # Trace redirects; a final 200 hop carries the page body with it
+        conditional = cache if incremental else None
+        result, page = await trace_redirects_async(url, http, resolver, conditional,
+                                                   limiter, timings)
 
-        # If final page is 200, get canonical
         canonical = None
-        if result["final_status"] == 200:
+        links = []
+        if (page is None and result["final_status"] == 200
+                and result["final_url"] not in parsed_pages):
+            _, page = await fetch_hop_async(http, result["final_url"], conditional,
+                                            limiter, timings)
+        if page is not None or result["final_url"] in parsed_pages:
             try:
-                page_resp = session.get(result["final_url"], timeout=15)
-                canonical = get_canonical(page_resp.text, result["final_url"])
-
-                # Extract internal links for further crawling
-                soup = BeautifulSoup(page_resp.text, 'lxml')
-                for a_tag in soup.find_all('a', href=True):
-                    href = a_tag['href']
-                    if href.startswith('/'):
-                        full_link = BASE_URL + href
-                        norm_link = normalize_url(full_link)
-                        if norm_link not in visited:
-                            to_visit.append(full_link)
-                    elif href.startswith('http') and is_internal(href):
-                        norm_link = normalize_url(href)
-                        if norm_link not in visited:
-                            to_visit.append(href)
+                canonical, links = await parse_page(result["final_url"], page)
             except Exception:
                 pass
 
         result["canonical"] = canonical
-        all_results.append(result)
-
-        time.sleep(0.3)  # Be polite
+        return result, links
 
-    print(f"\nCrawl complete. Checked {len(all_results)} URLs.")
+    all_results = []
+    held = []      # Results finished before the sitemap was fully read
+    sitemap_done = False
+    checked = 0
+
+    def emit(result):
+        """Write one result; False while it is held back for the sitemap."""
+        nonlocal checked
+        if not sitemap_done:
+            # Not in the checkpoint as done until written, so --resume retries it
+            held.append(result)
+            return False
+        # Sitemap membership is settled only once the whole tree has streamed in
+        result["in_sitemap"] = result["original_url"] in sitemap_index
+        checked += 1
+        if sink:
+            sink.write(result)
+        else:
+            all_results.append(result)
+        return True
+
+    engine = CrawlEngine(
+        check_url, normalize_url, accept=is_internal, headers=HEADERS,
+        concurrency=concurrency, per_host=per_host, max_crawl=max_crawl,
+        checkpoint=checkpoint, on_result=emit, max_seconds=max_seconds,
+        budget=budget, trace_configs=[timings.trace_config()] if timings else None,
+    )
+    if resume_state:
+        engine.restore(resume_state)
+        print(f"Resuming: {resume_state.finished} URLs already checked, "
+              f"{len(resume_state.frontier)} left in the frontier")
+    for url, source in seeds:
+        engine.add(url, source)
+
+    async def feed_sitemap(http):
+        nonlocal sitemap_done
+        delay = await limiter.load_robots_async(BASE_URL, http, HEADERS["User-Agent"])
+        if delay:
+            print(f"robots.txt Crawl-delay: {delay}s")
+        print("Fetching sitemap...")
+        try:
+            async for entry in iter_sitemap(http, SITEMAP_URL):
+                sitemap_urls.append(entry.loc)
+                sitemap_index.add(entry.loc)
+                engine.add(entry.loc, "sitemap")
+            print(f"Found {len(sitemap_urls)} URLs in sitemap")
+            if on_sitemap:
+                on_sitemap(sitemap_urls)
+        finally:
+            sitemap_done = True
+            for result in held:
+                emit(result)
+                engine.mark_done(result["original_url"])
+            held.clear()
+
+    print(f"Starting crawl with {engine.pending()} seed URLs "
+          f"({concurrency} workers, {per_host} per host)...")
+    started = time.time()
+
+    async def run():
+        async with stage:
+            await engine.run(feed=feed_sitemap)
+
+    asyncio.run(run())
+
+    print(f"\nCrawl complete. Checked {checked} URLs "
+          f"in {time.time() - started:.1f}s.")
+    if engine.skipped:
+        print(f"Budget reached: {engine.skipped} lower-priority URLs left unchecked "
+              f"(--resume continues with them)")
+    print(resolver.summary())
+    print(limiter.summary())
+    print(stage.summary())
+    if budget:
+        print(budget.summary())
+    if timings:
+        timings.print_profile()
+    if cache:
+        cache.commit()
+        print(cache.summary())
     return all_results, sitemap_urls
 
 
 def categorize_results(results, sitemap_urls):
     """Categorize URLs by issue type."""
-    sitemap_set = set(normalize_url(u) for u in sitemap_urls)
+    sitemap_index = UrlIndex(sitemap_urls)
 
     categories = {
         "404_not_found": [],
@@ -271,15 +429,15 @@ def categorize_results(results, sitemap_urls):
 
         if final_status == 404 or (final_status is None and r.get("error")):
             categories["404_not_found"].append(r)
-            if norm_url in sitemap_set:
+            if sitemap_index.has_normalized(norm_url):
                 categories["in_sitemap_but_404"].append(r)
         elif hops >= 2:
             categories["redirect_chains"].append(r)
-            if norm_url in sitemap_set:
+            if sitemap_index.has_normalized(norm_url):
                 categories["in_sitemap_but_redirecting"].append(r)
         elif hops == 1:
             categories["redirect_single"].append(r)
-            if norm_url in sitemap_set:
+            if sitemap_index.has_normalized(norm_url):
                 categories["in_sitemap_but_redirecting"].append(r)
         elif final_status == 200:
             # Check canonical mismatch
@@ -293,31 +451,99 @@ def categorize_results(results, sitemap_urls):
     return categories
 
 
-if __name__ == "__main__":
-    import os
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+def main(argv=None):
+    """Crawl, categorize and write the redirect-audit inputs."""
+    parser = argparse.ArgumentParser(description="Crawl shamrockbailbonds.biz for redirect/canonical issues")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Concurrent crawl workers")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST,
+                        help="Max open connections per host")
+    parser.add_argument("--max-crawl", type=int, default=500,
+                        help="Safety limit on URLs checked per run (--resume starts a fresh count)")
+    parser.add_argument("--max-rate", type=float, default=None,
+                        help="Ceiling on requests/second per host (default: adaptive up to 20)")
+    parser.add_argument("--time-budget", type=float, default=None,
+                        help="Stop starting new URLs after this many seconds")
+    parser.add_argument("--no-budgets", action="store_true",
+                        help="Fetch every URL instead of budgeting/sampling crawl-trap templates")
+    parser.add_argument("--parse-workers", type=int, default=DEFAULT_WORKERS,
+                        help="Processes parsing pages alongside the fetchers (0 = parse inline)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Revalidate cached pages and only re-parse changed bodies")
+    parser.add_argument("--cache-path", default=None,
+                        help="Crawl cache database (default: OUTPUT_DIR/crawl_cache.sqlite)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue from the last checkpoint instead of starting over")
+    parser.add_argument("--checkpoint-path", default=None,
+                        help="Checkpoint log (default: OUTPUT_DIR/crawl_checkpoint.jsonl)")
+    args = parser.parse_args(argv)
 
-    results, sitemap_urls = crawl_site()
-
-    # Save raw results
-    with open(f"{OUTPUT_DIR}/crawl_results_raw.json", 'w') as f:
-        json.dump(results, f, indent=2)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    # Save sitemap URLs
-    with open(f"{OUTPUT_DIR}/sitemap_urls.json", 'w') as f:
-        json.dump(sitemap_urls, f, indent=2)
+    def save_sitemap(urls):
+        # Written before the first result is streamed, so followers can rely on it.
+        # Sorted: sitemaps are fetched concurrently and arrive in any order
+        with open(f"{OUTPUT_DIR}/sitemap_urls.json", 'w') as f:
+            json.dump(sorted(urls), f, indent=2)
+
+    checkpoint_path = args.checkpoint_path or f"{OUTPUT_DIR}/crawl_checkpoint.jsonl"
+    resume_state = CrawlCheckpoint.load(checkpoint_path) if args.resume else None
+    checkpoint = CrawlCheckpoint(checkpoint_path, resume=args.resume)
+    cache = CrawlCache(args.cache_path or f"{OUTPUT_DIR}/crawl_cache.sqlite")
+    budget = None if args.no_budgets else TemplateBudget()
+    timings = TimingCollector()
+    # One JSON object per line as each URL completes
+    sink = JsonlWriter(f"{OUTPUT_DIR}/{RESULTS_JSONL}", append=args.resume)
+    try:
+        _, sitemap_urls = crawl_site(args.concurrency, args.per_host, args.max_crawl,
+                                     cache=cache, incremental=args.incremental,
+                                     checkpoint=checkpoint, resume_state=resume_state,
+                                     sink=sink, on_sitemap=save_sitemap,
+                                     max_rate=args.max_rate, max_seconds=args.time_budget,
+                                     budget=budget, timings=timings,
+                                     parse_workers=args.parse_workers)
+    except BaseException:
+        sink.close()
+        raise
+    finally:
+        checkpoint.close()
+        cache.close()
+
+    # Lazy, re-iterable view of the stream; nothing below loads it whole
+    results = crawl_results(OUTPUT_DIR)
+
+    # Legacy single-document copy of the raw results
+    total = write_json_array(results, f"{OUTPUT_DIR}/crawl_results_raw.json")
 
     # Categorize
     categories = categorize_results(results, sitemap_urls)
 
-    # Save categories
+    # Save categories, by URL rather than in completion order, so a recrawl
+    # with the same results writes the same file
     with open(f"{OUTPUT_DIR}/crawl_categories.json", 'w') as f:
-        json.dump(categories, f, indent=2)
+        json.dump({name: sorted(rows, key=lambda r: r["original_url"])
+                   for name, rows in categories.items()}, f, indent=2)
+
+    # Per-phase fetch timings, per template
+    with open(f"{OUTPUT_DIR}/crawl_timings.json", 'w') as f:
+        json.dump(timings.report(), f, indent=2)
+
+    # What the template budgets kept out of the crawl
+    if budget:
+        with open(f"{OUTPUT_DIR}/crawl_templates.json", 'w') as f:
+            json.dump(budget.report(), f, indent=2)
+
+    # Followers stop at the end marker, after categories are on disk
+    sink.close(complete=True)
 
     # Print summary
     print("\n=== CRAWL SUMMARY ===")
     for cat, items in categories.items():
         print(f"  {cat}: {len(items)}")
 
-    print(f"\nTotal URLs checked: {len(results)}")
+    print(f"\nTotal URLs checked: {total}")
     print(f"Sitemap URLs found: {len(sitemap_urls)}")
+
+
+if __name__ == "__main__":
+    main()
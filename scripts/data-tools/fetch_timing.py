@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Per-request timing for the shared fetch layer.
+
+Every request gets a RequestTiming that is filled in as it goes:
+
+  queue     waiting for a free pooled connection
+  dns       host resolution (0 on a DNS-cache hit or reused connection)
+  connect   TCP connect + TLS handshake (aiohttp has no separate TLS signal,
+            so the handshake cannot be reported as its own phase)
+  ttfb      request sent -> response headers received
+  download  reading the body
+  parse     extracting the page (set by the caller)
+
+plus body bytes received on the wire (``wire_bytes``, counted as they are
+read, so chunked and compressed bodies are measured too) vs bytes decoded,
+and whether a keep-alive connection was reused.  The aiohttp phases come from a
+TraceConfig (``TimingCollector.trace_config()``), so the fetch code only
+passes ``trace_request_ctx=timing``.  The blocking requests-based tools
+can only see ttfb/download/parse and fill those in themselves.
+
+TimingCollector groups timings by URL template and reports p50/p95/p99
+per phase and a latency histogram per phase.
+"""
+
+import math
+import time
+from collections import defaultdict
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+import aiohttp
+
+from crawl_frontier import classify_template
+
+PHASES = ("queue", "dns", "connect", "ttfb", "download", "parse", "total")
+HISTOGRAM_BOUNDS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def wire_bytes(resp):
+    """Body bytes received so far for ``resp``, before decompression."""
+    content = resp.content
+    return getattr(content, "total_raw_bytes", content.total_bytes)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def histogram(values_ms, bounds=HISTOGRAM_BOUNDS_MS):
+    """Counts per latency bucket, keyed "<10ms" ... ">=5000ms"."""
+    counts = {f"<{b}ms": 0 for b in bounds}
+    counts[f">={bounds[-1]}ms"] = 0
+    for v in values_ms:
+        for b in bounds:
+            if v < b:
+                counts[f"<{b}ms"] += 1
+                break
+        else:
+            counts[f">={bounds[-1]}ms"] += 1
+    return counts
+
+
+@dataclass
+class RequestTiming:
+    url: str
+    template: str
+    status: Optional[int] = None
+    queue: float = 0.0
+    dns: float = 0.0
+    connect: float = 0.0
+    ttfb: float = 0.0
+    download: float = 0.0
+    parse: float = 0.0
+    bytes_transferred: int = 0
+    bytes_decoded: int = 0
+    reused: bool = False
+    started: float = 0.0
+    _mark: float = 0.0
+
+    @property
+    def total(self):
+        return self.queue + self.dns + self.connect + self.ttfb + self.download + self.parse
+
+    def as_dict(self):
+        data = {k: v for k, v in asdict(self).items() if not k.startswith("_") and k != "started"}
+        data["total"] = self.total
+        return data
+
+
+# ─── aiohttp trace hooks ─────────────────────────────────────────────────────
+def _timing(ctx):
+    timing = ctx.trace_request_ctx
+    return timing if isinstance(timing, RequestTiming) else None
+
+
+async def _on_request_start(session, ctx, params):
+    t = _timing(ctx)
+    if t:
+        t.started = t._mark = time.perf_counter()
+
+
+async def _on_queued_start(session, ctx, params):
+    t = _timing(ctx)
+    if t:
+        t._mark = time.perf_counter()
+
+
+async def _on_queued_end(session, ctx, params):
+    t = _timing(ctx)
+    if t:
+        now = time.perf_counter()
+        t.queue += now - t._mark
+        t._mark = now
+
+
+async def _on_dns_start(session, ctx, params):
+    t = _timing(ctx)
+    if t:
+        t._mark = time.perf_counter()
+
+
+async def _on_dns_end(session, ctx, params):
+    t = _timing(ctx)
+    if t:
+        now = time.perf_counter()
+        t.dns += now - t._mark
+        t._mark = now
+
+
+async def _on_connect_start(session, ctx, params):
+    t = _timing(ctx)
+    if t:
+        t._mark = time.perf_counter()
+
+
+async def _on_connect_end(session, ctx, params):
+    t = _timing(ctx)
+    if t:
+        now = time.perf_counter()
+        t.connect += now - t._mark
+        t._mark = now
+
+
+async def _on_reuse(session, ctx, params):
+    t = _timing(ctx)
+    if t:
+        t.reused = True
+        t._mark = time.perf_counter()
+
+
+async def _on_request_end(session, ctx, params):
+    t = _timing(ctx)
+    if t:
+        now = time.perf_counter()
+        t.ttfb = max(0.0, now - t.started - t.queue - t.dns - t.connect)
+        t._mark = now
+
+
+class TimingCollector:
+    """Collects RequestTimings and summarizes them per template."""
+
+    def __init__(self, template=lambda url: classify_template(url)[0]):
+        self.template = template
+        self.timings = []
+
+    def start(self, url):
+        """New timing for a request to ``url``; pass it as trace_request_ctx."""
+        timing = RequestTiming(url, self.template(url))
+        self.timings.append(timing)
+        return timing
+
+    def trace_config(self):
+        config = aiohttp.TraceConfig()
+        config.on_request_start.append(_on_request_start)
+        config.on_connection_queued_start.append(_on_queued_start)
+        config.on_connection_queued_end.append(_on_queued_end)
+        config.on_dns_resolvehost_start.append(_on_dns_start)
+        config.on_dns_resolvehost_end.append(_on_dns_end)
+        config.on_connection_create_start.append(_on_connect_start)
+        config.on_connection_create_end.append(_on_connect_end)
+        config.on_connection_reuseconn.append(_on_reuse)
+        config.on_request_end.append(_on_request_end)
+        return config
+
+    def _summarize(self, timings):
+        summary = {"requests": len(timings)}
+        for phase in PHASES:
+            values = [getattr(t, phase) * 1000 for t in timings]
+            summary[phase] = {f"p{p}": round(percentile(values, p), 1) for p in (50, 95, 99)}
+        summary["reused_pct"] = round(100 * sum(t.reused for t in timings) / len(timings), 1) if timings else 0.0
+        summary["bytes_transferred"] = sum(t.bytes_transferred for t in timings)
+        summary["bytes_decoded"] = sum(t.bytes_decoded for t in timings)
+        return summary
+
+    def report(self):
+        """Per-template and overall percentiles plus per-phase histograms."""
+        by_template = defaultdict(list)
+        for t in self.timings:
+            by_template[t.template].append(t)
+        return {
+            "overall": self._summarize(self.timings),
+            "templates": {name: self._summarize(ts) for name, ts in sorted(by_template.items())},
+            "histograms": {phase: histogram([getattr(t, phase) * 1000 for t in self.timings])
+                           for phase in PHASES},
+        }
+
+    def slowest(self, n=10):
+        return sorted(self.timings, key=lambda t: t.total, reverse=True)[:n]
+
+    def print_profile(self, title="FETCH PROFILE"):
+        if not self.timings:
+            return
+        report = self.report()
+        print(f"\n=== {title} (ms, p50/p95/p99) ===")
+        print(f"  {'template':<16}{'n':>6}  {'total':>17}  {'ttfb':>17}  {'download':>17}  "
+              f"{'parse':>15}  {'connect p95':>11}  {'reused':>6}")
+        rows = [("ALL", report["overall"])] + list(report["templates"].items())
+        for name, s in rows:
+            fmt = lambda phase: "{p50:.0f}/{p95:.0f}/{p99:.0f}".format(**s[phase])
+            print(f"  {name:<16}{s['requests']:>6}  {fmt('total'):>17}  {fmt('ttfb'):>17}  "
+                  f"{fmt('download'):>17}  {fmt('parse'):>15}  {s['connect']['p95']:>11.0f}  "
+                  f"{s['reused_pct']:>5.0f}%")
+        print("  Slowest requests:")
+        for t in self.slowest(5):
+            print(f"    {t.total * 1000:7.0f} ms  {t.url}  (ttfb {t.ttfb * 1000:.0f}, "
+                  f"download {t.download * 1000:.0f}, {t.bytes_decoded / 1024:.0f} KB)")
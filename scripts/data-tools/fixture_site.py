@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for shamrockbailbonds.biz.
+
+Serves a synthetic copy of the site so the crawler, SEO auditor, validators
+and submitters can be benchmarked and regression-tested without touching
+the live Wix site:
+
+  - home, static, portal and 67 /florida-bail-bonds/ county pages with
+    canonical, Open Graph and JSON-LD (LocalBusiness, FAQPage, Breadcrumb)
+  - blog index, /single-post/ pages and Wix tag/hashtag/archive pages
+  - legacy /bail-bonds/<county> redirect chains, a redirect loop, 404s
+    and soft-404s (200 pages that say "Page not found")
+  - a sitemap index with child sitemaps, and robots.txt
+  - ETag / If-None-Match revalidation and HEAD
+  - injected latency and periodic 429s with Retry-After
+  - /google/ping, /bing/ping and /indexnow stand-ins for the submitters
+
+Usage:
+  python3 scripts/data-tools/fixture_site.py [--port 8765] [--latency-ms 20]
+      [--jitter-ms 10] [--rate-limit-every N] [--posts 60] [--crawl-delay S]
+
+  Then point any tool at it (see site_config.py):
+  SHAMROCK_SITE_URL=http://127.0.0.1:8765 python3 scripts/data-tools/crawl_site.py
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_PORT = 8765
+
+COUNTY_SLUGS = [
+    "alachua", "baker", "bay", "bradford", "brevard", "broward", "calhoun",
+    "charlotte", "citrus", "clay", "collier", "columbia", "desoto", "dixie",
+    "duval", "escambia", "flagler", "franklin", "gadsden", "gilchrist", "glades",
+    "gulf", "hamilton", "hardee", "hendry", "hernando", "highlands", "hillsborough",
+    "holmes", "indianriver", "jackson", "jefferson", "lafayette", "lake", "lee",
+    "leon", "levy", "liberty", "madison", "manatee", "marion", "martin", "miami-dade",
+    "monroe", "nassau", "okaloosa", "okeechobee", "orange", "osceola", "palmbeach",
+    "pasco", "pinellas", "polk", "putnam", "santa-rosa", "sarasota", "seminole",
+    "stjohns", "stlucie", "sumter", "suwannee", "taylor", "union", "volusia",
+    "wakulla", "walton", "washington"
+]
+
+STATIC_PAGES = {
+    "/about": "About Shamrock Bail Bonds",
+    "/contact": "Contact Us",
+    "/how-bail-works": "How Bail Works",
+    "/how-to-become-a-bondsman": "How to Become a Bondsman",
+    "/testimonials": "Testimonials",
+    "/terms-of-service": "Terms of Service",
+    "/privacy-policy": "Privacy Policy",
+    "/faq": "Frequently Asked Questions",
+    "/portal-landing": "Client Portal",
+    "/portal-indemnitor": "Indemnitor Portal",
+    "/portal-defendant": "Defendant Portal",
+}
+
+# Old URLs that must 301 somewhere; legacy county URLs are added per county
+STATIC_REDIRECTS = {
+    "/home-1": "/",
+    "/blank": "/",
+    "/blank-3": "/blank",          # Two-hop chain
+    "/bail-online": "/contact",
+    "/loop-a": "/loop-b",          # Redirect loop
+    "/loop-b": "/loop-a",
+}
+SOFT_404_PATHS = ["/members", "/member-area", "/login", "/pay-online"]
+TAG_PAGES = 12                     # Each of tags, hashtags and archive pages
+
+
+@dataclass
+class FixtureConfig:
+    latency_ms: float = 0.0        # Added to every response
+    jitter_ms: float = 0.0         # Uniform random extra latency
+    rate_limit_every: int = 0      # Every Nth request gets a 429 (0 = never)
+    retry_after: int = 1           # Retry-After seconds sent with a 429
+    posts: int = 60                # /single-post/ pages
+    chain_counties: int = 10       # Counties whose legacy URL is a 2-hop chain
+    crawl_delay: float = 0.0       # robots.txt Crawl-delay (0 = none)
+    page_padding: int = 40         # Filler blocks per page, for realistic size
+    seed: int = 7
+
+
+@dataclass
+class RequestRecord:
+    method: str
+    path: str
+    status: int
+    seconds: float
+    bytes: int
+    content_type: str = ""
+
+
+@dataclass
+class FixtureStats:
+    records: List[RequestRecord] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add(self, record):
+        with self.lock:
+            self.records.append(record)
+
+    def reset(self):
+        with self.lock:
+            self.records = []
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.records)
+
+
+# ─── Synthetic site ──────────────────────────────────────────────────────────
+class FixtureSite:
+    """Builds every route of the synthetic site up front."""
+
+    def __init__(self, config: FixtureConfig):
+        self.config = config
+        self.base_url = ""  # Set once the server knows its address
+        self.pages = {}      # path -> (title, kind)
+        self.redirects = dict(STATIC_REDIRECTS)
+
+        self.pages["/"] = ("Shamrock Bail Bonds | 24/7 Florida Bail Bonds", "home")
+        self.pages["/blog"] = ("Blog", "blog")
+        for path, title in STATIC_PAGES.items():
+            self.pages[path] = (title, "static")
+        for slug in COUNTY_SLUGS:
+            name = slug.replace("-", " ").title()
+            self.pages[f"/florida-bail-bonds/{slug}"] = (f"{name} County Bail Bonds", "county")
+        for i in range(config.posts):
+            self.pages[f"/single-post/post-{i}"] = (f"Bail Bond Tips #{i}", "post")
+        for i in range(TAG_PAGES):
+            self.pages[f"/blog/tags/tag-{i}"] = (f"Tag {i}", "taxonomy")
+            self.pages[f"/blog/hashtags/hashtag-{i}"] = (f"Hashtag {i}", "taxonomy")
+            self.pages[f"/blog/page/{i + 2}"] = (f"Blog page {i + 2}", "taxonomy")
+
+        for n, slug in enumerate(COUNTY_SLUGS):
+            if n < config.chain_counties:
+                self.redirects[f"/bail-bonds/{slug}"] = f"/county/{slug}"
+                self.redirects[f"/county/{slug}"] = f"/florida-bail-bonds/{slug}"
+            else:
+                self.redirects[f"/bail-bonds/{slug}"] = f"/florida-bail-bonds/{slug}"
+
+    def canonical_for(self, path):
+        # Every tenth post points its canonical at the blog index (mismatch)
+        if path.startswith("/single-post/post-") and path.endswith("0"):
+            return self.base_url + "/blog"
+        return self.base_url + path
+
+    def links_for(self, path, kind):
+        if kind == "home":
+            return (["/blog"] + list(STATIC_PAGES)
+                    + [f"/florida-bail-bonds/{s}" for s in COUNTY_SLUGS[:20]]
+                    + ["/bail-bonds/lee", "/blank-3", "/members", "/loop-a"])
+        if kind == "county":
+            return ["/", "/contact", "/portal-landing"] + [
+                f"/florida-bail-bonds/{s}" for s in COUNTY_SLUGS]
+        if kind == "blog":
+            return ([f"/single-post/post-{i}" for i in range(self.config.posts)]
+                    + [f"/blog/tags/tag-{i}" for i in range(TAG_PAGES)]
+                    + [f"/blog/hashtags/hashtag-{i}" for i in range(TAG_PAGES)]
+                    + [f"/blog/page/{i + 2}" for i in range(TAG_PAGES)])
+        if kind == "taxonomy" or kind == "post":
+            return ["/blog", "/"] + [f"/blog/tags/tag-{i}" for i in range(TAG_PAGES)]
+        if path == "/portal-landing":
+            return ["/"] + [f"/portal-landing?county={s}" for s in COUNTY_SLUGS]
+        return ["/", "/contact", "/blog"]
+
+    def json_ld(self, path, title, kind):
+        blocks = [{"@context": "https://schema.org", "@type": "LocalBusiness",
+                   "name": "Shamrock Bail Bonds", "telephone": "+1-239-332-2245"}]
+        if kind == "county":
+            blocks.append({"@context": "https://schema.org", "@type": "FAQPage",
+                           "mainEntity": [{"@type": "Question", "name": f"How do I post bail in {title}?",
+                                           "acceptedAnswer": {"@type": "Answer", "text": "Call us 24/7."}}]})
+            blocks.append({"@context": "https://schema.org", "@type": "BreadcrumbList",
+                           "itemListElement": [{"@type": "ListItem", "position": 1, "name": "Home",
+                                                "item": self.base_url + "/"}]})
+        return "".join(f'<script type="application/ld+json">{json.dumps(b)}</script>' for b in blocks)
+
+    def render(self, path, title, kind):
+        links = "".join(f'<li><a href="{href}">{href}</a></li>' for href in self.links_for(path, kind))
+        padding = "".join(f'<div class="comp-{i}"><p>{title}: paragraph {i} about bail bonds.</p></div>'
+                          for i in range(self.config.page_padding))
+        scripts = "".join(f'<script>window.__w{i}={{"k":"{"x" * 200}"}};</script>' for i in range(5))
+        return (
+            f'<!DOCTYPE html><html><head><title>{title}</title>'
+            f'<meta name="description" content="{title} - 24/7 bail bonds across Florida.">'
+            f'<meta name="robots" content="index, follow">'
+            f'<link rel="canonical" href="{self.canonical_for(path)}">'
+            f'<meta property="og:title" content="{title}">'
+            f'<meta property="og:description" content="{title}">'
+            f'<meta property="og:image" content="{self.base_url}/og.png">'
+            f'<meta property="og:url" content="{self.base_url}{path}">'
+            f'{self.json_ld(path, title, kind)}{scripts}</head>'
+            f'<body><h1>{title}</h1><ul>{links}</ul>{padding}</body></html>'
+        )
+
+    def soft_404(self):
+        return ('<!DOCTYPE html><html><head><title>Page Not Found</title></head>'
+                '<body><h1>Page not found</h1><p>This page isn&#39;t available.</p></body></html>')
+
+    def sitemap_index(self):
+        children = "".join(f"<sitemap><loc>{self.base_url}/{name}</loc></sitemap>"
+                           for name in ("pages-sitemap.xml", "county-sitemap.xml", "blog-posts-sitemap.xml"))
+        return ('<?xml version="1.0" encoding="UTF-8"?>'
+                f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{children}</sitemapindex>')
+
+    def child_sitemap(self, name):
+        if name == "pages-sitemap.xml":
+            # /home-1 is deliberately listed although it redirects
+            paths = ["/", "/blog", "/home-1"] + list(STATIC_PAGES)
+        elif name == "county-sitemap.xml":
+            paths = [f"/florida-bail-bonds/{s}" for s in COUNTY_SLUGS]
+        elif name == "blog-posts-sitemap.xml":
+            paths = [f"/single-post/post-{i}" for i in range(self.config.posts)]
+        else:
+            return None
+        urls = "".join(f"<url><loc>{self.base_url}{p}</loc><lastmod>2026-01-01</lastmod></url>"
+                       for p in paths)
+        return ('<?xml version="1.0" encoding="UTF-8"?>'
+                f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>')
+
+    def robots(self):
+        lines = ["User-agent: *", "Allow: /"]
+        if self.config.crawl_delay:
+            lines.append(f"Crawl-delay: {self.config.crawl_delay:g}")
+        lines.append(f"Sitemap: {self.base_url}/sitemap.xml")
+        return "\n".join(lines) + "\n"
+
+    def route(self, method, raw_path):
+        """Return ``(status, headers, body_bytes)`` for a request."""
+        parsed = urlparse(raw_path)
+        path = parsed.path.rstrip("/") or "/"
+
+        if path in ("/google/ping", "/bing/ping"):
+            return 200, {"Content-Type": "text/plain"}, b"Sitemap notification received"
+        if path == "/indexnow":
+            return (202 if method == "POST" else 405), {"Content-Type": "text/plain"}, b""
+        if path == "/robots.txt":
+            return 200, {"Content-Type": "text/plain"}, self.robots().encode()
+        if path == "/sitemap.xml":
+            return 200, {"Content-Type": "application/xml"}, self.sitemap_index().encode()
+        if path.endswith("-sitemap.xml"):
+            xml = self.child_sitemap(path.lstrip("/"))
+            if xml is not None:
+                return 200, {"Content-Type": "application/xml"}, xml.encode()
+        if path in self.redirects:
+            return 301, {"Location": self.redirects[path]}, b""
+        if path in SOFT_404_PATHS:
+            return 200, {"Content-Type": "text/html; charset=utf-8"}, self.soft_404().encode()
+        if path == "/portal-landing" and "county" in parse_qs(parsed.query):
+            title, kind = self.pages[path]
+            return 200, {"Content-Type": "text/html; charset=utf-8"}, self.render(path, title, kind).encode()
+        if path in self.pages:
+            title, kind = self.pages[path]
+            return 200, {"Content-Type": "text/html; charset=utf-8"}, self.render(path, title, kind).encode()
+        return 404, {"Content-Type": "text/html; charset=utf-8"}, b"<html><body>404</body></html>"
+
+
+# ─── HTTP server ─────────────────────────────────────────────────────────────
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real origin
+
+    def _serve(self, method):
+        server = self.server
+        started = time.perf_counter()
+        count = server.next_request()
+        config = server.site.config
+
+        delay = config.latency_ms + server.rng_uniform(0, config.jitter_ms)
+        if delay:
+            time.sleep(delay / 1000)
+
+        if config.rate_limit_every and count % config.rate_limit_every == 0:
+            status, headers, body = 429, {"Retry-After": str(config.retry_after),
+                                          "Content-Type": "text/plain"}, b"Too Many Requests"
+        else:
+            if method == "POST":
+                length = int(self.headers.get("Content-Length") or 0)
+                self.rfile.read(length)
+            status, headers, body = server.site.route(method, self.path)
+
+        etag = None
+        if status == 200 and body:
+            etag = '"%s"' % hashlib.md5(body).hexdigest()[:16]
+            if self.headers.get("If-None-Match") == etag:
+                status, body = 304, b""
+
+        self.send_response(status)
+        for name, value in headers.items():
+            if status == 304 and name == "Content-Type":
+                continue
+            self.send_header(name, value)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        sent = 0
+        if method != "HEAD" and body:
+            self.wfile.write(body)
+            sent = len(body)
+
+        server.stats.add(RequestRecord(method, self.path, status,
+                                       time.perf_counter() - started, sent,
+                                       headers.get("Content-Type", "")))
+
+    def do_GET(self):
+        self._serve("GET")
+
+    def do_HEAD(self):
+        self._serve("HEAD")
+
+    def do_POST(self):
+        self._serve("POST")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, config=None, host="127.0.0.1", port=DEFAULT_PORT):
+        super().__init__((host, port), FixtureHandler)
+        self.site = FixtureSite(config or FixtureConfig())
+        self.site.base_url = f"http://{host}:{self.server_address[1]}"
+        self.stats = FixtureStats()
+        self._count = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.site.config.seed)
+
+    @property
+    def base_url(self):
+        return self.site.base_url
+
+    def next_request(self):
+        with self._lock:
+            self._count += 1
+            return self._count
+
+    def rng_uniform(self, low, high):
+        if high <= low:
+            return low
+        with self._lock:
+            return self._rng.uniform(low, high)
+
+    def handle_error(self, request, client_address):
+        # Clients dropping keep-alive connections is normal, not a server fault
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+    def start(self):
+        """Serve from a background thread; returns self."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a synthetic shamrockbailbonds.biz locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--rate-limit-every", type=int, default=0,
+                        help="Answer every Nth request with 429 + Retry-After")
+    parser.add_argument("--posts", type=int, default=60)
+    parser.add_argument("--crawl-delay", type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = FixtureConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                           rate_limit_every=args.rate_limit_every, posts=args.posts,
+                           crawl_delay=args.crawl_delay)
+    server = FixtureServer(config, args.host, args.port)
+    print(f"🧪 Fixture site serving {len(server.site.pages)} pages and "
+          f"{len(server.site.redirects)} redirects at {server.base_url}")
+    print(f"   export SHAMROCK_SITE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped.")
+        codes = Counter(r.status for r in server.stats.snapshot())
+        print(f"Served {sum(codes.values())} requests: {dict(codes)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+JSON Lines result streams for the crawl and audit outputs.
+
+The crawler appends one JSON object per line as each URL completes instead
+of holding every result until a final ``json.dump``.  Downstream scripts
+read the stream lazily (``crawl_results``), and with ``follow=True`` can
+consume it while the crawl is still running.  A completed stream ends with
+an END marker line so followers know when to stop.
+"""
+
+import json
+import os
+import time
+
+RESULTS_JSONL = "crawl_results.jsonl"
+LEGACY_RESULTS_JSON = "crawl_results_raw.json"
+END_MARKER = {"_end": True}
+POLL_SECONDS = 0.5
+
+
+class JsonlWriter:
+    """Line-buffered JSONL writer; the file is created on the first write."""
+
+    def __init__(self, path, append=False):
+        self.path = path
+        self.append = append
+        self.count = 0
+        self._file = None
+
+    def _open(self):
+        if self.append and os.path.exists(self.path):
+            _strip_end_marker(self.path)
+            self._file = open(self.path, "a", buffering=1)
+        else:
+            self._file = open(self.path, "w", buffering=1)
+
+    def write(self, obj):
+        if self._file is None:
+            self._open()
+        self._file.write(json.dumps(obj) + "\n")
+        self.count += 1
+
+    def close(self, complete=False):
+        """Close the stream; ``complete`` marks it finished for followers."""
+        if complete:
+            if self._file is None:
+                self._open()
+            self._file.write(json.dumps(END_MARKER) + "\n")
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _strip_end_marker(path):
+    """Drop a trailing END marker so a resumed stream can keep appending."""
+    with open(path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        tail_len = min(size, 64)
+        f.seek(size - tail_len)
+        tail = f.read()
+        marker = (json.dumps(END_MARKER) + "\n").encode()
+        if tail.endswith(marker):
+            f.truncate(size - len(marker))
+
+
+def wait_for_file(path, poll_seconds=POLL_SECONDS):
+    while not os.path.exists(path):
+        time.sleep(poll_seconds)
+
+
+def iter_jsonl(path, follow=False, poll_seconds=POLL_SECONDS):
+    """Yield objects from a JSONL file one line at a time.
+
+    With ``follow`` the reader waits for the file and for new lines until
+    the writer's END marker; otherwise it stops at end of file.  A torn last
+    line (interrupted writer) is skipped.
+    """
+    if follow:
+        wait_for_file(path, poll_seconds)
+    with open(path) as f:
+        buf = ""
+        while True:
+            line = f.readline()
+            if not line:
+                if not follow:
+                    break
+                time.sleep(poll_seconds)
+                continue
+            buf += line
+            if not buf.endswith("\n"):
+                if not follow:
+                    break
+                continue  # Partial line still being written
+            text, buf = buf.strip(), ""
+            if not text:
+                continue
+            try:
+                obj = json.loads(text)
+            except json.JSONDecodeError:
+                continue
+            if obj == END_MARKER:
+                if follow:
+                    return
+                continue
+            yield obj
+
+
+class JsonlSource:
+    """Re-iterable lazy view of a JSONL stream, de-duplicated by ``key``.
+
+    Each iteration re-reads the file, so a script can make several passes
+    over the results without ever holding them all in memory.  A URL that
+    was re-crawled after an interrupted run appears once (first record).
+    """
+
+    def __init__(self, path, key="original_url", follow=False):
+        self.path = path
+        self.key = key
+        self.follow = follow
+
+    def __iter__(self):
+        seen = set()
+        for obj in iter_jsonl(self.path, follow=self.follow):
+            k = obj.get(self.key)
+            if k in seen:
+                continue
+            seen.add(k)
+            yield obj
+
+
+def crawl_results(output_dir, follow=False):
+    """Crawl results from ``output_dir``: the JSONL stream, else the legacy JSON."""
+    path = os.path.join(output_dir, RESULTS_JSONL)
+    if follow or os.path.exists(path):
+        return JsonlSource(path, follow=follow)
+    with open(os.path.join(output_dir, LEGACY_RESULTS_JSON)) as f:
+        return json.load(f)
+
+
+def write_json_array(records, path):
+    """Write an iterable as a JSON array without materializing it. Returns the count."""
+    count = 0
+    with open(path, "w") as f:
+        f.write("[")
+        for obj in records:
+            f.write(",\n  " if count else "\n  ")
+            f.write(json.dumps(obj))
+            count += 1
+        f.write("\n]\n" if count else "]\n")
+    return count
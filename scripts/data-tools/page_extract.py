@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Single-pass page extractor for the crawler.
+
+One streaming HTMLParser pass (no DOM) collects what the crawler records
+for a page: canonical, <a href> links, title, meta description, robots,
+Open Graph tags, H1 text and JSON-LD blocks.  The crawler used to build
+two BeautifulSoup trees per page; it now calls ``extract_page`` once.
+
+``extract_page_data`` returns the same fields as a plain, picklable
+PageData so pages can be parsed in a process pool (parse_pool.py).
+"""
+
+import json
+import time
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, List
+
+
+class PageExtractor(HTMLParser):
+    """Streaming HTML parser that records SEO and link data as it goes."""
+
+    def __init__(self):
+        super().__init__()
+        self.title = ""
+        self.in_title = False
+        self.meta_description = ""
+        self.canonical = ""
+        self.robots = ""
+        self.og_tags: Dict[str, str] = {}
+        self.json_ld: List[dict] = []
+        self.h1_texts: List[str] = []
+        self.links: List[str] = []
+        self.in_h1 = False
+        self._h1_buf = ""
+        self._in_json_ld = False
+        self._script_data = ""
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            for name, value in attrs:
+                if name == "href" and value is not None:
+                    self.links.append(value)
+                    break
+        elif tag == "meta":
+            attr = dict(attrs)
+            name = (attr.get("name") or "").lower()
+            prop = (attr.get("property") or "").lower()
+            content = attr.get("content") or ""
+            if name == "description":
+                self.meta_description = content
+            elif name == "robots":
+                self.robots = content
+            elif prop.startswith("og:"):
+                self.og_tags[prop] = content
+        elif tag == "link":
+            attr = dict(attrs)
+            rel = (attr.get("rel") or "").lower().split()
+            if "canonical" in rel and not self.canonical:
+                self.canonical = attr.get("href") or ""
+        elif tag == "title":
+            self.in_title = True
+        elif tag == "h1":
+            self.in_h1 = True
+            self._h1_buf = ""
+        elif tag == "script":
+            for name, value in attrs:
+                if name == "type" and value == "application/ld+json":
+                    self._in_json_ld = True
+                    self._script_data = ""
+                    break
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self.in_title = False
+        elif tag == "h1":
+            self.in_h1 = False
+            if self._h1_buf.strip():
+                self.h1_texts.append(self._h1_buf.strip())
+        elif tag == "script" and self._in_json_ld:
+            self._in_json_ld = False
+            try:
+                data = json.loads(self._script_data)
+                if isinstance(data, list):
+                    self.json_ld.extend(data)
+                else:
+                    self.json_ld.append(data)
+            except json.JSONDecodeError:
+                pass
+
+    def handle_data(self, data):
+        if self.in_title:
+            self.title += data
+        if self.in_h1:
+            self._h1_buf += data
+        if self._in_json_ld:
+            self._script_data += data
+
+
+def extract_page(html):
+    """Parse ``html`` once and return the populated PageExtractor."""
+    page = PageExtractor()
+    page.feed(html)
+    page.close()
+    return page
+
+
+@dataclass
+class PageData:
+    """Picklable result of one extraction pass."""
+    title: str = ""
+    meta_description: str = ""
+    canonical: str = ""
+    robots: str = ""
+    og_tags: Dict[str, str] = field(default_factory=dict)
+    json_ld: List[dict] = field(default_factory=list)
+    h1_texts: List[str] = field(default_factory=list)
+    links: List[str] = field(default_factory=list)
+    parse_seconds: float = 0.0
+
+
+def extract_page_data(html):
+    """``extract_page`` as a PageData, timed; safe to run in a worker process."""
+    started = time.perf_counter()
+    page = extract_page(html)
+    return PageData(page.title, page.meta_description, page.canonical, page.robots,
+                    page.og_tags, page.json_ld, page.h1_texts, page.links,
+                    time.perf_counter() - started)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Process-pool parse stage fed by the async fetch stage.
+
+Fetching is I/O-bound and parsing is CPU-bound.  Parsing on the event loop
+(or in a thread pool, where the GIL serializes it) stalls every in-flight
+request, so the fetch stage hands raw bodies to a ParseStage instead:
+
+  fetch coroutines --> bounded asyncio.Queue --> dispatchers --> ProcessPoolExecutor
+
+``queue_size`` bounds the bodies waiting to be parsed.  When the pool
+falls behind, ``parse()`` blocks on the full queue and the fetchers slow
+down with it (backpressure), so memory stays flat while network and CPU
+work overlap.  ``workers=0`` parses inline on the event loop, which is
+cheaper for short runs than starting processes.
+"""
+
+import asyncio
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from page_extract import extract_page_data
+
+DEFAULT_WORKERS = os.cpu_count() or 2
+QUEUE_PER_WORKER = 2   # Bodies buffered per worker process
+
+
+class ParseStage:
+    """Bounded queue in front of a process pool; use as an async context manager."""
+
+    def __init__(self, parse=extract_page_data, workers=DEFAULT_WORKERS, queue_size=None):
+        self.parse_fn = parse
+        self.workers = workers
+        self.queue_size = queue_size or max(1, workers) * QUEUE_PER_WORKER
+        self.stats = Counter()
+        self._queue = None
+        self._executor = None
+        self._dispatchers = []
+
+    async def __aenter__(self):
+        if self.workers:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._dispatchers = [asyncio.create_task(self._dispatch())
+                                 for _ in range(self.workers)]
+        return self
+
+    async def __aexit__(self, *exc):
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        if self._executor:
+            self._executor.shutdown(cancel_futures=True)
+
+    async def parse(self, payload):
+        """Parse ``payload`` in the pool; waits while the queue is full."""
+        self.stats["parsed"] += 1
+        if not self.workers:
+            return self.parse_fn(payload)
+        if self._queue.full():
+            self.stats["backpressure_waits"] += 1
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((payload, future))
+        self.stats["max_queued"] = max(self.stats["max_queued"], self._queue.qsize())
+        return await future
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            payload, future = await self._queue.get()
+            try:
+                result = await loop.run_in_executor(self._executor, self.parse_fn, payload)
+                if not future.done():
+                    future.set_result(result)
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    def summary(self):
+        mode = f"{self.workers} processes, queue {self.queue_size}" if self.workers else "inline"
+        return (f"Parse stage ({mode}): {self.stats['parsed']} pages, "
+                f"{self.stats['backpressure_waits']} backpressure waits, "
+                f"max {self.stats['max_queued']} queued")
@@ -9,10 +9,10 @@ Phase 4: Post-Fix Validation
 import requests
 import json
 import csv
-import time
-from urllib.parse import urlparse
 
-OUTPUT_DIR = "/home/ubuntu/redirect_audit"
+from rate_limit import RateLimiter
+from redirect_resolver import RedirectResolver
+from site_config import OUTPUT_DIR, SITE_URL
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (compatible; ShamrockAuditBot/1.0; +https://shamrockbailbonds.biz)",
@@ -21,92 +21,67 @@ HEADERS = {
 # Priority pages to validate
 PRIORITY_PAGES = [
     # Core pages
-    ("Home", "https://www.shamrockbailbonds.biz/"),
-    ("How Bail Works", "https://www.shamrockbailbonds.biz/how-bail-works"),
-    ("How to Become a Bondsman", "https://www.shamrockbailbonds.biz/how-to-become-a-bondsman"),
-    ("Contact", "https://www.shamrockbailbonds.biz/contact"),
-    ("About", "https://www.shamrockbailbonds.biz/about"),
-    ("Blog", "https://www.shamrockbailbonds.biz/blog"),
-    ("Terms of Service", "https://www.shamrockbailbonds.biz/terms-of-service"),
-    ("Testimonials", "https://www.shamrockbailbonds.biz/testimonials"),
+    ("Home", f"{SITE_URL}/"),
+    ("How Bail Works", f"{SITE_URL}/how-bail-works"),
+    ("How to Become a Bondsman", f"{SITE_URL}/how-to-become-a-bondsman"),
+    ("Contact", f"{SITE_URL}/contact"),
+    ("About", f"{SITE_URL}/about"),
+    ("Blog", f"{SITE_URL}/blog"),
+    ("Terms of Service", f"{SITE_URL}/terms-of-service"),
+    ("Testimonials", f"{SITE_URL}/testimonials"),
     
     # Portal pages
-    ("Portal Landing", "https://www.shamrockbailbonds.biz/portal-landing"),
-    ("Portal Indemnitor", "https://www.shamrockbailbonds.biz/portal-indemnitor"),
-    ("Portal Defendant", "https://www.shamrockbailbonds.biz/portal-defendant"),
+    ("Portal Landing", f"{SITE_URL}/portal-landing"),
+    ("Portal Indemnitor", f"{SITE_URL}/portal-indemnitor"),
+    ("Portal Defendant", f"{SITE_URL}/portal-defendant"),
     
     # Key county pages (top markets)
-    ("Lee County", "https://www.shamrockbailbonds.biz/florida-bail-bonds/lee"),
-    ("Collier County", "https://www.shamrockbailbonds.biz/florida-bail-bonds/collier"),
-    ("Charlotte County", "https://www.shamrockbailbonds.biz/florida-bail-bonds/charlotte"),
-    ("Sarasota County", "https://www.shamrockbailbonds.biz/florida-bail-bonds/sarasota"),
-    ("Manatee County", "https://www.shamrockbailbonds.biz/florida-bail-bonds/manatee"),
-    ("Hillsborough County", "https://www.shamrockbailbonds.biz/florida-bail-bonds/hillsborough"),
-    ("Miami-Dade County", "https://www.shamrockbailbonds.biz/florida-bail-bonds/miami-dade"),
-    ("Broward County", "https://www.shamrockbailbonds.biz/florida-bail-bonds/broward"),
-    ("Palm Beach County", "https://www.shamrockbailbonds.biz/florida-bail-bonds/palmbeach"),
-    ("Orange County", "https://www.shamrockbailbonds.biz/florida-bail-bonds/orange"),
-    ("Duval County", "https://www.shamrockbailbonds.biz/florida-bail-bonds/duval"),
+    ("Lee County", f"{SITE_URL}/florida-bail-bonds/lee"),
+    ("Collier County", f"{SITE_URL}/florida-bail-bonds/collier"),
+    ("Charlotte County", f"{SITE_URL}/florida-bail-bonds/charlotte"),
+    ("Sarasota County", f"{SITE_URL}/florida-bail-bonds/sarasota"),
+    ("Manatee County", f"{SITE_URL}/florida-bail-bonds/manatee"),
+    ("Hillsborough County", f"{SITE_URL}/florida-bail-bonds/hillsborough"),
+    ("Miami-Dade County", f"{SITE_URL}/florida-bail-bonds/miami-dade"),
+    ("Broward County", f"{SITE_URL}/florida-bail-bonds/broward"),
+    ("Palm Beach County", f"{SITE_URL}/florida-bail-bonds/palmbeach"),
+    ("Orange County", f"{SITE_URL}/florida-bail-bonds/orange"),
+    ("Duval County", f"{SITE_URL}/florida-bail-bonds/duval"),
     
     # Previously broken pages (should now redirect)
-    ("OLD: /bail-bonds/hendry", "https://www.shamrockbailbonds.biz/bail-bonds/hendry"),
-    ("OLD: /bail-bonds/pinellas", "https://www.shamrockbailbonds.biz/bail-bonds/pinellas"),
-    ("OLD: /bail-bonds/stlucie", "https://www.shamrockbailbonds.biz/bail-bonds/stlucie"),
-    ("OLD: /bail-online", "https://www.shamrockbailbonds.biz/bail-online"),
-    ("OLD: /blank-3", "https://www.shamrockbailbonds.biz/blank-3"),
-    ("OLD: /blank", "https://www.shamrockbailbonds.biz/blank"),
-    ("OLD: /home-1", "https://www.shamrockbailbonds.biz/home-1"),
+    ("OLD: /bail-bonds/hendry", f"{SITE_URL}/bail-bonds/hendry"),
+    ("OLD: /bail-bonds/pinellas", f"{SITE_URL}/bail-bonds/pinellas"),
+    ("OLD: /bail-bonds/stlucie", f"{SITE_URL}/bail-bonds/stlucie"),
+    ("OLD: /bail-online", f"{SITE_URL}/bail-online"),
+    ("OLD: /blank-3", f"{SITE_URL}/blank-3"),
+    ("OLD: /blank", f"{SITE_URL}/blank"),
+    ("OLD: /home-1", f"{SITE_URL}/home-1"),
 ]
 
-session = requests.Session()
-session.headers.update(HEADERS)
 
-def check_url(name, url):
+def check_url(name, url, resolver):
     """Check a URL and return its status."""
-    chain = []
-    current = url
-    
-    for _ in range(10):
-        try:
-            resp = session.get(current, allow_redirects=False, timeout=15)
-            status = resp.status_code
-            
-            if 300 <= status < 400 and 'Location' in resp.headers:
-                next_url = resp.headers['Location']
-                if next_url.startswith('/'):
-                    p = urlparse(current)
-                    next_url = f"{p.scheme}://{p.netloc}{next_url}"
-                chain.append({"url": current, "status": status, "target": next_url})
-                current = next_url
-            else:
-                return {
-                    "name": name,
-                    "original_url": url,
-                    "final_url": current,
-                    "final_status": status,
-                    "hops": len(chain),
-                    "chain": chain,
-                    "result": get_result(status, len(chain), name),
-                }
-        except Exception as e:
-            return {
-                "name": name,
-                "original_url": url,
-                "final_url": current,
-                "final_status": None,
-                "hops": len(chain),
-                "chain": chain,
-                "result": f"ERROR: {e}",
-            }
-    
+    trace = resolver.resolve(url)
+    chain = [{"url": c["url"], "status": c["status_code"], "target": c["target"]}
+             for c in trace["chain"]]
+
+    if trace["error"]:
+        result = f"ERROR: {trace['error']}"
+    elif trace["loop"]:
+        result = "Redirect loop"
+    elif trace["final_status"] is None:
+        result = "Too many redirects"
+    else:
+        result = get_result(trace["final_status"], len(chain), name)
+
     return {
         "name": name,
         "original_url": url,
-        "final_url": current,
-        "final_status": None,
+        "final_url": trace["final_url"],
+        "final_status": trace["final_status"],
         "hops": len(chain),
         "chain": chain,
-        "result": "Too many redirects",
+        "result": result,
     }
 
 
@@ -127,45 +102,61 @@ def get_result(status, hops, name):
         return f"WARN - HTTP {status}"
 
 
-print("=== PHASE 4: POST-FIX VALIDATION ===\n")
-print(f"Checking {len(PRIORITY_PAGES)} priority pages...\n")
-
-results = []
-for name, url in PRIORITY_PAGES:
-    result = check_url(name, url)
-    results.append(result)
-    status_icon = "✓" if "PASS" in result["result"] else ("✗" if "FAIL" in result["result"] else "⚠")
-    print(f"  {status_icon} [{result['final_status']}] {name}")
-    if result['hops'] > 0:
-        print(f"      → {result['hops']} hop(s) → {result['final_url']}")
-    time.sleep(0.2)
-
-# Summary
-passes = sum(1 for r in results if "PASS" in r["result"])
-fails = sum(1 for r in results if "FAIL" in r["result"])
-warns = sum(1 for r in results if "WARN" in r["result"])
-
-print(f"\n=== VALIDATION SUMMARY ===")
-print(f"  PASS: {passes}/{len(results)}")
-print(f"  FAIL: {fails}/{len(results)}")
-print(f"  WARN: {warns}/{len(results)}")
-
-# Write CSV
-with open(f"{OUTPUT_DIR}/phase4_validation.csv", "w", newline="") as f:
-    writer = csv.DictWriter(f, fieldnames=["name", "original_url", "final_url", "final_status", "hops", "result"])
-    writer.writeheader()
-    for r in results:
-        writer.writerow({
-            "name": r["name"],
-            "original_url": r["original_url"],
-            "final_url": r["final_url"],
-            "final_status": r["final_status"],
-            "hops": r["hops"],
-            "result": r["result"],
-        })
-
-# Save JSON
-with open(f"{OUTPUT_DIR}/phase4_validation.json", "w") as f:
-    json.dump(results, f, indent=2)
-
-print("\nFiles written: phase4_validation.csv, phase4_validation.json")
+def main():
+    """Re-check the priority pages against the live site."""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+
+    # Paced per host instead of a fixed sleep: speeds up while the site answers
+    # quickly, backs off on 429/503 and honors robots.txt Crawl-delay.
+    limiter = RateLimiter()
+    resolver = RedirectResolver(session, max_hops=10, limiter=limiter)
+
+    print("=== PHASE 4: POST-FIX VALIDATION ===\n")
+    print(f"Checking {len(PRIORITY_PAGES)} priority pages...\n")
+    limiter.load_robots(SITE_URL, session, HEADERS["User-Agent"])
+
+    results = []
+    for name, url in PRIORITY_PAGES:
+        result = check_url(name, url, resolver)
+        results.append(result)
+        status_icon = "✓" if "PASS" in result["result"] else ("✗" if "FAIL" in result["result"] else "⚠")
+        print(f"  {status_icon} [{result['final_status']}] {name}")
+        if result['hops'] > 0:
+            print(f"      → {result['hops']} hop(s) → {result['final_url']}")
+
+    # Summary
+    passes = sum(1 for r in results if "PASS" in r["result"])
+    fails = sum(1 for r in results if "FAIL" in r["result"])
+    warns = sum(1 for r in results if "WARN" in r["result"])
+
+    print(f"\n=== VALIDATION SUMMARY ===")
+    print(f"  PASS: {passes}/{len(results)}")
+    print(f"  FAIL: {fails}/{len(results)}")
+    print(f"  WARN: {warns}/{len(results)}")
+    print(f"  {resolver.summary()}")
+    print(f"  {limiter.summary()}")
+
+    # Write CSV
+    with open(f"{OUTPUT_DIR}/phase4_validation.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["name", "original_url", "final_url", "final_status", "hops", "result"])
+        writer.writeheader()
+        for r in results:
+            writer.writerow({
+                "name": r["name"],
+                "original_url": r["original_url"],
+                "final_url": r["final_url"],
+                "final_status": r["final_status"],
+                "hops": r["hops"],
+                "result": r["result"],
+            })
+
+    # Save JSON
+    with open(f"{OUTPUT_DIR}/phase4_validation.json", "w") as f:
+        json.dump(results, f, indent=2)
+
+    print("\nFiles written: phase4_validation.csv, phase4_validation.json")
+
+
+if __name__ == "__main__":
+    main()
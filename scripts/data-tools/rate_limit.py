@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Adaptive per-host rate limiting for every tool that talks to a server.
+
+Each host gets a token bucket whose refill rate adapts to how the server
+responds (AIMD, the same scheme TCP uses for congestion control):
+
+  - fast 2xx/3xx/4xx responses raise the rate a little, up to ``max_rate``
+  - slow responses (above ``slow_seconds``) cut it by SLOW_FACTOR
+  - 429 / 503 halve it and, with a ``Retry-After`` header, pause the host
+    for the time the server asked for
+
+A robots.txt ``Crawl-delay`` caps the host's ``max_rate`` at 1/delay.  The
+blocking ``wait()`` / ``send()`` are used by the requests-based scripts and
+``wait_async()`` by the aiohttp crawler; both share the same buckets.
+"""
+
+import asyncio
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+DEFAULT_RATE = 4.0         # Requests/second per host to start with
+DEFAULT_MIN_RATE = 0.2     # Never slower than one request every 5s
+DEFAULT_MAX_RATE = 20.0    # Ceiling while the origin stays healthy
+DEFAULT_BURST = 4          # Tokens a bucket can hold
+INCREASE_STEP = 0.5        # Additive increase per fast response
+BACKOFF_FACTOR = 0.5       # Multiplicative decrease on 429/503
+SLOW_FACTOR = 0.8          # Multiplicative decrease on a slow response
+SLOW_SECONDS = 2.0         # A response slower than this counts as pushback
+MAX_RETRY_AFTER = 300      # Cap on a server-requested pause, seconds
+MAX_RETRIES = 3            # Retries of a 429/503 in send()
+RETRY_STATUSES = (429, 503)
+
+
+def retry_after_seconds(value):
+    """Parse a Retry-After header (delta-seconds or HTTP-date); None if absent/invalid."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return min(int(value), MAX_RETRY_AFTER)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return min(max(when.timestamp() - time.time(), 0.0), MAX_RETRY_AFTER)
+
+
+def crawl_delay(robots_txt, user_agent="*"):
+    """Crawl-delay for ``user_agent`` from robots.txt text, or None."""
+    parser = RobotFileParser()
+    parser.parse(robots_txt.splitlines())
+    delay = parser.crawl_delay(user_agent)
+    return float(delay) if delay is not None else None
+
+
+class _Bucket:
+    def __init__(self, rate, burst, max_rate):
+        self.rate = rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def reserve(self):
+        """Take a token; return how long the caller must wait before sending."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(delay, self.paused_until - now)
+
+
+class RateLimiter:
+    """Per-host adaptive token buckets shared by sync and async callers."""
+
+    def __init__(self, rate=DEFAULT_RATE, min_rate=DEFAULT_MIN_RATE,
+                 max_rate=DEFAULT_MAX_RATE, burst=DEFAULT_BURST,
+                 slow_seconds=SLOW_SECONDS):
+        self.rate = min(rate, max_rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.slow_seconds = slow_seconds
+        self.stats = Counter()
+        self._buckets = {}
+
+    def _bucket(self, url):
+        host = urlparse(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = _Bucket(self.rate, self.burst, self.max_rate)
+        return bucket
+
+    def set_crawl_delay(self, url, delay):
+        """Apply a robots.txt Crawl-delay to the host of ``url``."""
+        if not delay:
+            return
+        bucket = self._bucket(url)
+        bucket.max_rate = min(bucket.max_rate, 1.0 / delay)
+        bucket.rate = min(bucket.rate, bucket.max_rate)
+        bucket.burst = 1
+        bucket.tokens = min(bucket.tokens, 1.0)
+
+    def wait(self, url):
+        """Block until a request to ``url``'s host is allowed."""
+        delay = self._bucket(url).reserve()
+        if delay > 0:
+            self.stats["waits"] += 1
+            time.sleep(delay)
+
+    async def wait_async(self, url):
+        delay = self._bucket(url).reserve()
+        if delay > 0:
+            self.stats["waits"] += 1
+            await asyncio.sleep(delay)
+
+    def update(self, url, status, headers=None, elapsed=None):
+        """Adapt the host's rate to a response.
+
+        Returns the server-requested pause in seconds for a 429/503
+        (0 when no Retry-After was given), or None for any other status.
+        """
+        bucket = self._bucket(url)
+        self.stats["responses"] += 1
+        if status in RETRY_STATUSES:
+            self.stats["backoffs"] += 1
+            bucket.rate = max(self.min_rate, bucket.rate * BACKOFF_FACTOR)
+            pause = retry_after_seconds((headers or {}).get("Retry-After")) or 0.0
+            if pause:
+                bucket.paused_until = max(bucket.paused_until, time.monotonic() + pause)
+            return pause
+        if status is None or (elapsed is not None and elapsed > self.slow_seconds):
+            self.stats["slow"] += 1
+            bucket.rate = max(self.min_rate, bucket.rate * SLOW_FACTOR)
+        else:
+            bucket.rate = min(bucket.max_rate, bucket.rate + INCREASE_STEP)
+        return None
+
+    def send(self, url, request, max_retries=MAX_RETRIES):
+        """Run a blocking ``request()`` under the limiter, retrying on 429/503.
+
+        ``request`` returns ``(status, headers, value)``; the last attempt's
+        tuple is returned even if it is still a 429/503.
+        """
+        for attempt in range(max_retries + 1):
+            self.wait(url)
+            started = time.monotonic()
+            status, headers, value = request()
+            pause = self.update(url, status, headers, time.monotonic() - started)
+            if pause is None or attempt == max_retries:
+                break
+            self.stats["retries"] += 1
+        return status, headers, value
+
+    def load_robots(self, base_url, session, user_agent="*", timeout=15):
+        """Fetch robots.txt with a requests session and apply its Crawl-delay."""
+        try:
+            resp = session.get(f"{base_url}/robots.txt", timeout=timeout)
+        except Exception:
+            return None
+        if resp.status_code != 200:
+            return None
+        delay = crawl_delay(resp.text, user_agent)
+        self.set_crawl_delay(base_url, delay)
+        return delay
+
+    async def load_robots_async(self, base_url, session, user_agent="*"):
+        """Fetch robots.txt with an aiohttp session and apply its Crawl-delay."""
+        try:
+            async with session.get(f"{base_url}/robots.txt") as resp:
+                if resp.status != 200:
+                    return None
+                text = await resp.text(errors="replace")
+        except Exception:
+            return None
+        delay = crawl_delay(text, user_agent)
+        self.set_crawl_delay(base_url, delay)
+        return delay
+
+    def current_rate(self, url):
+        return self._bucket(url).rate
+
+    def summary(self):
+        rates = ", ".join(f"{host}: {b.rate:.1f}/s" for host, b in sorted(self._buckets.items()))
+        return (f"Rate limiter: {self.stats['responses']} responses, "
+                f"{self.stats['waits']} waits, {self.stats['backoffs']} backoffs, "
+                f"{self.stats['retries']} retries, {self.stats['slow']} slow "
+                f"({rates or 'no hosts'})")
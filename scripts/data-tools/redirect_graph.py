@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Redirect graph: every observed hop and proposed rule in one directed graph.
+
+build_redirect_map.py and build_final_wix_csv.py used to turn each crawled
+chain into a rule on its own, so a rule could point at another rule's
+source (a new multi-hop chain once imported into Wix) and nothing noticed
+rules that loop.  RedirectGraph instead loads
+
+  - the hops of every crawled chain (live redirects, keyed by path, so
+    http/https/apex variants of a URL are one node), plus the status each
+    chain ended on, and
+  - the proposed Wix rules, which replace a node's live redirect,
+
+and resolves every node to its final destination in one linear pass
+(each node is walked once; results are memoized).  ``flatten()`` then
+rewrites each rule to point straight at that destination and sets aside:
+
+  cycle      the rule (or the chain it joins) loops
+  live_page  the source is a live 200 page the rule would hide
+  dead_end   the destination is a 404 / error, so the rule fixes nothing
+  duplicate  a second rule for the same source with a different target
+
+Destinations that were never crawled are kept but listed as unverified.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from site_config import SITE_HOSTS
+from url_index import normalize_url
+
+# Prefixes of absolute URLs on this site; matched by slicing instead of urlparse
+SITE_ORIGINS = tuple(f"{scheme}://{host}" for scheme in ("https", "http") for host in SITE_HOSTS)
+
+
+@lru_cache(maxsize=1 << 17)
+def node_key(url):
+    """Graph node for a URL: the path (+query) on this site, else the full URL.
+
+    Cached: the same URLs come up as hops, finals and rules many times over.
+    """
+    if not url:
+        return url
+    rest = url if url.startswith("/") else None
+    for prefix in SITE_ORIGINS:
+        if rest is None and url.startswith(prefix) and url[len(prefix):len(prefix) + 1] in "/?#":
+            rest = url[len(prefix):]
+    if rest is None:
+        return normalize_url(url)
+    path, _, query = rest.partition("#")[0].partition("?")
+    path = path.rstrip("/") or "/"
+    return f"{path}?{query}" if query else path
+
+
+def is_site_node(key):
+    return key.startswith("/")
+
+
+@dataclass
+class Resolution:
+    final: Optional[str]           # Node the chain ends on (None for a cycle)
+    status: Optional[int]          # Crawled status of that node, None if unknown
+    hops: int = 0
+    cycle: Tuple[str, ...] = ()    # Nodes of the loop this chain runs into
+
+
+class RedirectGraph:
+    """Observed redirects plus proposed rules, resolved to final destinations."""
+
+    def __init__(self):
+        self.redirects = {}   # node -> target node, as crawled
+        self.status = {}      # node -> final status of a chain ending there
+        self.rules = {}       # node -> target node, proposed (wins over redirects)
+        self.duplicates = []  # (source, kept target, dropped target)
+        self._resolved = None
+
+    def add_result(self, r):
+        """Load the hops and final status of one crawl result."""
+        for hop in r.get("chain") or []:
+            source, target = node_key(hop["url"]), node_key(hop["target"])
+            if source != target:   # Scheme/host canonicalization: same page
+                self.redirects.setdefault(source, target)
+        if not r.get("loop") and r.get("final_url"):
+            final = node_key(r["final_url"])
+            status = r.get("final_status")
+            if final not in self.redirects and (status is not None or final not in self.status):
+                self.status[final] = status
+        self._resolved = None
+
+    def add_rule(self, old_url, new_url):
+        """Propose ``old_url -> new_url``; the first rule for a source wins."""
+        source, target = node_key(old_url), node_key(new_url)
+        kept = self.rules.get(source)
+        if kept is None:
+            self.rules[source] = target
+        elif kept != target:
+            self.duplicates.append((source, kept, target))
+        self._resolved = None
+
+    def next_node(self, node):
+        return self.rules.get(node) or self.redirects.get(node)
+
+    def nodes(self):
+        seen = dict.fromkeys(self.rules)
+        seen.update(dict.fromkeys(self.redirects))
+        seen.update(dict.fromkeys(self.status))
+        return list(seen)
+
+    def resolve_all(self):
+        """Resolve every node, memoized, in O(nodes + edges)."""
+        if self._resolved is not None:
+            return self._resolved
+        memo = {}
+        for start in self.nodes():
+            path, on_path = [], {}
+            node = start
+            while node not in memo:
+                if node in on_path:
+                    cycle = tuple(path[on_path[node]:])
+                    for n in cycle:
+                        memo[n] = Resolution(None, None, len(cycle), cycle)
+                    break
+                on_path[node] = len(path)
+                path.append(node)
+                nxt = self.next_node(node)
+                if nxt is None:
+                    memo[node] = Resolution(node, self.status.get(node))
+                    break
+                node = nxt
+            for n in reversed(path):
+                if n not in memo:
+                    after = memo[self.next_node(n)]
+                    memo[n] = Resolution(after.final, after.status, after.hops + 1, after.cycle)
+        self._resolved = memo
+        return memo
+
+    def resolve(self, url):
+        node = node_key(url)
+        return self.resolve_all().get(node) or Resolution(node, self.status.get(node))
+
+    def cycles(self):
+        """Every distinct redirect loop in the graph."""
+        unique = {}
+        for res in self.resolve_all().values():
+            if res.cycle:
+                unique.setdefault(frozenset(res.cycle), res.cycle)
+        return list(unique.values())
+
+    def is_live_page(self, node):
+        return self.status.get(node) == 200 and node not in self.redirects
+
+    def flatten(self):
+        """Rules rewritten to one hop each, plus what was set aside and why.
+
+        Returns ``(rows, issues)``: Wix bulk-import rows ({"Old URL",
+        "New URL"}) in rule order, and a dict of issue lists.
+        """
+        rows = []
+        issues = {"cycle": [], "live_page": [], "dead_end": [], "duplicate": [],
+                  "collapsed": [], "unverified": []}
+        for source, kept, dropped in self.duplicates:
+            issues["duplicate"].append({"source": source, "target": dropped, "kept": kept})
+
+        for source, target in self.rules.items():
+            res = self.resolve_all()[source]
+            entry = {"source": source, "target": target}
+            if res.cycle:
+                issues["cycle"].append(dict(entry, cycle=list(res.cycle)))
+            elif self.is_live_page(source):
+                issues["live_page"].append(entry)
+            elif is_site_node(res.final) and res.status is not None and res.status != 200:
+                issues["dead_end"].append(dict(entry, final=res.final, status=res.status))
+            else:
+                if res.hops > 1:
+                    issues["collapsed"].append(dict(entry, final=res.final, hops=res.hops))
+                if is_site_node(res.final) and res.status is None:
+                    issues["unverified"].append(dict(entry, final=res.final))
+                rows.append({"Old URL": source, "New URL": res.final})
+        return rows, issues
+
+    def report(self, issues):
+        """JSON-ready summary of the graph and a ``flatten()`` result."""
+        return {
+            "nodes": len(self.nodes()),
+            "observed_redirects": len(self.redirects),
+            "rules": len(self.rules),
+            "cycles": [list(c) for c in self.cycles()],
+            "issues": issues,
+        }
+
+    def summary(self, issues):
+        counts = ", ".join(f"{len(v)} {k.replace('_', ' ')}" for k, v in issues.items())
+        return (f"Redirect graph: {len(self.nodes())} nodes, {len(self.redirects)} live redirects, "
+                f"{len(self.rules)} rules, {len(self.cycles())} loops ({counts})")
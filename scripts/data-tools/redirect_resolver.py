@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Shared redirect resolution for the audit scripts.
+
+Every tool that used to walk redirect chains hop by hop (crawl_site,
+aggregate_gsc_and_build_map, redirect_checker, phase4_validation) now goes
+through RedirectResolver.  Each hop (URL -> status/Location) is cached with a
+TTL, so once a hop has been seen any later chain that reaches it continues
+from the cache: http -> https -> www prefixes and shared chain tails cost
+one request per unique hop, not one per chain.
+
+The chain walk is written once as a generator that yields URLs to fetch,
+so the same logic drives both the blocking ``resolve()`` and the crawler's
+``resolve_async()``.  An optional RateLimiter paces the blocking fetches
+per host and retries hops the server answered with 429/503.
+
+Only a hop's status and Location matter, so the blocking resolver asks with
+HEAD and falls back to a streamed GET (closed once the headers are in)
+when the origin rejects HEAD.  BODY_LIMITS caps what the crawler downloads
+per content type; bodies of non-page hops are only read when small enough
+to keep the keep-alive connection reusable.
+"""
+
+import json
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass, asdict
+from typing import Optional
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+DEFAULT_TTL = 3600   # Seconds a resolved hop stays valid
+CACHEABLE_ERRORS = (404, 410)  # Besides 2xx/3xx; 429 and 5xx are transient and never cached
+DEFAULT_MAX_HOPS = 10
+
+HEAD_UNSUPPORTED = (405, 501)      # Origin does not do HEAD at all: stop trying it
+HEAD_REJECTED = (400, 403) + HEAD_UNSUPPORTED  # Retry this hop with GET
+DRAIN_BYTES = 64 * 1024            # Smaller unwanted bodies are read to keep the connection
+BODY_LIMITS = {                    # Max bytes downloaded for a 200 page, by content type
+    "text/html": 5 * 1024 * 1024,
+    "application/xhtml+xml": 5 * 1024 * 1024,
+}
+
+
+def body_limit(content_type):
+    """Download cap for a Content-Type header value; 0 means skip the body."""
+    mime = (content_type or "").split(";")[0].strip().lower()
+    return BODY_LIMITS.get(mime, 0)
+
+
+@dataclass
+class Hop:
+    url: str
+    status: Optional[int]
+    location: Optional[str] = None  # Absolute redirect target, if any
+    error: Optional[str] = None
+    expires_at: float = 0.0
+
+
+def hop_from_response(url, status, headers):
+    """Build a Hop from a status code and response headers."""
+    location = None
+    if 300 <= status < 400 and 'Location' in headers:
+        location = urljoin(url, headers['Location'])
+    return Hop(url, status, location)
+
+
+def is_cacheable(hop):
+    """Only stable answers are cached: 2xx, 3xx, 404 and 410."""
+    return hop.error is None and hop.status is not None and (
+        200 <= hop.status < 400 or hop.status in CACHEABLE_ERRORS)
+
+
+class HopCache:
+    """URL -> Hop map with per-entry expiry, optionally persisted as JSON."""
+
+    def __init__(self, ttl=DEFAULT_TTL, path=None):
+        self.ttl = ttl
+        self.path = path
+        self._hops = {}
+        if path and os.path.exists(path):
+            self.load()
+
+    def get(self, url) -> Optional[Hop]:
+        hop = self._hops.get(url)
+        if hop is None:
+            return None
+        if hop.expires_at < time.time():
+            del self._hops[url]
+            return None
+        return hop
+
+    def put(self, hop: Hop):
+        """Cache ``hop`` for the TTL; throttled and failed responses are dropped."""
+        if not is_cacheable(hop):
+            return
+        hop.expires_at = time.time() + self.ttl
+        self._hops[hop.url] = hop
+
+    def __len__(self):
+        return len(self._hops)
+
+    def load(self):
+        with open(self.path) as f:
+            now = time.time()
+            for item in json.load(f):
+                hop = Hop(**item)
+                if hop.expires_at >= now and is_cacheable(hop):
+                    self._hops[hop.url] = hop
+
+    def save(self):
+        if not self.path:
+            return
+        with open(self.path, "w") as f:
+            json.dump([asdict(h) for h in self._hops.values()], f)
+
+
+class RedirectResolver:
+    """Resolve redirect chains through a shared hop cache."""
+
+    def __init__(self, session=None, cache=None, max_hops=DEFAULT_MAX_HOPS,
+                 timeout=15, limiter=None, head_first=True):
+        self.session = session or requests.Session()
+        self.cache = cache if cache is not None else HopCache()
+        self.max_hops = max_hops
+        self.timeout = timeout
+        self.limiter = limiter
+        self.head_first = head_first
+        self.stats = Counter()
+        self.hop_counts = Counter()
+        self._no_head_hosts = set()
+
+    def _get_headers_only(self, url):
+        """Streamed GET that stops after the headers unless the body is tiny."""
+        resp = self.session.get(url, allow_redirects=False, timeout=self.timeout, stream=True)
+        self.stats["get"] += 1
+        length = resp.headers.get("Content-Length", "")
+        if length.isdigit() and int(length) <= DRAIN_BYTES:
+            self.stats["body_bytes"] += len(resp.content)
+        resp.close()
+        return resp
+
+    def _request_hop(self, url):
+        host = urlparse(url).netloc
+        if self.head_first and host not in self._no_head_hosts:
+            resp = self.session.head(url, allow_redirects=False, timeout=self.timeout)
+            self.stats["head"] += 1
+            if resp.status_code not in HEAD_REJECTED:
+                return resp
+            if resp.status_code in HEAD_UNSUPPORTED:
+                self._no_head_hosts.add(host)
+        return self._get_headers_only(url)
+
+    def fetch_hop(self, url) -> Hop:
+        """Fetch a single hop's status and Location without following redirects."""
+        def request():
+            try:
+                resp = self._request_hop(url)
+                return resp.status_code, resp.headers, hop_from_response(url, resp.status_code, resp.headers)
+            except requests.exceptions.RequestException as e:
+                return None, None, Hop(url, None, error=str(e))
+
+        if self.limiter is None:
+            return request()[2]
+        return self.limiter.send(url, request)[2]
+
+    def _walk(self, url):
+        """Generator: yields URLs that need fetching, is sent back Hops."""
+        chain = []
+        current = url
+        seen = {url}
+        final_status = None
+        error = None
+        loop = False
+
+        for _ in range(self.max_hops):
+            hop = self.cache.get(current)
+            if hop is None:
+                hop = yield current
+                self.stats["requests"] += 1
+                self.cache.put(hop)
+            else:
+                self.stats["cache_hits"] += 1
+
+            if hop.error:
+                error = hop.error
+                break
+            if hop.location:
+                chain.append({
+                    "url": current,
+                    "status_code": hop.status,
+                    "target": hop.location
+                })
+                current = hop.location
+                if current in seen:
+                    loop = True
+                    break
+                seen.add(current)
+            else:
+                final_status = hop.status
+                break
+
+        self.stats["chains"] += 1
+        if loop:
+            self.stats["loops"] += 1
+        self.hop_counts[len(chain)] += 1
+
+        return {
+            "original_url": url,
+            "chain": chain,
+            "hops": len(chain),
+            "final_url": current,
+            "final_status": final_status,
+            "error": error,
+            "loop": loop,
+        }
+
+    def resolve(self, url):
+        """Resolve a chain, fetching uncached hops with the blocking session."""
+        walk = self._walk(url)
+        try:
+            pending = next(walk)
+            while True:
+                pending = walk.send(self.fetch_hop(pending))
+        except StopIteration as done:
+            return done.value
+
+    async def resolve_async(self, url, fetch_hop):
+        """Resolve a chain using an async ``fetch_hop(url) -> Hop`` callable."""
+        walk = self._walk(url)
+        try:
+            pending = next(walk)
+            while True:
+                pending = walk.send(await fetch_hop(pending))
+        except StopIteration as done:
+            return done.value
+
+    def summary(self):
+        hops = ", ".join(f"{n} hop(s): {c}" for n, c in sorted(self.hop_counts.items()))
+        line = (f"Redirects: {self.stats['chains']} chains resolved with "
+                f"{self.stats['requests']} requests, {self.stats['cache_hits']} cached hops, "
+                f"{self.stats['loops']} loops ({hops or 'none'})")
+        if self.stats["head"] or self.stats["get"]:
+            line += (f"; {self.stats['head']} HEAD / {self.stats['get']} GET, "
+                     f"{self.stats['body_bytes'] / 1024:.0f} KB of bodies read")
+        return line
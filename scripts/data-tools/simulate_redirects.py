@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Offline simulation of a Wix bulk redirect CSV against the last crawl.
+
+Instead of uploading wix_bulk_redirects_FINAL.csv and re-running
+phase4_validation.py against production, load the proposed rules and the
+crawled hops into a RedirectGraph (rules override the live redirect of
+their source, as they would once imported) and evaluate every known URL
+in one batch:
+
+  - crawl results (crawl_results.jsonl) and sitemap_urls.json
+  - GSC Coverage-Drilldown exports (Table.csv files under --gsc-dir)
+  - any extra URL list (--urls, one per line)
+
+Reported per URL: final destination, hops and outcome (ok / 404 /
+loop / unverified / external).  Reported per rule: shadowed (an earlier
+row has the same source, so Wix never applies it) and unused (no known
+URL reaches it).  Hops are path-level: http/https/www canonicalization
+is handled by Wix at the host and is not counted.
+
+Usage:
+  python3 scripts/data-tools/simulate_redirects.py [--csv PATH]
+      [--gsc-dir DIR] [--urls FILE]
+
+Output:
+  redirect_simulation.csv   (one row per known URL)
+  redirect_simulation.json  (summary, 404 survivors, shadowed/unused rules)
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from collections import Counter
+
+from jsonl_stream import crawl_results
+from redirect_graph import RedirectGraph, is_site_node, node_key
+from site_config import OUTPUT_DIR
+
+GSC_EXPORTS_DIR = os.path.expanduser("~/Desktop/gsc-exports")
+MAX_HOPS_OK = 1   # More than this after the import is a chain Wix still serves
+
+
+def load_rules(path):
+    """``(old, new)`` pairs of a Wix bulk redirect CSV, in file order."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return [(row["Old URL"].strip(), row["New URL"].strip())
+                for row in csv.DictReader(f) if row.get("Old URL")]
+
+
+def load_gsc_urls(gsc_dir):
+    """URLs from every GSC Coverage-Drilldown Table.csv under ``gsc_dir``."""
+    urls = []
+    if not os.path.isdir(gsc_dir):
+        return urls
+    for item in sorted(os.listdir(gsc_dir)):
+        table_path = os.path.join(gsc_dir, item, "Table.csv")
+        if "Coverage-Drilldown" in item and os.path.exists(table_path):
+            with open(table_path, encoding="utf-8") as f:
+                urls.extend(row["URL"].strip() for row in csv.DictReader(f) if row.get("URL"))
+    return urls
+
+
+class RedirectSimulator:
+    """Proposed rules layered over the crawled site, evaluated offline."""
+
+    def __init__(self, rules, results):
+        self.graph = RedirectGraph()
+        for r in results:
+            self.graph.add_result(r)
+        self.shadowed = []          # (row number, old, new, row number that wins)
+        first_row = {}
+        for row_no, (old, new) in enumerate(rules, start=2):   # Row 1 is the header
+            source = node_key(old)
+            if source in first_row:
+                self.shadowed.append((row_no, old, new, first_row[source]))
+                continue
+            first_row[source] = row_no
+            self.graph.add_rule(old, new)
+        self.rule_rows = first_row
+
+    def outcome(self, res):
+        if res.cycle:
+            return "loop"
+        if not is_site_node(res.final):
+            return "external"
+        if res.status == 200:
+            return "ok"
+        if res.status is None:
+            return "unverified"
+        return str(res.status)
+
+    def evaluate(self, urls):
+        """Resolve ``{url: sources}``; returns per-URL rows and the rules hit.
+
+        Each node is walked once across all URLs, so the batch stays linear.
+        """
+        used = set()
+        visited = set()
+        rows = []
+        for url, sources in urls.items():
+            res = self.graph.resolve(url)
+            # Mark the rules on this URL's path; stop where an earlier walk went
+            node = node_key(url)
+            while node is not None and node not in visited:
+                visited.add(node)
+                if node in self.graph.rules:
+                    used.add(node)
+                node = self.graph.next_node(node)
+            rows.append({
+                "url": url,
+                "sources": "+".join(sorted(sources)),
+                "final": res.final or "",
+                "status": res.status if res.status is not None else "",
+                "hops": res.hops,
+                "outcome": self.outcome(res),
+            })
+        return rows, used
+
+    def report(self, rows, used):
+        outcomes = Counter(row["outcome"] for row in rows)
+        unused = [{"row": self.rule_rows[s], "old": s, "new": t}
+                  for s, t in self.graph.rules.items() if s not in used]
+        return {
+            "urls": len(rows),
+            "rules": len(self.graph.rules) + len(self.shadowed),
+            "outcomes": dict(outcomes),
+            "chains": sum(1 for row in rows if row["hops"] > MAX_HOPS_OK and row["outcome"] != "loop"),
+            "survivors_404": [row for row in rows if row["outcome"] not in
+                              ("ok", "external", "unverified", "loop")],
+            "loops": [row for row in rows if row["outcome"] == "loop"],
+            "shadowed_rules": [{"row": n, "old": o, "new": t, "shadowed_by_row": w}
+                               for n, o, t, w in self.shadowed],
+            "unused_rules": unused,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate a Wix bulk redirect CSV offline")
+    parser.add_argument("--csv", default=f"{OUTPUT_DIR}/wix_bulk_redirects_FINAL.csv",
+                        help="Proposed Wix bulk redirect CSV")
+    parser.add_argument("--gsc-dir", default=GSC_EXPORTS_DIR,
+                        help="Folder of GSC Coverage-Drilldown exports (skipped if missing)")
+    parser.add_argument("--urls", default=None, help="Extra URLs to check, one per line")
+    args = parser.parse_args()
+
+    print("=== WIX REDIRECT SIMULATION ===\n")
+    started = time.perf_counter()
+
+    rules = load_rules(args.csv)
+    results = crawl_results(OUTPUT_DIR)
+
+    urls = {}
+    for r in results:
+        urls.setdefault(r["original_url"], set()).add("crawl")
+    sitemap_path = f"{OUTPUT_DIR}/sitemap_urls.json"
+    if os.path.exists(sitemap_path):
+        with open(sitemap_path) as f:
+            for url in json.load(f):
+                urls.setdefault(url, set()).add("sitemap")
+    for url in load_gsc_urls(args.gsc_dir):
+        urls.setdefault(url, set()).add("gsc")
+    if args.urls:
+        with open(args.urls) as f:
+            for url in (line.strip() for line in f):
+                if url:
+                    urls.setdefault(url, set()).add("list")
+
+    simulator = RedirectSimulator(rules, results)
+    rows, used = simulator.evaluate(urls)
+    report = simulator.report(rows, used)
+
+    print(f"Simulated {len(urls)} known URLs against {len(rules)} rules "
+          f"in {(time.perf_counter() - started) * 1000:.0f} ms")
+    print("\nOutcomes:")
+    for outcome, n in sorted(report["outcomes"].items()):
+        print(f"  {outcome}: {n}")
+    print(f"  still chained (> {MAX_HOPS_OK} hop): {report['chains']}")
+
+    print(f"\n404 survivors: {len(report['survivors_404'])}")
+    for row in report["survivors_404"][:20]:
+        print(f"  ✗ [{row['outcome']}] {row['url']} → {row['final']} ({row['sources']})")
+    if report["loops"]:
+        print(f"\nLoops: {len(report['loops'])}")
+        for row in report["loops"][:20]:
+            print(f"  ✗ {row['url']}")
+    print(f"\nShadowed rules: {len(report['shadowed_rules'])}")
+    for rule in report["shadowed_rules"][:20]:
+        print(f"  ⚠ row {rule['row']}: {rule['old']} → {rule['new']} "
+              f"(row {rule['shadowed_by_row']} wins)")
+    print(f"Unused rules: {len(report['unused_rules'])}")
+    for rule in report["unused_rules"][:20]:
+        print(f"  ⚠ row {rule['row']}: {rule['old']} → {rule['new']}")
+
+    with open(f"{OUTPUT_DIR}/redirect_simulation.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["url", "sources", "final", "status", "hops", "outcome"])
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(f"{OUTPUT_DIR}/redirect_simulation.json", "w") as f:
+        json.dump(report, f, indent=2)
+    print("\nFiles written: redirect_simulation.csv, redirect_simulation.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Site and output locations shared by the audit, crawl and SEO tools.
+
+Everything defaults to the live site.  Point the whole toolchain at another
+origin, such as the local fixture server (fixture_site.py), with
+environment variables:
+
+  SHAMROCK_SITE_URL    Site root, e.g. http://127.0.0.1:8765
+  SHAMROCK_OUTPUT_DIR  Where the redirect-audit outputs are written
+  SHAMROCK_SEARCH_API  Base URL standing in for the search-engine ping and
+                       IndexNow endpoints (bulk_index_submitter.py)
+"""
+
+import os
+from urllib.parse import urlparse
+
+SITE_URL = os.environ.get("SHAMROCK_SITE_URL", "https://www.shamrockbailbonds.biz").rstrip("/")
+SITE_SCHEME = urlparse(SITE_URL).scheme
+SITE_HOST = urlparse(SITE_URL).netloc
+APEX_HOST = SITE_HOST[4:] if SITE_HOST.startswith("www.") else SITE_HOST
+SITE_HOSTS = (SITE_HOST, APEX_HOST)
+
+OUTPUT_DIR = os.environ.get("SHAMROCK_OUTPUT_DIR", "/home/ubuntu/redirect_audit")
+SEARCH_API = os.environ.get("SHAMROCK_SEARCH_API")
+
+
+def site_url(path="/"):
+    """Absolute URL on the configured site; "/" is the homepage."""
+    return SITE_URL + path
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Streaming sitemap reader.
+
+Wix publishes a sitemap index that points at one child sitemap per content
+type (pages, blog posts, categories, ...).  ``iter_sitemap`` fetches the
+children concurrently and feeds each response body into an incremental
+XMLPullParser as it arrives, yielding ``<loc>`` / ``<lastmod>`` entries one
+at a time, so the crawler can start on the first URLs before the rest of
+the sitemap tree has downloaded.
+"""
+
+import asyncio
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from typing import Optional
+
+import aiohttp
+
+from crawl_engine import open_session
+
+DEFAULT_CONCURRENCY = 8   # Child sitemaps fetched at once
+CHUNK_SIZE = 16 * 1024
+
+
+@dataclass
+class SitemapEntry:
+    loc: str
+    lastmod: Optional[str] = None
+    source: str = ""  # Sitemap document the entry came from
+
+
+def _local(tag):
+    """Strip the XML namespace from a tag name."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _drain(parser):
+    """Yield (kind, loc, lastmod) for every completed <url>/<sitemap> element."""
+    for _, elem in parser.read_events():
+        kind = _local(elem.tag)
+        if kind not in ("url", "sitemap"):
+            continue
+        loc = lastmod = None
+        for child in elem:
+            name = _local(child.tag)
+            if name == "loc" and child.text:
+                loc = child.text.strip()
+            elif name == "lastmod" and child.text:
+                lastmod = child.text.strip()
+        elem.clear()
+        if loc:
+            yield kind, loc, lastmod
+
+
+async def _stream_document(session, url):
+    """Incrementally parse one sitemap document as its body streams in."""
+    parser = ET.XMLPullParser(events=("end",))
+    async with session.get(url) as resp:
+        if resp.status != 200:
+            print(f"Sitemap fetch error ({url}): HTTP {resp.status}")
+            return
+        async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+            parser.feed(chunk)
+            for item in _drain(parser):
+                yield item
+    parser.close()
+    for item in _drain(parser):
+        yield item
+
+
+async def iter_sitemap(session, url, concurrency=DEFAULT_CONCURRENCY):
+    """Async generator of SitemapEntry for a sitemap or sitemap index.
+
+    Child sitemaps (at any depth) are fetched concurrently; entries are
+    yielded in arrival order.
+    """
+    queue = asyncio.Queue()
+    slots = asyncio.Semaphore(concurrency)
+    done = object()
+    seen = set()
+    tasks = []
+    outstanding = 0  # Documents whose ``done`` marker has not been read yet
+
+    async def fetch(doc_url):
+        try:
+            async with slots:
+                async for kind, loc, lastmod in _stream_document(session, doc_url):
+                    if kind == "sitemap":
+                        spawn(loc)
+                    else:
+                        queue.put_nowait(SitemapEntry(loc, lastmod, doc_url))
+        except (aiohttp.ClientError, asyncio.TimeoutError, ET.ParseError) as e:
+            print(f"Sitemap fetch error ({doc_url}): {e}")
+        finally:
+            queue.put_nowait(done)
+
+    def spawn(doc_url):
+        nonlocal outstanding
+        if doc_url in seen:
+            return
+        seen.add(doc_url)
+        outstanding += 1
+        tasks.append(asyncio.create_task(fetch(doc_url)))
+
+    spawn(url)
+    try:
+        while outstanding:
+            item = await queue.get()
+            if item is done:
+                outstanding -= 1
+                continue
+            yield item
+    finally:
+        for t in tasks:
+            t.cancel()
+
+
+def read_sitemap(url, headers=None, concurrency=DEFAULT_CONCURRENCY):
+    """Blocking helper: every entry of a sitemap tree as a list."""
+    async def collect():
+        async with open_session(headers) as session:
+            return [entry async for entry in iter_sitemap(session, url, concurrency)]
+
+    return asyncio.run(collect())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Rule-based URL tagging with one compiled multi-pattern matcher.
+
+The report scripts used to decide what a URL is with lists of substring
+tests (``any(p in url for p in skip_patterns)``), repeated at every call
+site and once per category when splitting result lists.  URL_RULES maps
+each substring to a tag; UrlClassifier compiles all of them into one
+Aho-Corasick automaton, so a single scan of the URL returns every tag
+that applies.  Matching is plain substring semantics, overlaps included:
+``/blog/tags/bail`` is tagged both blog_taxonomy and blog, exactly as the
+old ``"/blog/" in url`` tests behaved.
+
+Classify a URL once and test the tag set against the groups below
+instead of re-scanning it per question.
+"""
+
+from collections import deque
+
+URL_RULES = [  # (substring, tag)
+    ("portal-landing?county=", "portal_query"),
+    ("/blog/hashtags/", "blog_taxonomy"),
+    ("/blog/tags/", "blog_taxonomy"),
+    ("/blog/categories/", "blog_category"),
+    ("/blog/archive/", "blog_pagination"),
+    ("/blog/page/", "blog_pagination"),
+    ("/blog/", "blog"),
+    ("/single-post/", "blog_post"),
+    ("/_api/", "system"),
+    ("/_functions/", "system"),
+    ("/product-page/", "product"),
+    ("/florida-bail-bonds/", "florida_bail_bonds"),
+    ("/bail-bonds/", "bail_bonds"),
+    ("/blank", "legacy"),
+    ("/home-1", "legacy"),
+    ("/bail-online", "legacy"),
+]
+
+# URLs that never get a Wix redirect rule: dynamic, Wix-managed or internal
+WIX_SKIP_TAGS = frozenset({"portal_query", "blog_taxonomy", "blog_pagination", "system", "product"})
+
+
+class UrlClassifier:
+    """Aho-Corasick automaton over (substring, tag) rules."""
+
+    def __init__(self, rules=URL_RULES):
+        self._goto = [{}]      # state -> {char: next state}
+        self._fail = [0]
+        self._out = [frozenset()]
+        for pattern, tag in rules:
+            self._insert(pattern, tag)
+        self._link()
+
+    def _insert(self, pattern, tag):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(frozenset())
+            state = nxt
+        self._out[state] = self._out[state] | {tag}
+
+    def _link(self):
+        """Failure links, folded into a full transition table (a DFA).
+
+        Each state's table also holds the transitions of its fallback, so a
+        scan is one dict lookup per character with no failure-link loop.
+        """
+        queue = deque(self._goto[0].values())   # Depth-1 states fail to the root
+        while queue:
+            state = queue.popleft()
+            fallback_moves = self._goto[self._fail[state]] if state else {}
+            for ch, nxt in list(self._goto[state].items()):
+                queue.append(nxt)
+                self._fail[nxt] = fallback_moves.get(ch, 0) if state else 0
+                self._out[nxt] = self._out[nxt] | self._out[self._fail[nxt]]
+            for ch, nxt in fallback_moves.items():
+                self._goto[state].setdefault(ch, nxt)
+
+    def tags(self, url):
+        """Every tag whose substring occurs in ``url``, from one scan.
+
+        Absolute URLs are scanned from the path on; no rule looks at the host.
+        """
+        goto, out = self._goto, self._out
+        scheme_end = url.find("://")
+        start = url.find("/", scheme_end + 3) if scheme_end >= 0 else 0
+        found = set()
+        state = 0
+        for ch in url[start:] if start > 0 else url:
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+        return found
+
+    def matches(self, url, tags):
+        """True if ``url`` carries any of ``tags``."""
+        return not self.tags(url).isdisjoint(tags)
+
+
+def classify(items, tags, key=None, classifier=None):
+    """Split ``items`` by tag in one pass: ``{tag: [item, ...], "other": [...]}``.
+
+    Only ``tags`` are grouped; an item carrying several lands in each of
+    them, and an item carrying none of them goes to "other".  ``key`` maps
+    an item to its URL (default: the item is the URL).
+    """
+    classifier = classifier or URLS
+    groups = {tag: [] for tag in tags}
+    groups["other"] = []
+    for item in items:
+        found = classifier.tags(key(item) if key else item).intersection(tags)
+        for tag in found:
+            groups[tag].append(item)
+        if not found:
+            groups["other"].append(item)
+    return groups
+
+
+# Shared instance for the default rules
+URLS = UrlClassifier()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+URL equivalence classes: which URLs collapse into which canonical.
+
+validate_canonical_sitemap.py compares each page with its own canonical
+tag, one pair at a time.  UrlClusters puts every crawled and sitemap URL
+into a union-find structure instead and merges two URLs whenever a signal
+says they are the same page:
+
+  normalization  scheme, www/apex host and trailing slash variants
+                 (each URL's normalized form is its node; raw variants are
+                 kept per node)
+  redirect       every hop of a crawled chain
+  canonical      a live page and the canonical its tag declares
+
+Union by size with path halving keeps this near-linear in the number of
+URLs.  Each resulting cluster elects one canonical (a live 200 page
+first, then the most canonical-tag votes, sitemap membership, not being
+a redirect source, the shortest URL) and is checked for signals that
+disagree, so duplicate-content problems come out as one grouped list.
+"""
+
+from collections import Counter, defaultdict
+from urllib.parse import urlparse, urlunparse
+
+from site_config import SITE_HOST, SITE_HOSTS, SITE_SCHEME
+from url_index import normalize_url
+
+CONFLICTS = {
+    "conflicting_canonicals": "Pages in the cluster declare different canonicals",
+    "canonical_redirects": "A declared canonical redirects elsewhere",
+    "canonical_not_live": "A declared canonical is not a live 200 page",
+    "redirect_canonical_disagree": "A redirect lands on a page whose canonical points elsewhere",
+    "sitemap_not_canonical": "The sitemap lists a URL other than the elected canonical",
+    "duplicate_variants": "Slash/host/scheme variants of one URL all serve 200",
+    "no_live_page": "No URL in the cluster serves a 200",
+}
+
+
+def canonical_form(url):
+    """Site URLs on the canonical scheme and host without a trailing slash."""
+    parsed = urlparse(url)
+    if parsed.netloc not in SITE_HOSTS:
+        return normalize_url(url)
+    path = parsed.path.rstrip('/') or '/'
+    return urlunparse((SITE_SCHEME, SITE_HOST, path, '', parsed.query, ''))
+
+
+class UnionFind:
+    """Disjoint sets over hashable items, union by size with path halving."""
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def add(self, item):
+        if item not in self.parent:
+            self.parent[item] = item
+            self.size[item] = 1
+
+    def find(self, item):
+        self.add(item)
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return ra
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        return ra
+
+    def groups(self):
+        members = defaultdict(list)
+        for item in self.parent:
+            members[self.find(item)].append(item)
+        return list(members.values())
+
+
+class UrlClusters:
+    """Union-find over redirect, canonical and normalization signals."""
+
+    def __init__(self, normalize=canonical_form):
+        self.normalize = normalize
+        self.uf = UnionFind()
+        self.variants = defaultdict(set)  # node -> raw URLs seen for it
+        self.live_variants = defaultdict(set)  # node -> raw URLs that served a 200 directly
+        self.status = {}                  # node -> final status seen for it
+        self.redirects = {}               # node -> node it redirects to
+        self.declared = {}                # live node -> node its canonical tag names
+        self.sitemap = set()              # nodes listed in the sitemap
+        self.edges = Counter()            # signal kind -> unions made
+
+    def node(self, url):
+        node = self.normalize(url)
+        self.variants[node].add(url)
+        self.uf.add(node)
+        return node
+
+    def link(self, a, b, kind):
+        self.edges[kind] += 1
+        self.uf.union(a, b)
+
+    def add_result(self, r):
+        """Load one crawl result: its redirect hops, final status and canonical."""
+        for hop in r.get("chain") or []:
+            source, target = self.node(hop["url"]), self.node(hop["target"])
+            if source != target:
+                self.redirects[source] = target
+                self.link(source, target, "redirect")
+        if r.get("loop") or not r.get("final_url"):
+            self.node(r["original_url"])
+            return
+        final = self.node(r["final_url"])
+        if r.get("final_status") is not None:
+            self.status[final] = r["final_status"]
+        if r.get("final_status") == 200:
+            self.live_variants[final].add(r["final_url"])
+            canonical = r.get("canonical")
+            if canonical:
+                target = self.node(canonical)
+                self.declared[final] = target
+                if target != final:
+                    self.link(final, target, "canonical")
+
+    def add_sitemap(self, urls):
+        for url in urls:
+            self.sitemap.add(self.node(url))
+
+    def is_live(self, node):
+        return self.status.get(node) == 200 and node not in self.redirects
+
+    def elect(self, nodes):
+        """The cluster's canonical: live first, then tag votes, sitemap, shortest."""
+        votes = Counter(self.declared[n] for n in nodes if n in self.declared)
+        return max(nodes, key=lambda n: (self.is_live(n), votes[n], n in self.sitemap,
+                                         n not in self.redirects, -len(n), n))
+
+    def conflicts(self, nodes, elected, targets):
+        """Conflict kinds (CONFLICTS keys) for one cluster; ``targets`` are redirect targets."""
+        found = []
+        canonicals = {self.declared[n] for n in nodes if n in self.declared and self.is_live(n)}
+        if len(canonicals) > 1:
+            found.append("conflicting_canonicals")
+        if any(c in self.redirects for c in canonicals):
+            found.append("canonical_redirects")
+        if any(c not in self.redirects and not self.is_live(c) for c in canonicals):
+            found.append("canonical_not_live")
+        if any(n in targets and self.declared.get(n, n) != n for n in nodes):
+            found.append("redirect_canonical_disagree")
+        if any(n in self.sitemap and n != elected for n in nodes):
+            found.append("sitemap_not_canonical")
+        if any(len(self.live_variants[n]) > 1 for n in nodes):
+            found.append("duplicate_variants")
+        if not any(self.is_live(n) for n in nodes):
+            found.append("no_live_page")
+        return found
+
+    def clusters(self, min_size=2):
+        """Every cluster with ``min_size`` nodes or a conflict, largest first."""
+        result = []
+        targets = set(self.redirects.values())
+        for nodes in self.uf.groups():
+            elected = self.elect(nodes)
+            conflicts = self.conflicts(nodes, elected, targets)
+            if len(nodes) < min_size and not (set(conflicts) - {"no_live_page"}):
+                continue
+            result.append({
+                "canonical": elected,
+                "size": len(nodes),
+                "members": sorted(nodes),
+                "variants": sorted(v for n in nodes for v in self.variants[n]),
+                "in_sitemap": sorted(n for n in nodes if n in self.sitemap),
+                "declared": {n: self.declared[n] for n in sorted(nodes) if n in self.declared},
+                "conflicts": conflicts,
+            })
+        result.sort(key=lambda c: (-len(c["conflicts"]), -c["size"], c["canonical"]))
+        return result
+
+    def summary(self, clusters):
+        conflicted = [c for c in clusters if c["conflicts"]]
+        kinds = Counter(k for c in conflicted for k in c["conflicts"])
+        detail = ", ".join(f"{k}: {n}" for k, n in kinds.most_common())
+        return (f"URL clusters: {len(self.uf.parent)} URLs in {len(self.uf.groups())} classes "
+                f"({self.edges['redirect']} redirect, {self.edges['canonical']} canonical links); "
+                f"{len(conflicted)} with conflicting signals" + (f" ({detail})" if detail else ""))
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Hashed URL index shared by the crawl and audit scripts.
+
+Each URL is normalized exactly once on insert and stored under its raw
+form, its normalized form and its path, so membership tests and lookups are
+O(1) no matter how many sitemap or blog URLs the site grows to.
+"""
+
+from urllib.parse import urlparse, urlunparse
+
+from site_config import SITE_HOST, SITE_SCHEME
+
+
+def normalize_url(url):
+    """Normalize URL to remove trailing slashes and fragments."""
+    parsed = urlparse(url)
+    path = parsed.path.rstrip('/') or '/'
+    return urlunparse((parsed.scheme, parsed.netloc, path, '', parsed.query, ''))
+
+
+def site_normalize(url):
+    """Collapse scheme, host, trailing slash and query onto the canonical site URL."""
+    path = urlparse(url).path.rstrip('/') or '/'
+    return urlunparse((SITE_SCHEME, SITE_HOST, path, '', '', ''))
+
+
+def url_path(url):
+    """Path plus query string, as used in Wix redirect rules."""
+    p = urlparse(url)
+    path = p.path
+    if p.query:
+        path += f"?{p.query}"
+    return path or "/"
+
+
+class UrlIndex:
+    """URL -> value map addressable by raw URL, normalized URL or path."""
+
+    def __init__(self, urls=(), normalize=normalize_url):
+        self.normalize = normalize
+        self._raw = {}
+        self._norm = {}
+        self._path = {}
+        for url in urls:
+            self.add(url)
+
+    def add(self, url, value=None):
+        """Index ``url``; later entries win on key collisions, like a dict."""
+        self._raw[url] = value
+        self._norm[self.normalize(url)] = value
+        self._path.setdefault(urlparse(url).path.rstrip('/') or '/', []).append(url)
+
+    def __contains__(self, url):
+        return url in self._raw or self.normalize(url) in self._norm
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def get(self, url, default=None):
+        """Look up by raw URL first, then by normalized URL."""
+        if url in self._raw:
+            return self._raw[url]
+        return self._norm.get(self.normalize(url), default)
+
+    def has_normalized(self, norm_url):
+        """Membership test for a URL that is already normalized."""
+        return norm_url in self._norm
+
+    def urls_for_path(self, path):
+        """All indexed raw URLs sharing a path (any host, scheme or slash)."""
+        return self._path.get(path.rstrip('/') or '/', [])
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Declarative SEO audit rules, dispatched during the one HTML parser pass.
+
+Each check in seo_auditor.py is a Rule class that declares the parser
+events it needs instead of re-walking extracted data:
+
+  tags        start tags whose attributes it receives (``on_tag``)
+  text        elements whose text it receives when they close (``on_text``);
+              a region may filter on one attribute: 'script[type="application/ld+json"]'
+  page_types  page types it applies to (empty: all)
+
+RuleSet compiles the rules into one dispatch table per page type (tag ->
+handlers, tag -> text regions), and SEOHTMLParser consults only that
+table while it streams the page, so adding checks adds dict entries, not
+passes over the HTML.  After the pass each rule's ``finish`` runs in rule
+order and writes AuditResult fields and messages into a RuleReport; a rule
+may read fields set by the rules before it (CountySchemaRule reads the
+JSON-LD flags).
+
+To add a check: subclass Rule, declare its events, append it to RULES.
+"""
+
+import hashlib
+import inspect
+import json
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, List
+
+# tag or tag[attr="value"]
+REGION_RE = re.compile(r'^(\w+)(?:\[([\w:-]+)="([^"]*)"\])?$')
+
+
+@dataclass
+class PageContext:
+    url: str
+    page_type: str
+
+
+@dataclass
+class RuleReport:
+    """Picklable output of one audited page: AuditResult fields plus messages."""
+    fields: Dict[str, object] = field(default_factory=dict)
+    errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    parse_seconds: float = 0.0
+
+    def error(self, message):
+        self.errors.append(message)
+
+    def warn(self, message):
+        self.warnings.append(message)
+
+
+class Rule:
+    """One check; a fresh instance is made for every page."""
+    tags = ()
+    text = ()
+    page_types = ()
+
+    def on_tag(self, tag, attrs):
+        pass
+
+    def on_text(self, tag, attrs, text):
+        pass
+
+    def finish(self, page, report):
+        pass
+
+
+# ─── Built-in rules ───────────────────────────────────────────────────────────
+class TitleRule(Rule):
+    text = ("title",)
+    MIN, MAX = 30, 65
+
+    def __init__(self):
+        self.title = ""
+
+    def on_text(self, tag, attrs, text):
+        self.title += text
+
+    def finish(self, page, report):
+        title = self.title.strip()
+        report.fields.update(title=title, title_length=len(title))
+        if not title:
+            report.error("Missing <title>")
+        elif len(title) < self.MIN:
+            report.warn(f"Title too short ({len(title)} chars)")
+        elif len(title) > self.MAX:
+            report.warn(f"Title too long ({len(title)} chars)")
+
+
+class MetaDescriptionRule(Rule):
+    tags = ("meta",)
+    MIN, MAX = 50, 160
+
+    def __init__(self):
+        self.description = ""
+
+    def on_tag(self, tag, attrs):
+        if (attrs.get("name") or "").lower() == "description":
+            self.description = attrs.get("content") or ""
+
+    def finish(self, page, report):
+        length = len(self.description)
+        report.fields.update(meta_description=self.description, desc_length=length)
+        if not self.description:
+            report.error("Missing meta description")
+        elif length < self.MIN:
+            report.warn(f"Meta desc too short ({length} chars)")
+        elif length > self.MAX:
+            report.warn(f"Meta desc too long ({length} chars)")
+
+
+class CanonicalRule(Rule):
+    tags = ("link",)
+
+    def __init__(self):
+        self.canonical = ""
+
+    def on_tag(self, tag, attrs):
+        if not self.canonical and "canonical" in (attrs.get("rel") or "").lower().split():
+            self.canonical = attrs.get("href") or ""
+
+    def finish(self, page, report):
+        report.fields["canonical"] = self.canonical
+        if not self.canonical:
+            report.warn("Missing canonical URL")
+        elif self.canonical != page.url and self.canonical != page.url.rstrip("/"):
+            report.warn(f"Canonical mismatch: {self.canonical}")
+
+
+class RobotsRule(Rule):
+    tags = ("meta",)
+
+    def __init__(self):
+        self.robots = ""
+
+    def on_tag(self, tag, attrs):
+        if (attrs.get("name") or "").lower() == "robots":
+            self.robots = attrs.get("content") or ""
+
+    def finish(self, page, report):
+        report.fields["robots"] = self.robots
+        if "noindex" in self.robots.lower():
+            report.error("Page is set to noindex!")
+
+
+class H1Rule(Rule):
+    text = ("h1",)
+
+    def __init__(self):
+        self.count = 0
+
+    def on_text(self, tag, attrs, text):
+        if text.strip():
+            self.count += 1
+
+    def finish(self, page, report):
+        report.fields["h1_count"] = self.count
+        if self.count == 0:
+            report.warn("No H1 tag found")
+        elif self.count > 1:
+            report.warn(f"Multiple H1 tags ({self.count})")
+
+
+class OpenGraphRule(Rule):
+    tags = ("meta",)
+    REQUIRED = ("og:title", "og:description", "og:image")
+
+    def __init__(self):
+        self.props = set()
+
+    def on_tag(self, tag, attrs):
+        prop = (attrs.get("property") or "").lower()
+        if prop.startswith("og:") and (attrs.get("name") or "").lower() not in ("description", "robots"):
+            self.props.add(prop)
+
+    def finish(self, page, report):
+        report.fields.update(og_title="og:title" in self.props,
+                             og_description="og:description" in self.props,
+                             og_image="og:image" in self.props,
+                             og_url="og:url" in self.props)
+        missing = [p for p in self.REQUIRED if p not in self.props]
+        if missing:
+            report.warn(f"Missing OG tags: {', '.join(missing)}")
+
+
+class JsonLdRule(Rule):
+    text = ('script[type="application/ld+json"]',)
+
+    def __init__(self):
+        self.blocks = []
+
+    def on_text(self, tag, attrs, text):
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            return
+        if isinstance(data, list):
+            self.blocks.extend(data)
+        else:
+            self.blocks.append(data)
+
+    def finish(self, page, report):
+        all_types = []
+        for schema in self.blocks:
+            if not isinstance(schema, dict):
+                continue
+            for item in [schema] + list(schema.get("@graph", [])):
+                if not isinstance(item, dict):
+                    continue
+                t = item.get("@type", "")
+                all_types.extend(t if isinstance(t, list) else [t])
+
+        report.fields.update(
+            json_ld_count=len(self.blocks),
+            json_ld_types=", ".join(set(all_types)) if all_types else "",
+            has_organization="Organization" in all_types,
+            has_local_business=any(t in all_types for t in ["LocalBusiness", "BailBondBusiness"]),
+            has_faq="FAQPage" in all_types,
+            has_breadcrumb="BreadcrumbList" in all_types,
+            has_service="Service" in all_types,
+        )
+        if not all_types:
+            report.warn("No JSON-LD structured data")
+
+
+class CountySchemaRule(Rule):
+    """County pages need LocalBusiness, FAQ and Breadcrumb schema (from JsonLdRule)."""
+    page_types = ("county",)
+
+    def finish(self, page, report):
+        if not report.fields.get("has_local_business"):
+            report.error("Missing LocalBusiness schema (county page)")
+        if not report.fields.get("has_faq"):
+            report.warn("Missing FAQPage schema (county page)")
+        if not report.fields.get("has_breadcrumb"):
+            report.warn("Missing BreadcrumbList schema (county page)")
+
+
+class InlineAssetRule(Rule):
+    """Inline <script> and <style> blocks, which every page view downloads and parses.
+
+    JSON-LD is data, not script, and is left to JsonLdRule.  Only measured:
+    the report checks the totals against PERF_BUDGETS.
+    """
+    text = ("script", "style")
+
+    def __init__(self):
+        self.scripts = self.script_bytes = self.styles = self.style_bytes = 0
+
+    def on_text(self, tag, attrs, text):
+        size = len(text.encode("utf-8", errors="replace"))
+        if tag == "style":
+            self.styles += 1
+            self.style_bytes += size
+        elif "src" not in attrs and attrs.get("type") != "application/ld+json":
+            self.scripts += 1
+            self.script_bytes += size
+
+    def finish(self, page, report):
+        report.fields.update(inline_scripts=self.scripts, inline_script_bytes=self.script_bytes,
+                             inline_styles=self.styles, inline_style_bytes=self.style_bytes)
+
+
+RULES = [TitleRule, MetaDescriptionRule, CanonicalRule, RobotsRule, H1Rule,
+         OpenGraphRule, JsonLdRule, CountySchemaRule, InlineAssetRule]
+
+
+# ─── Engine ───────────────────────────────────────────────────────────────────
+class RuleSet:
+    """Rules compiled into per-page-type dispatch tables."""
+
+    def __init__(self, rules=RULES):
+        self.rules = list(rules)
+        for rule in self.rules:
+            for region in rule.text:
+                if not REGION_RE.match(region):
+                    raise ValueError(f"{rule.__name__}: bad text region {region!r}")
+        self._tables = {}
+        self._version = None
+
+    @property
+    def version(self):
+        """Hash of the rule list and the source of the modules defining it.
+
+        Cached audit results are only reused under the same version, so
+        editing any rule (or adding one) re-audits every page.
+        """
+        if self._version is None:
+            digest = hashlib.sha256()
+            modules = dict.fromkeys(sys.modules[r.__module__] for r in self.rules)
+            for module in (sys.modules[__name__],) + tuple(modules):
+                digest.update(inspect.getsource(module).encode())
+            digest.update(",".join(r.__qualname__ for r in self.rules).encode())
+            self._version = digest.hexdigest()[:16]
+        return self._version
+
+    def table(self, page_type):
+        """``(rules, {tag: [rule index]}, {tag: [(attr, value, rule index)]})``, cached."""
+        if page_type not in self._tables:
+            rules = [r for r in self.rules if not r.page_types or page_type in r.page_types]
+            tags, regions = {}, {}
+            for i, rule in enumerate(rules):
+                for tag in rule.tags:
+                    tags.setdefault(tag, []).append(i)
+                for region in rule.text:
+                    tag, attr, value = REGION_RE.match(region).groups()
+                    regions.setdefault(tag, []).append((attr, value, i))
+            self._tables[page_type] = (rules, tags, regions)
+        return self._tables[page_type]
+
+    def audit(self, html, url, page_type):
+        """Run every applicable rule over ``html`` in one parser pass."""
+        started = time.perf_counter()
+        rules, tags, regions = self.table(page_type)
+        instances = [rule() for rule in rules]
+        parser = SEOHTMLParser(
+            {tag: [instances[i].on_tag for i in idx] for tag, idx in tags.items()},
+            {tag: [(attr, value, instances[i].on_text) for attr, value, i in entries]
+             for tag, entries in regions.items()})
+        parser.feed(html)
+        parser.close()
+
+        report = RuleReport()
+        page = PageContext(url, page_type)
+        for rule in instances:
+            rule.finish(page, report)
+        report.parse_seconds = time.perf_counter() - started
+        return report
+
+
+class SEOHTMLParser(HTMLParser):
+    """Streaming parser that feeds tags and text regions to the rules that asked for them."""
+
+    def __init__(self, on_tag, regions):
+        super().__init__()
+        self._on_tag = on_tag      # tag -> [on_tag handler]
+        self._regions = regions    # tag -> [(attr, value, on_text handler)]
+        self._open = []            # [tag, attrs, handlers, text chunks] of open regions
+
+    def handle_starttag(self, tag, attrs):
+        handlers = self._on_tag.get(tag)
+        regions = self._regions.get(tag)
+        if not handlers and not regions:
+            return
+        attrs = dict(attrs)
+        if handlers:
+            for handler in handlers:
+                handler(tag, attrs)
+        if regions:
+            wanted = [h for attr, value, h in regions if attr is None or attrs.get(attr) == value]
+            if wanted:
+                self._open.append([tag, attrs, wanted, []])
+
+    def handle_endtag(self, tag):
+        if not self._open or tag not in self._regions:
+            return
+        for i in range(len(self._open) - 1, -1, -1):
+            if self._open[i][0] == tag:
+                _, attrs, handlers, chunks = self._open.pop(i)
+                text = "".join(chunks)
+                for handler in handlers:
+                    handler(tag, attrs, text)
+                return
+
+    def handle_data(self, data):
+        for region in self._open:
+            region[3].append(data)
+
+
+# Shared instance for the default rules
+AUDIT_RULES = RuleSet()
+
+
+def audit_html(payload):
+    """``(html, url, page_type)`` -> RuleReport; safe to run in a worker process."""
+    html, url, page_type = payload
+    return AUDIT_RULES.audit(html, url, page_type)
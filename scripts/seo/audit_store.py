@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Persistent SEO audit store for incremental audits and run-to-run diffs.
+
+Keeps, per audited page, the rule output (RuleReport) keyed by URL, page
+type, body hash and rule-set version.  The next run still fetches every
+page but reuses the stored report when the body and the rules are both
+unchanged, so it skips the parse entirely.  Editing audit_rules.py changes
+the version and re-audits everything.
+
+Each run's messages are also recorded per URL, and every result is diffed
+against the last earlier run that audited its URL: new, resolved and
+changed errors and warnings.  URLs the new run did not audit (a --sample
+run) are left out rather than reported as resolved.  The previous row is
+looked up per URL and the diff rows are stored with the run, so neither
+side of the diff is held in memory; ``diff_rows`` reads them back sorted.
+"""
+
+import json
+import re
+import sqlite3
+import time
+from dataclasses import asdict
+from typing import Optional
+
+from audit_rules import RuleReport
+from crawl_cache import COMMIT_EVERY
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS audits (
+    url         TEXT,
+    page_type   TEXT,
+    body_hash   TEXT,
+    ruleset     TEXT,
+    report      TEXT,
+    audited_at  REAL,
+    PRIMARY KEY (url, page_type)
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at  REAL,
+    ruleset     TEXT,
+    pages       INTEGER
+);
+CREATE TABLE IF NOT EXISTS run_pages (
+    run_id      INTEGER,
+    url         TEXT,
+    status      INTEGER,
+    errors      TEXT,
+    warnings    TEXT,
+    PRIMARY KEY (run_id, url)
+);
+CREATE INDEX IF NOT EXISTS run_pages_url ON run_pages (url, run_id);
+CREATE TABLE IF NOT EXISTS run_diffs (
+    run_id      INTEGER,
+    url         TEXT,
+    severity    TEXT,
+    change      TEXT,
+    issue       TEXT,
+    was         TEXT
+);
+CREATE INDEX IF NOT EXISTS run_diffs_run ON run_diffs (run_id);
+"""
+
+STORE_FILE = "seo_audit_store.sqlite"
+KEEP_RUNS = 30  # Runs whose per-URL messages are kept for diffs
+
+# Issue kind of a message: details in parentheses, after a colon and numbers dropped
+ISSUE_KIND_RE = re.compile(r"\s*(\(.*\)|:.*)$")
+
+
+def issue_kind(message):
+    """``"Title too long (70 chars)"`` -> ``"Title too long"``, so a new length is a change."""
+    return re.sub(r"\d+", "#", ISSUE_KIND_RE.sub("", message))
+
+
+class AuditStore:
+    """SQLite-backed audit cache and run history for one rule-set version."""
+
+    def __init__(self, path, ruleset, reuse=True):
+        self.path = path
+        self.ruleset = ruleset
+        self.reuse = reuse
+        self._db = sqlite3.connect(path)
+        self._db.executescript(SCHEMA)
+        self.stats = {"reused": 0, "audited": 0}
+        self.run_id = None
+        self._run_pages = 0
+
+    def get(self, url, page_type, digest) -> Optional[RuleReport]:
+        """The stored report for this exact body under the current rules, if any."""
+        if not self.reuse:
+            return None
+        row = self._db.execute(
+            "SELECT report FROM audits WHERE url = ? AND page_type = ? AND body_hash = ? AND ruleset = ?",
+            (url, page_type, digest, self.ruleset),
+        ).fetchone()
+        if not row:
+            return None
+        self.stats["reused"] += 1
+        report = RuleReport(**json.loads(row[0]))
+        report.parse_seconds = 0.0  # Not parsed this run
+        return report
+
+    def put(self, url, page_type, digest, report: RuleReport):
+        self.stats["audited"] += 1
+        self._db.execute(
+            "INSERT OR REPLACE INTO audits VALUES (?, ?, ?, ?, ?, ?)",
+            (url, page_type, digest, self.ruleset, json.dumps(asdict(report)), time.time()),
+        )
+
+    def previous(self, url):
+        """``(status, errors, warnings)`` from the last earlier run that audited ``url``."""
+        row = self._db.execute(
+            "SELECT status, errors, warnings FROM run_pages WHERE url = ? AND run_id < ? "
+            "ORDER BY run_id DESC LIMIT 1",
+            (url, self.run_id),
+        ).fetchone()
+        if not row:
+            return None
+        status, errors, warnings = row
+        return status, json.loads(errors), json.loads(warnings)
+
+    def start_run(self, started_at):
+        """Open a run whose pages are then recorded one by one as they complete."""
+        cur = self._db.execute("INSERT INTO runs (started_at, ruleset, pages) VALUES (?, ?, 0)",
+                               (started_at, self.ruleset))
+        self.run_id = cur.lastrowid
+        self._run_pages = 0
+        return self.run_id
+
+    def record_page(self, r):
+        """Store one result's status, messages and diff under the open run.
+
+        Returns True when an earlier run audited the URL (it was compared).
+        """
+        previous = self.previous(r.url)
+        if previous:
+            self._db.executemany(
+                "INSERT INTO run_diffs VALUES (?, ?, ?, ?, ?, ?)",
+                [(self.run_id, d["URL"], d["Severity"], d["Change"], d["Issue"], d["Was"])
+                 for d in diff_result(previous, r)],
+            )
+        self._db.execute(
+            "INSERT OR REPLACE INTO run_pages VALUES (?, ?, ?, ?, ?)",
+            (self.run_id, r.url, r.status_code, json.dumps(r.errors), json.dumps(r.warnings)),
+        )
+        self._run_pages += 1
+        if self._run_pages % COMMIT_EVERY == 0:
+            self._db.commit()
+        return previous is not None
+
+    def diff_counts(self):
+        """{(severity, change): rows} for the open run's diff."""
+        return {(severity, change): n for severity, change, n in self._db.execute(
+            "SELECT severity, change, COUNT(*) FROM run_diffs WHERE run_id = ? "
+            "GROUP BY severity, change", (self.run_id,))}
+
+    def diff_rows(self):
+        """The open run's diff rows: errors first, then new, changed, resolved, by URL."""
+        cur = self._db.execute(
+            "SELECT url, severity, change, issue, was FROM run_diffs WHERE run_id = ? "
+            "ORDER BY severity != 'error', "
+            "CASE change WHEN 'new' THEN 0 WHEN 'changed' THEN 1 ELSE 2 END, url, rowid",
+            (self.run_id,))
+        for url, severity, change, issue, was in cur:
+            yield {"URL": url, "Severity": severity, "Change": change, "Issue": issue, "Was": was}
+
+    def finish_run(self):
+        """Close the open run and prune runs older than KEEP_RUNS."""
+        self._db.execute("UPDATE runs SET pages = ? WHERE id = ?", (self._run_pages, self.run_id))
+        self._db.execute("DELETE FROM run_pages WHERE run_id <= ?", (self.run_id - KEEP_RUNS,))
+        self._db.execute("DELETE FROM run_diffs WHERE run_id <= ?", (self.run_id - KEEP_RUNS,))
+        self._db.execute("DELETE FROM runs WHERE id <= ?", (self.run_id - KEEP_RUNS,))
+        self._db.commit()
+        return self.run_id
+
+    def summary(self):
+        total = sum(self.stats.values())
+        rate = int(self.stats["reused"] / total * 100) if total else 0
+        return (f"Audit store: {self.stats['reused']}/{total} parsed pages reused ({rate}%), "
+                f"{self.stats['audited']} audited (rules {self.ruleset})")
+
+    def close(self):
+        self._db.commit()
+        self._db.close()
+
+
+def diff_messages(url, severity, before, after):
+    """Diff rows for one URL's messages of one severity."""
+    rows = []
+    old = {issue_kind(m): m for m in before}
+    new = {issue_kind(m): m for m in after}
+    for kind, message in new.items():
+        if kind not in old:
+            rows.append({"URL": url, "Severity": severity, "Change": "new", "Issue": message, "Was": ""})
+        elif old[kind] != message:
+            rows.append({"URL": url, "Severity": severity, "Change": "changed", "Issue": message,
+                         "Was": old[kind]})
+    for kind, message in old.items():
+        if kind not in new:
+            rows.append({"URL": url, "Severity": severity, "Change": "resolved", "Issue": message, "Was": ""})
+    return rows
+
+
+def diff_result(previous, r):
+    """Diff rows for one result against its ``previous`` row (AuditStore.previous).
+
+    A URL with no earlier run is baselined, not reported as all-new.
+    """
+    if previous is None:
+        return []
+    _, errors, warnings = previous
+    return (diff_messages(r.url, "error", errors, r.errors)
+            + diff_messages(r.url, "warning", warnings, r.warnings))
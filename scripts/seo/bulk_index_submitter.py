@@ -37,11 +37,18 @@ except ImportError:
     import urllib.request
     import urllib.error
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data-tools"))
+from rate_limit import RateLimiter
+from site_config import SEARCH_API, SITE_HOST, SITE_URL
+
 # ─── Configuration ────────────────────────────────────────────────────────────
-SITE_URL = "https://www.shamrockbailbonds.biz"
-SITE_HOST = "www.shamrockbailbonds.biz"
 LAST_MOD = datetime.now().strftime("%Y-%m-%d")
 
+# Submission endpoints (SHAMROCK_SEARCH_API swaps in a local stand-in)
+GOOGLE_PING_URL = f"{SEARCH_API}/google/ping" if SEARCH_API else "https://www.google.com/ping"
+BING_PING_URL = f"{SEARCH_API}/bing/ping" if SEARCH_API else "https://www.bing.com/ping"
+INDEXNOW_URL = f"{SEARCH_API}/indexnow" if SEARCH_API else "https://api.indexnow.org/indexnow"
+
 # IndexNow key (we'll generate one if needed)
 INDEXNOW_KEY = None  # Will be auto-generated
 
@@ -154,33 +161,49 @@ def generate_sitemap_xml(urls):
 
 
 # ─── HTTP Helper ──────────────────────────────────────────────────────────────
+# Shared by every submission so a 429/503 from a search engine is retried
+# after the Retry-After it asked for instead of being reported as a failure.
+LIMITER = RateLimiter()
+
+
+def _urllib_send(req):
+    try:
+        with urllib.request.urlopen(req, timeout=15) as resp:
+            return resp.status, resp.headers, resp.read(200).decode()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read(200).decode(errors="replace")
+
+
 def http_get(url):
     """Make an HTTP GET request."""
-    try:
+    def request():
         if HAS_REQUESTS:
             resp = requests.get(url, timeout=15)
-            return resp.status_code, resp.text[:200]
-        else:
-            req = urllib.request.Request(url)
-            with urllib.request.urlopen(req, timeout=15) as resp:
-                return resp.status, resp.read(200).decode()
+            return resp.status_code, resp.headers, resp.text[:200]
+        return _urllib_send(urllib.request.Request(url))
+
+    try:
+        status, _, body = LIMITER.send(url, request)
+        return status, body
     except Exception as e:
         return 0, str(e)[:200]
 
 
 def http_post_json(url, data):
     """Make an HTTP POST request with JSON body."""
-    try:
+    def request():
         if HAS_REQUESTS:
             resp = requests.post(url, json=data, timeout=15,
                                headers={"Content-Type": "application/json"})
-            return resp.status_code, resp.text[:200]
-        else:
-            json_data = json.dumps(data).encode("utf-8")
-            req = urllib.request.Request(url, data=json_data, method="POST")
-            req.add_header("Content-Type", "application/json")
-            with urllib.request.urlopen(req, timeout=15) as resp:
-                return resp.status, resp.read(200).decode()
+            return resp.status_code, resp.headers, resp.text[:200]
+        json_data = json.dumps(data).encode("utf-8")
+        req = urllib.request.Request(url, data=json_data, method="POST")
+        req.add_header("Content-Type", "application/json")
+        return _urllib_send(req)
+
+    try:
+        status, _, body = LIMITER.send(url, request)
+        return status, body
     except Exception as e:
         return 0, str(e)[:200]
 
@@ -189,7 +212,7 @@ def http_post_json(url, data):
 def ping_google_sitemap(dry_run=False):
     """Ping Google to re-crawl the sitemap."""
     sitemap_url = f"{SITE_URL}/sitemap.xml"
-    ping_url = f"https://www.google.com/ping?sitemap={quote(sitemap_url, safe='')}"
+    ping_url = f"{GOOGLE_PING_URL}?sitemap={quote(sitemap_url, safe='')}"
 
     if dry_run:
         return "DRY_RUN", f"Would ping: {ping_url}"
@@ -201,7 +224,7 @@ def ping_google_sitemap(dry_run=False):
 def ping_bing_sitemap(dry_run=False):
     """Ping Bing to re-crawl the sitemap."""
     sitemap_url = f"{SITE_URL}/sitemap.xml"
-    ping_url = f"https://www.bing.com/ping?sitemap={quote(sitemap_url, safe='')}"
+    ping_url = f"{BING_PING_URL}?sitemap={quote(sitemap_url, safe='')}"
 
     if dry_run:
         return "DRY_RUN", f"Would ping: {ping_url}"
@@ -230,7 +253,7 @@ def submit_indexnow(urls, dry_run=False):
         return "DRY_RUN", f"Would submit {len(url_list)} URLs via IndexNow", INDEXNOW_KEY
 
     # Submit to IndexNow (shared across Bing, Yandex, etc.)
-    status, body = http_post_json("https://api.indexnow.org/indexnow", payload)
+    status, body = http_post_json(INDEXNOW_URL, payload)
     return status, body, INDEXNOW_KEY
 
 
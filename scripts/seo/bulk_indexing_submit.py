@@ -27,7 +27,9 @@ QUOTA:
 ------
 Default: 200 URLs/day
 All 119 URLs fit within a single day's quota.
-Rate limit: ~60 requests/minute (script throttles automatically)
+Rate limit: adaptive — starts at 1 request/second, speeds up to
+INDEXING_MAX_RATE while Google answers quickly, and backs off (honoring
+Retry-After) on 429/503 responses, which are retried automatically
 
 WHAT THIS DOES:
 ---------------
@@ -37,7 +39,6 @@ WHAT THIS DOES:
 """
 
 import json
-import time
 import sys
 import os
 from datetime import datetime
@@ -57,10 +58,15 @@ except ImportError:
     from google.oauth2 import service_account
     import requests as req_lib
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data-tools"))
+from rate_limit import RateLimiter
+
 # ── Configuration ─────────────────────────────────────────────────────────────
 SERVICE_ACCOUNT_FILE = "service_account.json"  # Path to your downloaded JSON key
 INDEXING_API_ENDPOINT = "https://indexing.googleapis.com/v3/urlNotifications:publish"
 SCOPES = ["https://www.googleapis.com/auth/indexing"]
+INDEXING_START_RATE = 1.0  # Requests/second before any feedback
+INDEXING_MAX_RATE = 5.0    # Well under the API's per-minute publish quota
 
 # All 119 live URLs from Shamrock Bail Bonds sitemap
 # Generated from: shamrockbailbonds.biz sitemap.xml (Feb 2026)
@@ -209,8 +215,12 @@ def get_access_token():
     return credentials.token
 
 
-def submit_url(url: str, token: str, notification_type: str = "URL_UPDATED") -> dict:
-    """Submit a single URL to the Google Indexing API."""
+def submit_url(url: str, token: str, notification_type: str = "URL_UPDATED",
+               limiter: RateLimiter = None) -> dict:
+    """Submit a single URL to the Google Indexing API.
+
+    With a limiter the call is paced and retried on 429/503.
+    """
     headers = {
         "Content-Type": "application/json",
         "Authorization": f"Bearer {token}",
@@ -219,7 +229,14 @@ def submit_url(url: str, token: str, notification_type: str = "URL_UPDATED") ->
         "url": url,
         "type": notification_type,
     }
-    response = req_lib.post(INDEXING_API_ENDPOINT, headers=headers, json=payload, timeout=15)
+    def request():
+        resp = req_lib.post(INDEXING_API_ENDPOINT, headers=headers, json=payload, timeout=15)
+        return resp.status_code, resp.headers, resp
+
+    if limiter:
+        _, _, response = limiter.send(INDEXING_API_ENDPOINT, request)
+    else:
+        response = request()[2]
     return {
         "url": url,
         "status_code": response.status_code,
@@ -247,6 +264,7 @@ def run_bulk_submission(dry_run: bool = False):
     results = []
     success_count = 0
     error_count = 0
+    limiter = RateLimiter(rate=INDEXING_START_RATE, max_rate=INDEXING_MAX_RATE, burst=1)
 
     for i, url in enumerate(URLS, 1):
         print(f"[{i:3d}/{len(URLS)}] Submitting: {url[:80]}...", end="", flush=True)
@@ -256,7 +274,7 @@ def run_bulk_submission(dry_run: bool = False):
             print(" ✅ (dry run)")
         else:
             try:
-                result = submit_url(url, token)
+                result = submit_url(url, token, limiter=limiter)
                 if result["success"]:
                     print(f" ✅ 200 OK")
                     success_count += 1
@@ -268,10 +286,6 @@ def run_bulk_submission(dry_run: bool = False):
                 print(f" ❌ Exception: {e}")
                 error_count += 1
 
-            # Throttle: 1 request per second to stay well within rate limits
-            # (API allows ~60/min but we stay conservative)
-            time.sleep(1.1)
-
         results.append(result)
 
     # ── Summary Report ─────────────────────────────────────────────────────────
@@ -280,6 +294,7 @@ def run_bulk_submission(dry_run: bool = False):
     print(f"  ✅ Successful: {success_count if not dry_run else len(URLS)} / {len(URLS)}")
     if not dry_run:
         print(f"  ❌ Errors:     {error_count} / {len(URLS)}")
+        print(f"  {limiter.summary()}")
     print("=" * 70)
 
     # Save results to JSON
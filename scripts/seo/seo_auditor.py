@@ -7,33 +7,81 @@ Crawls every page and audits:
   - Robots meta tags, Open Graph tags
   - JSON-LD structured data validity
   - County-specific schemas (LocalBusiness, FAQ, Service, Breadcrumb)
+  - Performance: latency percentiles, page weight and inline script/style
+    size per page type, checked against PERF_BUDGETS
+
+The checks are rules in audit_rules.py, run during the single parser pass.
 
 Usage:
-  python3 scripts/seo/seo_auditor.py [--sample N] [--output-dir DIR]
+  python3 scripts/seo/seo_auditor.py [--sample N] [--output-dir DIR] [--parse-workers N]
+      [--concurrency N] [--per-host N] [--store PATH] [--refresh]
+      [--urls FILE] [--large-site]
+
+Pages whose body and rules are unchanged since the last run reuse their
+stored audit (seo_audit_store.sqlite); --refresh re-audits them all.
+
+--urls audits a list of URLs (one per line) instead of the static and
+county pages.  --large-site, for tens of thousands of URLs, streams each
+result to the CSV as it completes (unsorted) and renders the report from
+running totals, capping its tables at LARGE_SITE_DETAIL_ROWS rows.
 
 Output:
   - seo_audit_report.md    (Full markdown report)
   - seo_audit_results.csv  (Machine-readable results)
+  - seo_audit_diff.md/.csv (New, changed and resolved issues since the last run)
 """
 
+import asyncio
 import csv
-import json
+import math
 import os
-import re
 import sys
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter
 from dataclasses import dataclass, field
-from html.parser import HTMLParser
-from typing import List, Optional, Dict
-from urllib.parse import urljoin
-import requests
+from typing import List, Optional
+import aiohttp
+
+# Shared crawl/parse helpers live with the redirect-audit tools
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data-tools"))
+from crawl_cache import body_hash
+from crawl_engine import open_session
+from fetch_timing import wire_bytes
+from parse_pool import DEFAULT_WORKERS, ParseStage
+from site_config import SITE_URL
+from url_classifier import URLS
+
+from audit_rules import AUDIT_RULES, RuleReport, audit_html
+from audit_store import STORE_FILE, AuditStore
 
 # ─── Configuration ────────────────────────────────────────────────────────────
-SITE_URL = "https://www.shamrockbailbonds.biz"
 PHONE = "+1-239-332-2245"
-MAX_WORKERS = 5  # Concurrent requests
+CONCURRENCY = 16  # Requests in flight
+PER_HOST = 8      # Keep-alive connections per origin
 REQUEST_TIMEOUT = 20
+HEADERS = {
+    "User-Agent": "ShamrockSEOAuditor/1.0",
+    "Accept-Encoding": "gzip, deflate",
+}
+BLOG_TAGS = {"blog", "blog_post", "blog_category", "blog_taxonomy", "blog_pagination"}
+
+# Performance budgets per page type, checked against the p95 across that
+# type's pages (Wix pages carry their runtime inline, hence the sizes)
+PERCENTILES = (50, 90, 95, 99)
+BUDGET_PERCENTILE = 95
+PERF_BUDGETS = {
+    "static": {"load_ms": 1500, "ttfb_ms": 600, "page_kb": 600, "inline_script_kb": 300, "inline_style_kb": 150},
+    "county": {"load_ms": 1500, "ttfb_ms": 600, "page_kb": 600, "inline_script_kb": 300, "inline_style_kb": 150},
+    "blog":   {"load_ms": 2000, "ttfb_ms": 800, "page_kb": 800, "inline_script_kb": 300, "inline_style_kb": 150},
+}
+BUDGET_LABELS = {
+    "load_ms": ("Load time", "ms"), "ttfb_ms": ("TTFB", "ms"), "page_kb": ("HTML size (decompressed)", "KB"),
+    "inline_script_kb": ("Inline scripts", "KB"), "inline_style_kb": ("Inline styles", "KB"),
+}
+
+# --large-site: stream results, cap report tables, print progress in batches
+LARGE_SITE_DETAIL_ROWS = 500
+LARGE_SITE_PROGRESS_EVERY = 500
 
 FLORIDA_COUNTY_SLUGS = [
     "alachua", "baker", "bay", "bradford", "brevard", "broward", "calhoun",
@@ -55,85 +103,18 @@ STATIC_PAGES = [
 ]
 
 
-# ─── HTML Parser ──────────────────────────────────────────────────────────────
-class SEOHTMLParser(HTMLParser):
-    """Parse HTML to extract SEO-relevant elements."""
-    def __init__(self):
-        super().__init__()
-        self.title = ""
-        self.in_title = False
-        self.meta_description = ""
-        self.canonical = ""
-        self.robots = ""
-        self.og_tags: Dict[str, str] = {}
-        self.json_ld: List[dict] = []
-        self._current_script_type = None
-        self._script_data = ""
-        self.h1_texts: List[str] = []
-        self.in_h1 = False
-        self._h1_buf = ""
-
-    def handle_starttag(self, tag, attrs):
-        attr = dict(attrs)
-        if tag == "title":
-            self.in_title = True
-        elif tag == "h1":
-            self.in_h1 = True
-            self._h1_buf = ""
-        elif tag == "meta":
-            name = attr.get("name", "").lower()
-            prop = attr.get("property", "").lower()
-            content = attr.get("content", "")
-            if name == "description":
-                self.meta_description = content
-            elif name == "robots":
-                self.robots = content
-            elif prop.startswith("og:"):
-                self.og_tags[prop] = content
-        elif tag == "link":
-            rel = attr.get("rel", "")
-            if rel == "canonical":
-                self.canonical = attr.get("href", "")
-        elif tag == "script":
-            stype = attr.get("type", "")
-            if stype == "application/ld+json":
-                self._current_script_type = "ld+json"
-                self._script_data = ""
-
-    def handle_endtag(self, tag):
-        if tag == "title":
-            self.in_title = False
-        elif tag == "h1":
-            self.in_h1 = False
-            if self._h1_buf.strip():
-                self.h1_texts.append(self._h1_buf.strip())
-        elif tag == "script" and self._current_script_type == "ld+json":
-            self._current_script_type = None
-            try:
-                data = json.loads(self._script_data)
-                if isinstance(data, list):
-                    self.json_ld.extend(data)
-                else:
-                    self.json_ld.append(data)
-            except json.JSONDecodeError:
-                pass
-
-    def handle_data(self, data):
-        if self.in_title:
-            self.title += data
-        if self.in_h1:
-            self._h1_buf += data
-        if self._current_script_type == "ld+json":
-            self._script_data += data
-
-
 # ─── Data Classes ─────────────────────────────────────────────────────────────
 @dataclass
 class AuditResult:
     url: str
     page_type: str  # static, county, blog
     status_code: int = 0
-    load_time_ms: int = 0
+    load_time_ms: int = 0     # ttfb + download
+    ttfb_ms: int = 0          # Request sent -> headers (includes DNS/connect)
+    download_ms: int = 0
+    parse_ms: int = 0
+    page_bytes: int = 0       # Decompressed HTML
+    transferred_bytes: int = 0  # Body bytes received on the wire
     title: str = ""
     title_length: int = 0
     meta_description: str = ""
@@ -152,130 +133,140 @@ class AuditResult:
     has_breadcrumb: bool = False
     has_service: bool = False
     has_organization: bool = False
+    inline_scripts: int = 0
+    inline_script_bytes: int = 0
+    inline_styles: int = 0
+    inline_style_bytes: int = 0
+    cached: bool = False      # Rule output reused from the audit store (not parsed)
     errors: List[str] = field(default_factory=list)
     warnings: List[str] = field(default_factory=list)
 
 
 # ─── Auditor ──────────────────────────────────────────────────────────────────
-def audit_page(url: str, page_type: str) -> AuditResult:
-    """Audit a single page for SEO issues."""
-    result = AuditResult(url=url, page_type=page_type)
+async def fetch_page(session, result: AuditResult) -> Optional[str]:
+    """Fetch ``result.url`` on the pooled session, recording status and timings.
 
+    Returns the HTML of a 200, else None.  The body is requested compressed
+    and aiohttp decodes it; ``page_bytes`` is the decoded size and
+    ``transferred_bytes`` the body bytes actually received on the wire.
+    """
     try:
-        start = time.time()
-        resp = requests.get(url, timeout=REQUEST_TIMEOUT, headers={
-            "User-Agent": "ShamrockSEOAuditor/1.0"
-        })
-        result.load_time_ms = int((time.time() - start) * 1000)
-        result.status_code = resp.status_code
-
-        if resp.status_code != 200:
-            result.errors.append(f"HTTP {resp.status_code}")
-            return result
-
-        html = resp.text
-        parser = SEOHTMLParser()
-        parser.feed(html)
-
-        # Title
-        result.title = parser.title.strip()
-        result.title_length = len(result.title)
-        if not result.title:
-            result.errors.append("Missing <title>")
-        elif result.title_length < 30:
-            result.warnings.append(f"Title too short ({result.title_length} chars)")
-        elif result.title_length > 65:
-            result.warnings.append(f"Title too long ({result.title_length} chars)")
-
-        # Meta description
-        result.meta_description = parser.meta_description
-        result.desc_length = len(result.meta_description)
-        if not result.meta_description:
-            result.errors.append("Missing meta description")
-        elif result.desc_length < 50:
-            result.warnings.append(f"Meta desc too short ({result.desc_length} chars)")
-        elif result.desc_length > 160:
-            result.warnings.append(f"Meta desc too long ({result.desc_length} chars)")
-
-        # Canonical
-        result.canonical = parser.canonical
-        if not result.canonical:
-            result.warnings.append("Missing canonical URL")
-        elif result.canonical != url and result.canonical != url.rstrip("/"):
-            result.warnings.append(f"Canonical mismatch: {result.canonical}")
-
-        # Robots
-        result.robots = parser.robots
-        if "noindex" in result.robots.lower():
-            result.errors.append("Page is set to noindex!")
-
-        # H1
-        result.h1_count = len(parser.h1_texts)
-        if result.h1_count == 0:
-            result.warnings.append("No H1 tag found")
-        elif result.h1_count > 1:
-            result.warnings.append(f"Multiple H1 tags ({result.h1_count})")
-
-        # OG tags
-        result.og_title = "og:title" in parser.og_tags
-        result.og_description = "og:description" in parser.og_tags
-        result.og_image = "og:image" in parser.og_tags
-        result.og_url = "og:url" in parser.og_tags
-        missing_og = []
-        if not result.og_title: missing_og.append("og:title")
-        if not result.og_description: missing_og.append("og:description")
-        if not result.og_image: missing_og.append("og:image")
-        if missing_og:
-            result.warnings.append(f"Missing OG tags: {', '.join(missing_og)}")
-
-        # JSON-LD
-        all_types = []
-        for schema in parser.json_ld:
-            schema_type = schema.get("@type", "")
-            if isinstance(schema_type, list):
-                all_types.extend(schema_type)
-            else:
-                all_types.append(schema_type)
-
-            # Check @graph
-            if "@graph" in schema:
-                for item in schema["@graph"]:
-                    t = item.get("@type", "")
-                    if isinstance(t, list):
-                        all_types.extend(t)
-                    else:
-                        all_types.append(t)
-
-        result.json_ld_count = len(parser.json_ld)
-        result.json_ld_types = ", ".join(set(all_types)) if all_types else ""
-        result.has_organization = "Organization" in all_types
-        result.has_local_business = any(t in all_types for t in ["LocalBusiness", "BailBondBusiness"])
-        result.has_faq = "FAQPage" in all_types
-        result.has_breadcrumb = "BreadcrumbList" in all_types
-        result.has_service = "Service" in all_types
-
-        if not all_types:
-            result.warnings.append("No JSON-LD structured data")
-
-        # County-specific checks
-        if page_type == "county":
-            if not result.has_local_business:
-                result.errors.append("Missing LocalBusiness schema (county page)")
-            if not result.has_faq:
-                result.warnings.append("Missing FAQPage schema (county page)")
-            if not result.has_breadcrumb:
-                result.warnings.append("Missing BreadcrumbList schema (county page)")
-
-    except requests.Timeout:
+        start = time.perf_counter()
+        async with session.get(result.url) as resp:
+            headers_at = time.perf_counter()
+            body = await resp.read()
+            done = time.perf_counter()
+            result.ttfb_ms = int((headers_at - start) * 1000)
+            result.download_ms = int((done - headers_at) * 1000)
+            result.load_time_ms = int((done - start) * 1000)
+            result.page_bytes = len(body)
+            result.transferred_bytes = wire_bytes(resp)
+            result.status_code = resp.status
+
+            if resp.status != 200:
+                result.errors.append(f"HTTP {resp.status}")
+                return None
+            return body.decode(resp.charset or "utf-8", errors="replace")
+
+    except asyncio.TimeoutError:
         result.errors.append("Request timed out")
-    except requests.ConnectionError:
+    except aiohttp.ClientConnectionError:
         result.errors.append("Connection failed")
     except Exception as e:
         result.errors.append(f"Error: {str(e)[:100]}")
+    return None
+
 
+def analyze_page(result: AuditResult, report: RuleReport) -> AuditResult:
+    """Copy the audit rules' fields and messages onto ``result``."""
+    result.parse_ms = int(report.parse_seconds * 1000)
+    for name, value in report.fields.items():
+        if hasattr(result, name):
+            setattr(result, name, value)
+    result.errors.extend(report.errors)
+    result.warnings.extend(report.warnings)
     return result
 
 
+def audit_page(url: str, page_type: str) -> AuditResult:
+    """Audit a single page for SEO issues (one-off; audit_pages for batches)."""
+    async def audit_one():
+        async with ParseStage(parse=audit_html, workers=0) as stage:
+            async for result in audit_pages([(url, page_type)], stage, concurrency=1, per_host=1):
+                return result
+    return asyncio.run(audit_one())
+
+
+async def audit_pages(urls, stage: ParseStage, concurrency=CONCURRENCY, per_host=PER_HOST,
+                      store: Optional[AuditStore] = None):
+    """Audit ``(url, page_type)`` pairs, yielding results as they complete.
+
+    One keep-alive connection pool (``per_host`` connections per origin)
+    serves up to ``concurrency`` fetches at a time, while ``stage`` parses
+    the bodies already downloaded (running the audit rules) in its process pool.
+    With a ``store``, a body already audited under the current rules is not
+    parsed again: its stored report is reused.
+    """
+    fetch_slots = asyncio.Semaphore(concurrency)
+
+    async def audit(session, url, page_type):
+        result = AuditResult(url=url, page_type=page_type)
+        async with fetch_slots:
+            html = await fetch_page(session, result)
+        if html is None:
+            return result
+        try:
+            digest = body_hash(html) if store else None
+            report = store.get(url, page_type, digest) if store else None
+            if report:
+                result.cached = True
+            else:
+                report = await stage.parse((html, url, page_type))
+                if store:
+                    store.put(url, page_type, digest, report)
+            return analyze_page(result, report)
+        except Exception as e:
+            result.errors.append(f"Error: {str(e)[:100]}")
+            return result
+
+    # Only a window of pages is scheduled at a time, so a 50k-URL list doesn't
+    # become 50k pending tasks
+    window = concurrency * 4
+    pending = set()
+    async with stage, open_session(HEADERS, concurrency, per_host, REQUEST_TIMEOUT) as session:
+        for url, ptype in urls:
+            if len(pending) >= window:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            pending.add(asyncio.ensure_future(audit(session, url, ptype)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+
+
+def page_type_for(url):
+    """Page type of a listed URL: county, blog or static."""
+    tags = URLS.tags(url)
+    if "florida_bail_bonds" in tags:
+        return "county"
+    if tags & BLOG_TAGS:
+        return "blog"
+    return "static"
+
+
+def read_url_list(path):
+    """``(url, page_type)`` pairs from a file of URLs, one per line."""
+    urls = []
+    with open(path) as f:
+        for line in f:
+            url = line.strip()
+            if url and not url.startswith("#"):
+                urls.append((url, page_type_for(url)))
+    return urls
+
+
 def collect_urls():
     """Collect all URLs to audit."""
     urls = []
@@ -288,18 +279,133 @@ def collect_urls():
 
 
 # ─── Report Generator ────────────────────────────────────────────────────────
-def generate_markdown_report(results: List[AuditResult], output_dir: str):
-    """Generate a comprehensive markdown report."""
-    path = os.path.join(output_dir, "seo_audit_report.md")
+CSV_HEADER = [
+    "URL", "Type", "Status", "Load(ms)", "TTFB(ms)", "Download(ms)",
+    "Parse(ms)", "Bytes", "Title", "Title Len",
+    "Meta Desc", "Desc Len", "Canonical", "Robots", "H1 Count",
+    "OG:title", "OG:desc", "OG:image", "JSON-LD Count", "Schema Types",
+    "LocalBiz", "FAQ", "Breadcrumb", "Service", "Errors", "Warnings",
+    "Transferred", "Inline JS", "Inline JS Bytes", "Inline CSS", "Inline CSS Bytes"
+]
+
 
-    total = len(results)
-    ok = sum(1 for r in results if not r.errors)
-    errors_total = sum(len(r.errors) for r in results)
-    warnings_total = sum(len(r.warnings) for r in results)
-    non_200 = [r for r in results if r.status_code != 200]
-    missing_title = [r for r in results if not r.title]
-    missing_desc = [r for r in results if not r.meta_description]
-    missing_jsonld = [r for r in results if r.json_ld_count == 0]
+# Per page type Counters: latencies in ms, sizes in KB
+DISTRIBUTIONS = ("load_ms", "ttfb_ms", "download_ms", "parse_ms",
+                 "page_kb", "inline_script_kb", "inline_style_kb")
+
+
+class ReportAccumulator:
+    """Everything the markdown report shows, updated in O(1) per result.
+
+    Counts and sums replace the per-metric passes over a result list, and
+    latencies and sizes go into Counters of whole milliseconds / KB
+    (DISTRIBUTIONS), so percentiles stay exact while memory depends on the
+    spread of values, not the page count.
+    Detail tables keep at most ``detail_rows`` rows each (None: all).
+    """
+
+    def __init__(self, detail_rows=None):
+        self.detail_rows = detail_rows
+        self.total = self.ok = self.errors_total = self.warnings_total = 0
+        self.missing_title = self.missing_desc = self.missing_jsonld = 0
+        self.non_200 = 0
+        self.error_rows, self.warning_rows, self.non_200_rows = [], [], []
+        self.county = Counter()  # pages, LocalBusiness, FAQPage, BreadcrumbList, Service
+        self.loaded = self.load_ms_sum = 0
+        self.slowest = None      # (load ms, url)
+        self.by_type = {}        # page type -> {"pages", "bytes", "ttfb_ms", "download_ms", "parse_ms"}
+
+    def _keep(self, rows, row):
+        if self.detail_rows is None or len(rows) < self.detail_rows:
+            rows.append(row)
+
+    def add(self, r: AuditResult):
+        self.total += 1
+        self.ok += not r.errors
+        self.errors_total += len(r.errors)
+        self.warnings_total += len(r.warnings)
+        self.missing_title += not r.title
+        self.missing_desc += not r.meta_description
+        self.missing_jsonld += r.json_ld_count == 0
+        short = r.url.replace(SITE_URL, "") or "/"
+        for err in r.errors:
+            self._keep(self.error_rows, (short, r.page_type, err))
+        for w in r.warnings:
+            self._keep(self.warning_rows, (short, w))
+        if r.status_code != 200:
+            self.non_200 += 1
+            self._keep(self.non_200_rows, (short, r.status_code))
+
+        if r.page_type == "county":
+            self.county.update(pages=1, LocalBusiness=r.has_local_business, FAQPage=r.has_faq,
+                               BreadcrumbList=r.has_breadcrumb, Service=r.has_service)
+
+        if r.load_time_ms > 0:
+            self.loaded += 1
+            self.load_ms_sum += r.load_time_ms
+            if self.slowest is None or r.load_time_ms > self.slowest[0]:
+                self.slowest = (r.load_time_ms, short)
+            group = self.by_type.get(r.page_type)
+            if group is None:
+                group = self.by_type[r.page_type] = {
+                    "pages": 0, "weighed": 0, "bytes": 0, "transferred": 0,
+                    "inline_scripts": 0, "inline_script_bytes": 0, "inline_styles": 0, "inline_style_bytes": 0,
+                    **{metric: Counter() for metric in DISTRIBUTIONS}}
+            group["pages"] += 1
+            group["load_ms"][r.load_time_ms] += 1
+            group["ttfb_ms"][r.ttfb_ms] += 1
+            group["download_ms"][r.download_ms] += 1
+            # Pages reused from the audit store were not parsed this run
+            if not r.cached:
+                group["parse_ms"][r.parse_ms] += 1
+            # Page weight only means something for pages that served HTML
+            if r.status_code == 200:
+                group["weighed"] += 1
+                group["bytes"] += r.page_bytes
+                group["transferred"] += r.transferred_bytes
+                group["page_kb"][round(r.page_bytes / 1024)] += 1
+                for kind in ("script", "style"):
+                    group[f"inline_{kind}s"] += getattr(r, f"inline_{kind}s")
+                    size = getattr(r, f"inline_{kind}_bytes")
+                    group[f"inline_{kind}_bytes"] += size
+                    group[f"inline_{kind}_kb"][round(size / 1024)] += 1
+
+    def budgets(self):
+        """``(page type, metric, p95, budget, pages over, passed)`` per PERF_BUDGETS entry."""
+        rows = []
+        for ptype, group in sorted(self.by_type.items()):
+            for metric, limit in PERF_BUDGETS.get(ptype, {}).items():
+                counts = group[metric]
+                if not counts:
+                    continue
+                value = counter_percentile(counts, BUDGET_PERCENTILE)
+                over = sum(n for v, n in counts.items() if v > limit)
+                rows.append((ptype, metric, value, limit, over, value <= limit))
+        return rows
+
+
+def counter_percentile(counts, pct):
+    """Nearest-rank percentile of a Counter of values (0 when empty)."""
+    n = sum(counts.values())
+    if not n:
+        return 0
+    rank = max(1, math.ceil(pct / 100 * n))
+    seen = 0
+    for value in sorted(counts):
+        seen += counts[value]
+        if seen >= rank:
+            return value
+
+
+def _more(f, shown, total, what):
+    if total > shown:
+        f.write(f"\n_… {total - shown} more {what} in seo_audit_results.csv_\n")
+
+
+def generate_markdown_report(acc: ReportAccumulator, output_dir: str):
+    """Generate a comprehensive markdown report from the accumulated totals."""
+    path = os.path.join(output_dir, "seo_audit_report.md")
+    total = acc.total
 
     with open(path, "w") as f:
         f.write("# 🔍 SEO Audit Report — Shamrock Bail Bonds\n\n")
@@ -308,100 +414,188 @@ def generate_markdown_report(results: List[AuditResult], output_dir: str):
         f.write(f"**Pages Audited:** {total}\n\n")
 
         # Score card
-        score = int((ok / total) * 100) if total else 0
+        score = int((acc.ok / total) * 100) if total else 0
         f.write("## 📊 Score Card\n\n")
         f.write(f"| Metric | Value |\n|---|---|\n")
         f.write(f"| Pages Audited | {total} |\n")
-        f.write(f"| Clean (no errors) | {ok} ({score}%) |\n")
-        f.write(f"| Total Errors | {errors_total} |\n")
-        f.write(f"| Total Warnings | {warnings_total} |\n")
-        f.write(f"| Non-200 Status | {len(non_200)} |\n")
-        f.write(f"| Missing Title | {len(missing_title)} |\n")
-        f.write(f"| Missing Meta Desc | {len(missing_desc)} |\n")
-        f.write(f"| Missing JSON-LD | {len(missing_jsonld)} |\n\n")
+        f.write(f"| Clean (no errors) | {acc.ok} ({score}%) |\n")
+        f.write(f"| Total Errors | {acc.errors_total} |\n")
+        f.write(f"| Total Warnings | {acc.warnings_total} |\n")
+        f.write(f"| Non-200 Status | {acc.non_200} |\n")
+        f.write(f"| Missing Title | {acc.missing_title} |\n")
+        f.write(f"| Missing Meta Desc | {acc.missing_desc} |\n")
+        f.write(f"| Missing JSON-LD | {acc.missing_jsonld} |\n\n")
 
         # Critical issues
-        if errors_total > 0:
+        if acc.errors_total > 0:
             f.write("## 🚨 Critical Errors\n\n")
             f.write("| Page | Type | Error |\n|---|---|---|\n")
-            for r in results:
-                for err in r.errors:
-                    short_url = r.url.replace(SITE_URL, "")
-                    f.write(f"| `{short_url or '/'}` | {r.page_type} | {err} |\n")
+            for short, ptype, err in acc.error_rows:
+                f.write(f"| `{short}` | {ptype} | {err} |\n")
+            _more(f, len(acc.error_rows), acc.errors_total, "errors")
             f.write("\n")
 
         # Non-200 pages
-        if non_200:
+        if acc.non_200:
             f.write("## ❌ Non-200 Status Codes\n\n")
-            for r in non_200:
-                short = r.url.replace(SITE_URL, "")
-                f.write(f"- `{short or '/'}` → **{r.status_code}**\n")
+            for short, status in acc.non_200_rows:
+                f.write(f"- `{short}` → **{status}**\n")
+            if acc.non_200 > len(acc.non_200_rows):
+                f.write(f"- … {acc.non_200 - len(acc.non_200_rows)} more in seo_audit_results.csv\n")
             f.write("\n")
 
         # Warnings summary
-        if warnings_total > 0:
+        if acc.warnings_total > 0:
             f.write("## ⚠️ Warnings\n\n")
             f.write("<details><summary>Click to expand all warnings</summary>\n\n")
             f.write("| Page | Warning |\n|---|---|\n")
-            for r in results:
-                for w in r.warnings:
-                    short = r.url.replace(SITE_URL, "")
-                    f.write(f"| `{short or '/'}` | {w} |\n")
+            for short, w in acc.warning_rows:
+                f.write(f"| `{short}` | {w} |\n")
+            _more(f, len(acc.warning_rows), acc.warnings_total, "warnings")
             f.write("\n</details>\n\n")
 
         # County page schema coverage
-        county_results = [r for r in results if r.page_type == "county"]
-        if county_results:
+        pages = acc.county["pages"]
+        if pages:
             f.write("## 🏛️ County Page Schema Coverage\n\n")
-            lb = sum(1 for r in county_results if r.has_local_business)
-            faq = sum(1 for r in county_results if r.has_faq)
-            bc = sum(1 for r in county_results if r.has_breadcrumb)
-            svc = sum(1 for r in county_results if r.has_service)
             f.write(f"| Schema | Pages w/ Schema | Coverage |\n|---|---|---|\n")
-            f.write(f"| LocalBusiness | {lb}/{len(county_results)} | {int(lb/len(county_results)*100)}% |\n")
-            f.write(f"| FAQPage | {faq}/{len(county_results)} | {int(faq/len(county_results)*100)}% |\n")
-            f.write(f"| BreadcrumbList | {bc}/{len(county_results)} | {int(bc/len(county_results)*100)}% |\n")
-            f.write(f"| Service | {svc}/{len(county_results)} | {int(svc/len(county_results)*100)}% |\n\n")
-
-        # Load time summary
-        valid = [r for r in results if r.load_time_ms > 0]
-        if valid:
-            avg_ms = sum(r.load_time_ms for r in valid) // len(valid)
-            slowest = max(valid, key=lambda r: r.load_time_ms)
+            for schema in ("LocalBusiness", "FAQPage", "BreadcrumbList", "Service"):
+                n = acc.county[schema]
+                f.write(f"| {schema} | {n}/{pages} | {int(n/pages*100)}% |\n")
+            f.write("\n")
+
+        # Performance: latency distributions, page weight and budgets per page type
+        if acc.loaded:
+            avg_ms = acc.load_ms_sum // acc.loaded
+            slowest_ms, short = acc.slowest
+            pcts = "/".join(f"p{p}" for p in PERCENTILES)
             f.write("## ⏱️ Performance\n\n")
             f.write(f"- **Average load time:** {avg_ms}ms\n")
-            short = slowest.url.replace(SITE_URL, "")
-            f.write(f"- **Slowest page:** `{short or '/'}` ({slowest.load_time_ms}ms)\n\n")
+            f.write(f"- **Slowest page:** `{short}` ({slowest_ms}ms)\n\n")
+
+            # Where the time goes, per page type
+            f.write(f"### Latency (ms, {pcts})\n\n")
+            f.write("| Page Type | Pages | Load | TTFB | Download | Parse |\n")
+            f.write("|---|---|---|---|---|---|\n")
+            for ptype, group in sorted(acc.by_type.items()):
+                cols = []
+                for metric in ("load_ms", "ttfb_ms", "download_ms", "parse_ms"):
+                    counts = group[metric]
+                    cols.append("/".join(f"{counter_percentile(counts, p):.0f}" for p in PERCENTILES)
+                                if counts else "cached")
+                f.write(f"| {ptype} | {group['pages']} | {' | '.join(cols)} |\n")
+            f.write("\n")
+
+            # What users and crawlers download and parse
+            f.write("### Page Weight (200 pages)\n\n")
+            f.write("| Page Type | Pages | Avg Transferred KB | Avg Decompressed KB | p95 KB | Compression "
+                    "| Inline JS (avg blocks / avg KB / p95 KB) | Inline CSS (avg blocks / avg KB / p95 KB) |\n")
+            f.write("|---|---|---|---|---|---|---|---|\n")
+            for ptype, group in sorted(acc.by_type.items()):
+                n = group["weighed"]
+                if not n:
+                    continue
+                # Transferred: body bytes read off the wire (wire_bytes), before decompression
+                transferred = f"{group['transferred'] / 1024 / n:.0f}"
+                ratio = group["transferred"] / group["bytes"] if group["bytes"] else 1
+                compression = f"{(1 - ratio) * 100:.0f}% saved" if ratio < 1 else "none"
+                inline = []
+                for kind in ("script", "style"):
+                    inline.append(f"{group[f'inline_{kind}s'] / n:.1f} / "
+                                  f"{group[f'inline_{kind}_bytes'] / 1024 / n:.0f} / "
+                                  f"{counter_percentile(group[f'inline_{kind}_kb'], 95)}")
+                f.write(f"| {ptype} | {n} | {transferred} | {group['bytes'] / 1024 / n:.0f} | "
+                        f"{counter_percentile(group['page_kb'], 95)} | {compression} | {inline[0]} | {inline[1]} |\n")
+            f.write("\n")
+
+            budgets = acc.budgets()
+            if budgets:
+                passed = sum(1 for *_, ok in budgets if ok)
+                f.write(f"### Budgets (p{BUDGET_PERCENTILE} per page type): {passed}/{len(budgets)} pass\n\n")
+                f.write(f"| Page Type | Metric | p{BUDGET_PERCENTILE} | Budget | Pages Over | Result |\n")
+                f.write("|---|---|---|---|---|---|\n")
+                for ptype, metric, value, limit, over, ok in budgets:
+                    label, unit = BUDGET_LABELS[metric]
+                    f.write(f"| {ptype} | {label} | {value} {unit} | {limit} {unit} | {over} | "
+                            f"{'✅ pass' if ok else '❌ fail'} |\n")
+                f.write("\n")
 
     print(f"📄 Report: {path}")
     return path
 
 
+class CsvResultWriter:
+    """seo_audit_results.csv, one row written per result as it arrives."""
+
+    def __init__(self, output_dir: str):
+        self.path = os.path.join(output_dir, "seo_audit_results.csv")
+        self._file = open(self.path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(CSV_HEADER)
+
+    def write(self, r: AuditResult):
+        self._writer.writerow([
+            r.url, r.page_type, r.status_code, r.load_time_ms, r.ttfb_ms,
+            r.download_ms, r.parse_ms, r.page_bytes,
+            r.title[:60], r.title_length, r.meta_description[:60],
+            r.desc_length, r.canonical, r.robots, r.h1_count,
+            r.og_title, r.og_description, r.og_image,
+            r.json_ld_count, r.json_ld_types,
+            r.has_local_business, r.has_faq, r.has_breadcrumb, r.has_service,
+            "; ".join(r.errors), "; ".join(r.warnings),
+            r.transferred_bytes, r.inline_scripts, r.inline_script_bytes,
+            r.inline_styles, r.inline_style_bytes
+        ])
+
+    def close(self):
+        self._file.close()
+        print(f"📊 CSV: {self.path}")
+
+
 def generate_csv(results: List[AuditResult], output_dir: str):
     """Generate CSV with audit results."""
-    path = os.path.join(output_dir, "seo_audit_results.csv")
-
-    with open(path, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow([
-            "URL", "Type", "Status", "Load(ms)", "Title", "Title Len",
-            "Meta Desc", "Desc Len", "Canonical", "Robots", "H1 Count",
-            "OG:title", "OG:desc", "OG:image", "JSON-LD Count", "Schema Types",
-            "LocalBiz", "FAQ", "Breadcrumb", "Service", "Errors", "Warnings"
-        ])
-        for r in results:
-            writer.writerow([
-                r.url, r.page_type, r.status_code, r.load_time_ms,
-                r.title[:60], r.title_length, r.meta_description[:60],
-                r.desc_length, r.canonical, r.robots, r.h1_count,
-                r.og_title, r.og_description, r.og_image,
-                r.json_ld_count, r.json_ld_types,
-                r.has_local_business, r.has_faq, r.has_breadcrumb, r.has_service,
-                "; ".join(r.errors), "; ".join(r.warnings)
-            ])
-
-    print(f"📊 CSV: {path}")
-    return path
+    writer = CsvResultWriter(output_dir)
+    for r in results:
+        writer.write(r)
+    writer.close()
+    return writer.path
+
+
+def generate_diff_report(store: AuditStore, compared: int, output_dir: str):
+    """Write the run-to-run diff: new, changed and resolved messages.
+
+    The rows are streamed, sorted, from the store's open run.
+    """
+    md_path = os.path.join(output_dir, "seo_audit_diff.md")
+    csv_path = os.path.join(output_dir, "seo_audit_diff.csv")
+
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["URL", "Severity", "Change", "Issue", "Was"])
+        writer.writeheader()
+        writer.writerows(store.diff_rows())
+
+    counts = store.diff_counts()
+
+    with open(md_path, "w") as f:
+        f.write("# 🔁 SEO Audit Diff — Shamrock Bail Bonds\n\n")
+        f.write(f"**Generated:** {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"**Pages compared with their previous audit:** {compared}\n\n")
+        if not compared:
+            f.write("No earlier audit of these pages: this run is the baseline.\n")
+        elif not counts:
+            f.write("No changes since the previous audit. ✅\n")
+        else:
+            f.write("| | New | Changed | Resolved |\n|---|---|---|---|\n")
+            for severity in ("error", "warning"):
+                f.write(f"| {severity.title()}s | {counts.get((severity, 'new'), 0)} | "
+                        f"{counts.get((severity, 'changed'), 0)} | {counts.get((severity, 'resolved'), 0)} |\n")
+            f.write("\n| Page | Severity | Change | Issue | Was |\n|---|---|---|---|---|\n")
+            for d in store.diff_rows():
+                short = d["URL"].replace(SITE_URL, "")
+                f.write(f"| `{short or '/'}` | {d['Severity']} | {d['Change']} | {d['Issue']} | {d['Was']} |\n")
+
+    print(f"🔁 Diff: {md_path}")
+    return counts
 
 
 # ─── Main ─────────────────────────────────────────────────────────────────────
@@ -419,56 +613,118 @@ def main():
         if idx + 1 < len(sys.argv):
             output_dir = sys.argv[idx + 1]
 
+    concurrency, per_host = CONCURRENCY, PER_HOST
+    if "--concurrency" in sys.argv:
+        idx = sys.argv.index("--concurrency")
+        if idx + 1 < len(sys.argv):
+            concurrency = int(sys.argv[idx + 1])
+    if "--per-host" in sys.argv:
+        idx = sys.argv.index("--per-host")
+        if idx + 1 < len(sys.argv):
+            per_host = int(sys.argv[idx + 1])
+
+    store_path = None
+    if "--store" in sys.argv:
+        idx = sys.argv.index("--store")
+        if idx + 1 < len(sys.argv):
+            store_path = sys.argv[idx + 1]
+    refresh = "--refresh" in sys.argv
+
+    parse_workers = DEFAULT_WORKERS
+    if "--parse-workers" in sys.argv:
+        idx = sys.argv.index("--parse-workers")
+        if idx + 1 < len(sys.argv):
+            parse_workers = int(sys.argv[idx + 1])
+
+    url_file = None
+    if "--urls" in sys.argv:
+        idx = sys.argv.index("--urls")
+        if idx + 1 < len(sys.argv):
+            url_file = sys.argv[idx + 1]
+    large_site = "--large-site" in sys.argv
+
     print("🔍 Shamrock Bail Bonds — SEO Auditor")
     print("=" * 60)
 
     # Collect URLs
-    all_urls = collect_urls()
+    all_urls = read_url_list(url_file) if url_file else collect_urls()
     if sample:
-        # Take a sample: first few static + first few county
+        # Take a sample: first few static + first few of each other type
         static = [u for u in all_urls if u[1] == "static"][:3]
-        county = [u for u in all_urls if u[1] == "county"][:sample]
-        all_urls = static + county
+        others = [u for u in all_urls if u[1] != "static"]
+        all_urls = static + [u for t in sorted({t for _, t in others})
+                             for u in [o for o in others if o[1] == t][:sample]]
 
-    print(f"📋 Auditing {len(all_urls)} pages...")
-    types_count = {}
-    for _, t in all_urls:
-        types_count[t] = types_count.get(t, 0) + 1
+    print(f"📋 Auditing {len(all_urls)} pages{' (large-site mode)' if large_site else ''}...")
+    types_count = Counter(t for _, t in all_urls)
     for t, c in sorted(types_count.items()):
         print(f"   • {t}: {c}")
 
-    # Audit pages with thread pool
+    # Fetch on one pooled async session, parse in the process pool
     results: List[AuditResult] = []
     done = 0
     total = len(all_urls)
 
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {executor.submit(audit_page, url, ptype): (url, ptype)
-                   for url, ptype in all_urls}
-
-        for future in as_completed(futures):
-            result = future.result()
-            results.append(result)
+    stage = ParseStage(parse=audit_html, workers=parse_workers)
+    # --refresh re-audits every page but still stores the results and diffs the run
+    store = AuditStore(store_path or os.path.join(output_dir, STORE_FILE), AUDIT_RULES.version,
+                       reuse=not refresh)
+    store.start_run(time.time())
+    compared = 0
+
+    # Large sites: each result goes straight to the CSV and the report totals
+    # and is dropped, instead of being kept, sorted and re-walked per metric
+    acc = ReportAccumulator(LARGE_SITE_DETAIL_ROWS if large_site else None)
+    csv_out = CsvResultWriter(output_dir) if large_site else None
+
+    async def run():
+        nonlocal done, compared
+        async for result in audit_pages(all_urls, stage, concurrency, per_host, store):
             done += 1
+            compared += store.record_page(result)
+            if large_site:
+                acc.add(result)
+                csv_out.write(result)
+                if done % LARGE_SITE_PROGRESS_EVERY == 0 or done == total:
+                    print(f"   [{done}/{total}] {acc.ok} clean, {acc.errors_total} errors")
+                continue
+            results.append(result)
             status = "✅" if not result.errors else "❌"
             short = result.url.replace(SITE_URL, "") or "/"
             print(f"   [{done}/{total}] {status} {short} ({result.status_code}, {result.load_time_ms}ms)")
 
-    # Sort by URL for consistent reporting
-    results.sort(key=lambda r: r.url)
+    asyncio.run(run())
+    print(f"   {stage.summary()}")
+    print(f"   {store.summary()}")
+    store.finish_run()
 
     # Generate reports
     print(f"\n📝 Generating reports...")
-    generate_markdown_report(results, output_dir)
-    generate_csv(results, output_dir)
+    if large_site:
+        csv_out.close()
+    else:
+        # Sort by URL for consistent reporting
+        results.sort(key=lambda r: r.url)
+        for r in results:
+            acc.add(r)
+        generate_csv(results, output_dir)
+    generate_markdown_report(acc, output_dir)
+    diff_counts = generate_diff_report(store, compared, output_dir)
+    store.close()
 
     # Summary
-    ok = sum(1 for r in results if not r.errors)
-    errors = sum(len(r.errors) for r in results)
-    warnings = sum(len(r.warnings) for r in results)
     print(f"\n{'=' * 60}")
-    print(f"✅ Audit complete: {ok}/{total} pages clean")
-    print(f"   🚨 {errors} errors, ⚠️  {warnings} warnings")
+    print(f"✅ Audit complete: {acc.ok}/{total} pages clean")
+    print(f"   🚨 {acc.errors_total} errors, ⚠️  {acc.warnings_total} warnings")
+    budgets = acc.budgets()
+    if budgets:
+        failed = [f"{ptype} {BUDGET_LABELS[metric][0].lower()}" for ptype, metric, *_, ok in budgets if not ok]
+        print(f"   ⏱️  Budgets: {len(budgets) - len(failed)}/{len(budgets)} pass"
+              + (f" (over: {', '.join(failed)})" if failed else ""))
+    if compared:
+        print(f"   🔁 Since last audit: {diff_counts.get(('error', 'new'), 0)} new errors, "
+              f"{diff_counts.get(('error', 'resolved'), 0)} resolved, "
+              f"{diff_counts.get(('error', 'changed'), 0)} changed")
     print(f"   📄 Reports saved to: {output_dir}")
 
 